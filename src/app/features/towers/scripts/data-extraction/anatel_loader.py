@@ -0,0 +1,315 @@
+"""
+ANATEL Loader
+Parse ANATEL licensed-station exports (one per state or a national file)
+into a typed tower table, in parallel and with a per-file parse cache
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import unicodedata
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from opencellid_loader import BRAZIL_BBOX
+
+logger = logging.getLogger(__name__)
+
+# Optional Parquet engine (used through pandas)
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+if not PYARROW_AVAILABLE:
+    logger.warning("pyarrow not available - ANATEL exports will be re-parsed on every run")
+
+# Bump when parsing changes so cached parses of unchanged files are rebuilt
+PARSER_VERSION = 1
+INDEX_FILENAME = "anatel_parse_index.json"
+
+# Export headers (lowercase, without accents or separators) for each output column
+COLUMN_ALIASES = {
+    'station_id': ['numestacao', 'numeroestacao', 'estacao', 'stationid'],
+    'operator': ['nomeentidade', 'entidade', 'prestadora', 'operadora', 'operator'],
+    'technology': ['tecnologia', 'technology'],
+    'state_code': ['siglauf', 'uf', 'statecode', 'state'],
+    'municipality': ['municipio', 'nomemunicipio', 'municipality', 'city'],
+    'latitude': ['latitude', 'lat'],
+    'longitude': ['longitude', 'lon', 'lng'],
+    'frequency_mhz': ['freqtxmhz', 'frequenciatx', 'frequencia', 'frequencymhz'],
+}
+
+CATEGORICAL_COLUMNS = ['operator', 'technology', 'state_code']
+STRING_COLUMNS = ['station_id', 'municipality']
+
+# Degrees, minutes, seconds and hemisphere, e.g. 23S3210 or 23°32'10.5"S
+_DMS_PATTERN = (r"^(?P<deg>\d{1,3})\s*[°º:\s]?\s*(?P<hem1>[NSEWLO])?\s*(?P<min>\d{1,2})\s*['’:\s]?"
+                r"\s*(?P<sec>\d{1,2}(?:\.\d+)?)?\s*[\"”]?\s*(?P<hem2>[NSEWLO])?$")
+
+
+def _normalize_header(name: str) -> str:
+    """Lowercase header without accents, spaces or punctuation"""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    return ''.join(ch for ch in name.lower() if ch.isalnum())
+
+
+def _sniff_format(path: Path) -> Tuple[str, str]:
+    """Encoding and delimiter of an export (UTF-8 or Latin-1, ';' or ',')"""
+    with open(path, 'rb') as f:
+        head = f.read(65536)
+    try:
+        head.decode('utf-8')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'latin-1'
+    first_line = head.split(b'\n', 1)[0]
+    delimiter = ';' if first_line.count(b';') > first_line.count(b',') else ','
+    return encoding, delimiter
+
+
+def parse_coordinates(values: pd.Series) -> pd.Series:
+    """
+    Decimal degrees from ANATEL coordinate strings
+    
+    Accepts decimal degrees with either decimal separator and DMS strings
+    with a hemisphere letter (S/W/O are negative).
+    """
+    text = values.astype('string').str.strip().str.upper()
+    decimal = pd.to_numeric(text.str.replace(',', '.', regex=False), errors='coerce')
+    
+    needs_dms = decimal.isna() & text.notna()
+    if needs_dms.any():
+        parts = text[needs_dms].str.replace(',', '.', regex=False).str.extract(_DMS_PATTERN)
+        degrees = (
+            pd.to_numeric(parts['deg'], errors='coerce')
+            + pd.to_numeric(parts['min'], errors='coerce') / 60
+            + pd.to_numeric(parts['sec'], errors='coerce').fillna(0) / 3600
+        )
+        hemisphere = parts['hem1'].fillna(parts['hem2'])
+        degrees = degrees.where(~hemisphere.isin(['S', 'W', 'O']), -degrees)
+        decimal = decimal.astype('float64')
+        decimal[needs_dms] = degrees.astype('float64')
+    
+    return decimal.astype('float64')
+
+
+def parse_anatel_file(path: Path) -> pd.DataFrame:
+    """
+    Parse one ANATEL export into typed columns
+    
+    Only recognised columns are read (all as text) and converted column by
+    column; rows without coordinates inside Brazil are dropped, and stations
+    listed once per transmitter are collapsed to one row per site.
+    """
+    encoding, delimiter = _sniff_format(path)
+    header = pd.read_csv(path, nrows=0, sep=delimiter, encoding=encoding).columns
+    normalized = {_normalize_header(col): col for col in header}
+    
+    source_columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        source = next((normalized[alias] for alias in aliases if alias in normalized), None)
+        if source is not None:
+            source_columns[source] = column
+    
+    if 'latitude' not in source_columns.values() or 'longitude' not in source_columns.values():
+        raise ValueError(f"{path.name} has no latitude/longitude columns")
+    
+    df = pd.read_csv(
+        path, sep=delimiter, encoding=encoding, usecols=list(source_columns),
+        dtype=str, on_bad_lines='skip'
+    ).rename(columns=source_columns)
+    
+    df['latitude'] = parse_coordinates(df['latitude'])
+    df['longitude'] = parse_coordinates(df['longitude'])
+    if 'frequency_mhz' in df.columns:
+        df['frequency_mhz'] = pd.to_numeric(df['frequency_mhz'].str.replace(',', '.', regex=False), errors='coerce')
+    for column in STRING_COLUMNS + CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].str.strip()
+    if 'state_code' in df.columns:
+        df['state_code'] = df['state_code'].str.upper()
+    
+    in_brazil = (
+        df['latitude'].between(BRAZIL_BBOX['min_lat'], BRAZIL_BBOX['max_lat'])
+        & df['longitude'].between(BRAZIL_BBOX['min_lon'], BRAZIL_BBOX['max_lon'])
+    )
+    df = df[in_brazil]
+    
+    site_key = [col for col in ('station_id', 'latitude', 'longitude') if col in df.columns]
+    df = df.drop_duplicates(subset=site_key)
+    
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    return df.reset_index(drop=True)
+
+
+def file_sha256(path: Path, block_size: int = 1024 ** 2) -> str:
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_to_cache(task: Tuple[Path, Path]) -> Tuple[str, int]:
+    """Worker: parse one export and write the parse to its cache file"""
+    path, cache_path = task
+    df = parse_anatel_file(path)
+    temp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(temp_path, engine='pyarrow', compression='zstd', index=False)
+        os.replace(temp_path, cache_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return str(path), len(df)
+
+
+class AnatelLoader:
+    """
+    Load ANATEL towers from every export in a directory
+    
+    Each export's parse is cached as Parquet named by the file's SHA-256.
+    An index records each file's size, mtime and hash, so an unchanged file
+    is neither re-hashed nor re-parsed; a file whose mtime changed is
+    re-hashed and only re-parsed if its contents did. Files that need
+    parsing are parsed in parallel worker processes, which write their
+    cache entries directly instead of sending frames back.
+    """
+    
+    def __init__(self, cache_dir: Path, workers: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory of cached parses and their index
+            workers: Parser processes (None for all cores, 1 for serial)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.index_path = self.cache_dir / INDEX_FILENAME
+    
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self, index: Dict[str, Dict]):
+        temp_path = self.index_path.with_name(f".{self.index_path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+    
+    def _cache_path(self, sha256: str) -> Path:
+        return self.cache_dir / f"{sha256[:24]}_v{PARSER_VERSION}.parquet"
+    
+    def _resolve(self, path: Path, index: Dict[str, Dict]) -> Dict:
+        """Index entry of a file, re-hashing it only if its size or mtime changed"""
+        stat = path.stat()
+        entry = index.get(str(path))
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(path)}
+    
+    def load(self, files: Iterable[Path]) -> pd.DataFrame:
+        """
+        Typed ANATEL tower table from the given exports
+        
+        Returns:
+            DataFrame with one row per station site (empty if nothing parsed)
+        """
+        files = sorted(set(Path(f) for f in files))
+        if not files:
+            return pd.DataFrame()
+        
+        if not PYARROW_AVAILABLE:
+            return self._combine([self._parse_uncached(path) for path in files])
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index = self._load_index()
+        entries = {path: self._resolve(path, index) for path in files}
+        
+        tasks = [
+            (path, self._cache_path(entry['sha256']))
+            for path, entry in entries.items()
+            if not self._cache_path(entry['sha256']).exists()
+        ]
+        # Identical exports under different names are parsed once
+        tasks = list({cache_path: (path, cache_path) for path, cache_path in tasks}.values())
+        logger.info(f"ANATEL exports: {len(files)} found, {len(files) - len(tasks)} unchanged, "
+                    f"{len(tasks)} to parse")
+        
+        failed = set(self._parse_all(tasks))
+        
+        frames = []
+        for path, entry in entries.items():
+            cache_path = self._cache_path(entry['sha256'])
+            if cache_path in failed or not cache_path.exists():
+                continue
+            index[str(path)] = entry
+            frames.append(pd.read_parquet(cache_path, engine='pyarrow'))
+        
+        index = {key: value for key, value in index.items() if Path(key) in entries}
+        self._save_index(index)
+        return self._combine(frames)
+    
+    def _parse_all(self, tasks: List[Tuple[Path, Path]]) -> List[Path]:
+        """Parse exports into the cache; returns cache paths of failed parses"""
+        if not tasks:
+            return []
+        
+        workers = self.workers if self.workers is not None else os.cpu_count() or 1
+        workers = max(1, min(workers, len(tasks)))
+        # Pool workers are daemonic and may not start processes of their own
+        if multiprocessing.current_process().daemon:
+            workers = 1
+        
+        failed = []
+        if workers > 1:
+            logger.info(f"  Parsing {len(tasks)} ANATEL exports across {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_parse_to_cache, task): task for task in tasks}
+                for future, (path, cache_path) in futures.items():
+                    try:
+                        _, rows = future.result()
+                        logger.info(f"  Parsed {path.name}: {rows} stations")
+                    except Exception as e:
+                        logger.warning(f"Could not parse ANATEL export {path.name}: {str(e)}")
+                        failed.append(cache_path)
+        else:
+            for path, cache_path in tasks:
+                try:
+                    _, rows = _parse_to_cache((path, cache_path))
+                    logger.info(f"  Parsed {path.name}: {rows} stations")
+                except Exception as e:
+                    logger.warning(f"Could not parse ANATEL export {path.name}: {str(e)}")
+                    failed.append(cache_path)
+        return failed
+    
+    @staticmethod
+    def _parse_uncached(path: Path) -> pd.DataFrame:
+        try:
+            return parse_anatel_file(path)
+        except Exception as e:
+            logger.warning(f"Could not parse ANATEL export {path.name}: {str(e)}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def _combine(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate per-file parses, dropping sites listed in several exports"""
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        
+        df = pd.concat(frames, ignore_index=True)
+        site_key = [col for col in ('station_id', 'latitude', 'longitude') if col in df.columns]
+        df = df.drop_duplicates(subset=site_key).reset_index(drop=True)
+        # Categories differ between files, so the concatenation falls back to text
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
@@ -0,0 +1,278 @@
+"""
+Coverage Analyzer
+Rasterise Brazil into a regular grid, compute distance-to-nearest-tower per
+cell and extract coverage gap clusters with connected-component labelling
+"""
+
+import logging
+import time
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from spatial_index import SpatialIndex, LATITUDE_COLUMNS, LONGITUDE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Optional connected-component labelling
+try:
+    from scipy import ndimage
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    logger.warning("scipy not available - coverage gap clustering will be skipped")
+
+KM_PER_DEGREE = 111.32
+
+# Brazil bounding box (degrees)
+BRAZIL_BOUNDS = {
+    'min_lat': -33.75,
+    'max_lat': 5.27,
+    'min_lon': -73.99,
+    'max_lon': -34.79,
+}
+
+# Gap priority thresholds: (minimum gap area in km², minimum external towers in gap)
+PRIORITY_THRESHOLDS = {
+    'High': (10000.0, 10),
+    'Medium': (2500.0, 1),
+}
+
+
+class CoverageAnalyzer:
+    """Identify coverage gaps in the Nova Corrente tower network"""
+    
+    def __init__(self, nc_towers: pd.DataFrame, external_towers: Optional[pd.DataFrame] = None,
+                 bounds: Optional[Dict[str, float]] = None):
+        self.nc_towers = nc_towers
+        self.external_towers = external_towers if external_towers is not None else pd.DataFrame()
+        self.bounds = bounds or BRAZIL_BOUNDS
+        self.nc_index = SpatialIndex(nc_towers) if not nc_towers.empty else None
+        self.external_coords = self._extract_coords(self.external_towers)
+    
+    def build_grid(self, grid_resolution_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cell-center latitudes and longitudes of the analysis raster
+        
+        Cells are square in degrees (grid_resolution_km at the equator), so
+        they are never wider than the requested resolution.
+        """
+        step = grid_resolution_km / KM_PER_DEGREE
+        lats = np.arange(self.bounds['min_lat'] + step / 2, self.bounds['max_lat'], step)
+        lons = np.arange(self.bounds['min_lon'] + step / 2, self.bounds['max_lon'], step)
+        return lats, lons
+    
+    def distance_raster(self, index: SpatialIndex, lats: np.ndarray, lons: np.ndarray,
+                        max_distance_km: float, rows_per_block: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distance from every cell center to the nearest indexed tower
+        
+        The raster is queried in row blocks to keep memory bounded at fine
+        resolutions. Cells further than max_distance_km get inf and index -1.
+        
+        Returns:
+            Tuple of (float32 distance raster in km, int32 nearest-tower raster)
+        """
+        distances = np.full((len(lats), len(lons)), np.inf, dtype=np.float32)
+        nearest = np.full((len(lats), len(lons)), -1, dtype=np.int32)
+        
+        for start in range(0, len(lats), rows_per_block):
+            block_lats = lats[start:start + rows_per_block]
+            grid_lat, grid_lon = np.meshgrid(block_lats, lons, indexing='ij')
+            block_dist, block_idx = index.query_nearest(
+                grid_lat.ravel(), grid_lon.ravel(), k=1, max_distance_m=max_distance_km * 1000
+            )
+            distances[start:start + len(block_lats)] = (block_dist[:, 0] / 1000).reshape(grid_lat.shape)
+            nearest[start:start + len(block_lats)] = block_idx[:, 0].reshape(grid_lat.shape)
+        
+        return distances, nearest
+    
+    def identify_coverage_gaps(self, grid_resolution_km: float = 5,
+                               min_tower_distance_km: float = 20,
+                               max_gap_distance_km: float = 50) -> pd.DataFrame:
+        """
+        Identify clusters of under-served grid cells
+        
+        A cell is a gap when its nearest Nova Corrente tower is further than
+        min_tower_distance_km while some tower (Nova Corrente or external) is
+        within max_gap_distance_km, i.e. it borders existing demand but is not
+        served by the network. Adjacent gap cells (8-connectivity) form one gap.
+        
+        Args:
+            grid_resolution_km: Raster cell size
+            min_tower_distance_km: Distance beyond which a cell is under-served
+            max_gap_distance_km: Only consider cells this close to any tower
+        
+        Returns:
+            DataFrame with one row per gap cluster, largest first
+        """
+        logger.info(f"Rasterising coverage at {grid_resolution_km} km resolution...")
+        
+        if self.nc_index is None or len(self.nc_index) == 0:
+            logger.warning("No Nova Corrente towers with coordinates - skipping gap analysis")
+            return pd.DataFrame()
+        
+        if not SCIPY_AVAILABLE:
+            logger.warning("scipy not available - skipping gap analysis")
+            return pd.DataFrame()
+        
+        lats, lons = self.build_grid(grid_resolution_km)
+        logger.info(f"  Grid: {len(lats)} x {len(lons)} = {len(lats) * len(lons):,} cells")
+        
+        nc_distance, nc_nearest = self.distance_raster(self.nc_index, lats, lons, max_gap_distance_km)
+        
+        # Cells near any known tower mark where coverage is expected
+        if len(self.external_coords) > 0:
+            all_coords = np.vstack([self._extract_coords(self.nc_towers), self.external_coords])
+            all_towers = pd.DataFrame({'latitude': all_coords[:, 0], 'longitude': all_coords[:, 1]})
+            any_distance, _ = self.distance_raster(SpatialIndex(all_towers), lats, lons, max_gap_distance_km)
+        else:
+            any_distance = nc_distance
+        
+        gap_mask = (nc_distance > min_tower_distance_km) & (any_distance <= max_gap_distance_km)
+        
+        # Gap cells beyond the bounded search radius still need their true distance
+        unresolved = np.flatnonzero(gap_mask & np.isinf(nc_distance))
+        if len(unresolved) > 0:
+            rows, cols = np.divmod(unresolved, len(lons))
+            far_dist, far_idx = self.nc_index.query_nearest(lats[rows], lons[cols], k=1)
+            nc_distance.ravel()[unresolved] = far_dist[:, 0] / 1000
+            nc_nearest.ravel()[unresolved] = far_idx[:, 0]
+        
+        labels, num_gaps = ndimage.label(gap_mask, structure=np.ones((3, 3), dtype=bool))
+        logger.info(f"  {int(gap_mask.sum()):,} gap cells in {num_gaps} clusters")
+        
+        if num_gaps == 0:
+            return pd.DataFrame()
+        
+        gaps = self._summarise_gaps(labels, num_gaps, lats, lons, nc_distance, nc_nearest, grid_resolution_km)
+        
+        logger.info(f"✓ Identified {len(gaps)} coverage gaps "
+                    f"({(gaps['priority'] == 'High').sum()} high priority)")
+        return gaps
+    
+    def _summarise_gaps(self, labels: np.ndarray, num_gaps: int, lats: np.ndarray, lons: np.ndarray,
+                        nc_distance: np.ndarray, nc_nearest: np.ndarray,
+                        grid_resolution_km: float) -> pd.DataFrame:
+        """Per-cluster statistics computed over the gap cells only"""
+        gap_cells = np.flatnonzero(labels)
+        cell_labels = labels.ravel()[gap_cells]
+        rows, cols = np.divmod(gap_cells, labels.shape[1])
+        cell_distance = nc_distance.ravel()[gap_cells].astype(np.float64)
+        
+        cell_count = np.bincount(cell_labels, minlength=num_gaps + 1)[1:]
+        step = grid_resolution_km / KM_PER_DEGREE
+        center_lat = lats[0] + np.bincount(cell_labels, rows, num_gaps + 1)[1:] / cell_count * step
+        center_lon = lons[0] + np.bincount(cell_labels, cols, num_gaps + 1)[1:] / cell_count * step
+        
+        # Cell area shrinks with cos(latitude) because cells are square in degrees
+        cell_area = (grid_resolution_km ** 2) * np.cos(np.radians(lats))
+        area_km2 = np.bincount(cell_labels, cell_area[rows], num_gaps + 1)[1:]
+        mean_distance = np.bincount(cell_labels, cell_distance, num_gaps + 1)[1:] / cell_count
+        
+        # Farthest cell of each gap: last cell per label after sorting by (label, distance)
+        order = np.lexsort((cell_distance, cell_labels))
+        group_ends = np.append(np.flatnonzero(np.diff(cell_labels[order])), len(order) - 1)
+        farthest = order[group_ends]
+        max_distance = cell_distance[farthest]
+        
+        # Tower nearest to the farthest cell of each gap
+        nearest_pos = nc_nearest.ravel()[gap_cells[farthest]]
+        nearest_ids = np.where(nearest_pos >= 0, self.nc_index.tower_ids[np.maximum(nearest_pos, 0)], None)
+        
+        external_in_gap = self._count_external_in_gaps(labels, num_gaps, lats, lons, step)
+        
+        gaps = pd.DataFrame({
+            'gap_id': [f"GAP-{gap_id:05d}" for gap_id in range(1, num_gaps + 1)],
+            'latitude': np.round(center_lat, 6),
+            'longitude': np.round(center_lon, 6),
+            'cell_count': cell_count,
+            'area_km2': np.round(area_km2, 1),
+            'mean_distance_km': np.round(mean_distance, 2),
+            'max_distance_km': np.round(max_distance, 2),
+            'nearest_tower_id': nearest_ids,
+            'external_towers_in_gap': external_in_gap,
+        })
+        gaps['priority'] = self._classify_priority(gaps)
+        
+        return gaps.sort_values('area_km2', ascending=False).reset_index(drop=True)
+    
+    def _count_external_in_gaps(self, labels: np.ndarray, num_gaps: int, lats: np.ndarray,
+                                lons: np.ndarray, step: float) -> np.ndarray:
+        """Number of external towers falling inside each gap cluster"""
+        if len(self.external_coords) == 0:
+            return np.zeros(num_gaps, dtype=np.int64)
+        
+        rows = np.floor((self.external_coords[:, 0] - (lats[0] - step / 2)) / step).astype(np.int64)
+        cols = np.floor((self.external_coords[:, 1] - (lons[0] - step / 2)) / step).astype(np.int64)
+        inside = (rows >= 0) & (rows < labels.shape[0]) & (cols >= 0) & (cols < labels.shape[1])
+        tower_labels = labels[rows[inside], cols[inside]]
+        return np.bincount(tower_labels, minlength=num_gaps + 1)[1:]
+    
+    @staticmethod
+    def _classify_priority(gaps: pd.DataFrame) -> np.ndarray:
+        """Gap priority from area and external demand"""
+        conditions = [
+            (gaps['area_km2'] >= min_area) | (gaps['external_towers_in_gap'] >= min_external)
+            for min_area, min_external in PRIORITY_THRESHOLDS.values()
+        ]
+        return np.select(conditions, list(PRIORITY_THRESHOLDS), default='Low')
+    
+    def _extract_coords(self, df: pd.DataFrame) -> np.ndarray:
+        """Valid (lat, lon) pairs of a tower DataFrame as an (n, 2) array"""
+        if df.empty or self._lat_col(df) is None or self._lon_col(df) is None:
+            return np.empty((0, 2))
+        coords = np.column_stack([
+            pd.to_numeric(df[self._lat_col(df)], errors='coerce').to_numpy(dtype=float),
+            pd.to_numeric(df[self._lon_col(df)], errors='coerce').to_numpy(dtype=float),
+        ])
+        return coords[~np.isnan(coords).any(axis=1)]
+    
+    @staticmethod
+    def _lat_col(df: pd.DataFrame) -> Optional[str]:
+        return next((col for col in LATITUDE_COLUMNS if col in df.columns), None)
+    
+    @staticmethod
+    def _lon_col(df: pd.DataFrame) -> Optional[str]:
+        return next((col for col in LONGITUDE_COLUMNS if col in df.columns), None)
+
+
+# Run time budgets of identify_coverage_gaps (grid resolution km -> seconds)
+BENCHMARK_BUDGETS_S = {5: 10.0, 1: 120.0}
+
+
+def benchmark(nc_count: int = 18000, external_count: int = 50000, seed: int = 0) -> pd.DataFrame:
+    """
+    Time identify_coverage_gaps on synthetic inventories against BENCHMARK_BUDGETS_S
+    
+    Towers are clustered around random centres inside the Brazil bounding
+    box, like real deployments around cities.
+    
+    Returns:
+        DataFrame with resolution, seconds, budget, gap count and whether
+        the run stayed within budget
+    """
+    rng = np.random.default_rng(seed)
+    centres = np.column_stack([
+        rng.uniform(BRAZIL_BOUNDS['min_lat'], BRAZIL_BOUNDS['max_lat'], 300),
+        rng.uniform(BRAZIL_BOUNDS['min_lon'], BRAZIL_BOUNDS['max_lon'], 300),
+    ])
+    
+    def towers(count: int) -> pd.DataFrame:
+        coords = centres[rng.integers(0, len(centres), count)] + rng.normal(0, 0.5, (count, 2))
+        return pd.DataFrame({'latitude': coords[:, 0], 'longitude': coords[:, 1]})
+    
+    analyzer = CoverageAnalyzer(towers(nc_count), towers(external_count))
+    results = []
+    for resolution_km, budget_s in BENCHMARK_BUDGETS_S.items():
+        started = time.perf_counter()
+        gaps = analyzer.identify_coverage_gaps(grid_resolution_km=resolution_km)
+        elapsed = time.perf_counter() - started
+        results.append({'grid_resolution_km': resolution_km, 'seconds': round(elapsed, 2),
+                        'budget_s': budget_s, 'gaps': len(gaps), 'within_budget': elapsed <= budget_s})
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    print(benchmark().to_string(index=False))
@@ -10,7 +10,12 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import os
 import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from tower_inventory_store import TowerInventoryStore
 
 # Setup logging
 logging.basicConfig(
@@ -24,17 +29,38 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 FRONTEND_DIR = PROJECT_ROOT / "frontend" / "src" / "app" / "features" / "towers"
 
+# Site code classification rules, checked in order: (match type, patterns, site type)
+# Match type is 'contains' or 'prefix'; patterns are compared against the upper-cased code
+SITE_TYPE_RULES = [
+    ('contains', ('ESCRITÓRIO', 'OFFICE'), 'OFFICE'),
+    ('prefix', ('SPP-', 'SPCRL', 'ALPSS', 'BAJSS', 'BR'), 'TOWER'),
+]
+
 
 class TowerLocationExtractor:
     """Extract and consolidate tower location data from multiple sources"""
     
-    def __init__(self):
+    TOWER_COLUMNS = [
+        'tower_id', 'latitude', 'longitude', 'maintenance_zone', 'zone_type',
+        'region', 'state_code', 'state_name', 'tower_type', 'status', 'priority',
+        'height_meters', 'last_maintenance', 'next_maintenance', 'operator_count',
+        'signal_strength', 'uptime_percent',
+    ]
+    STATUS_VALUES = np.array(['maintenance', 'active', 'inactive'])
+    STATUS_WEIGHTS = [0.70, 0.25, 0.05]
+    PRIORITY_VALUES = np.array(['High', 'Medium', 'Low'])
+    
+    def __init__(self, site_type_rules: Optional[List[Tuple[str, Tuple[str, ...], str]]] = None,
+                 default_site_type: str = 'TOWER'):
         self.project_root = PROJECT_ROOT
         self.data_dir = DATA_DIR
         self.maintenance_zones = []
         self.nova_corrente_sites = None
         self.infrastructure_data = None
         self.warehouse_sites = None
+        self.site_type_rules = site_type_rules if site_type_rules is not None else SITE_TYPE_RULES
+        self.default_site_type = default_site_type
+        self._site_type_cache: Dict[str, str] = {}
         
     def extract_maintenance_zones(self) -> pd.DataFrame:
         """
@@ -94,10 +120,17 @@ class TowerLocationExtractor:
         
         return df_zones
     
-    def extract_nova_corrente_sites(self) -> pd.DataFrame:
+    def extract_nova_corrente_sites(self, chunksize: int = 250000) -> pd.DataFrame:
         """
         Extract site information from Nova Corrente enriched CSV
         Returns DataFrame with unique sites
+        
+        The CSV is streamed in chunks and only the site columns are parsed, so
+        memory stays bounded by the number of distinct sites rather than the
+        size of the enriched history.
+        
+        Args:
+            chunksize: Number of CSV rows parsed per chunk
         """
         logger.info("Extracting Nova Corrente site data...")
         
@@ -108,54 +141,84 @@ class TowerLocationExtractor:
             return pd.DataFrame()
         
         try:
-            df = pd.read_csv(csv_path, low_memory=False)
-            
             # Extract unique sites
             site_cols = ['site_id', 'deposito']
-            if all(col in df.columns for col in site_cols):
-                sites_df = df[site_cols].drop_duplicates().copy()
-                
-                # Add site code patterns
-                sites_df['site_code'] = sites_df['deposito'].astype(str)
-                sites_df['site_type'] = sites_df['site_code'].apply(self._classify_site_type)
-                
-                # Count records per site
-                site_counts = df.groupby('site_id').size().reset_index(name='record_count')
-                sites_df = sites_df.merge(site_counts, on='site_id', how='left')
-                
-                self.nova_corrente_sites = sites_df
-                
-                logger.info(f"✓ Extracted {len(sites_df)} unique sites from Nova Corrente data")
-                logger.info(f"  Site codes found: {sites_df['site_code'].nunique()}")
-                
-                return sites_df
-            else:
+            header = pd.read_csv(csv_path, nrows=0).columns
+            if not all(col in header for col in site_cols):
                 logger.warning("Required columns not found in Nova Corrente CSV")
                 return pd.DataFrame()
+            
+            # Read keys as strings so every chunk agrees on their type
+            reader = pd.read_csv(csv_path, usecols=site_cols, dtype=str, chunksize=chunksize)
+            
+            # (site_id, deposito) pairs in first-seen order, and records per site
+            site_pairs = {}
+            site_counts = {}
+            for chunk in reader:
+                pair_counts = chunk.groupby(site_cols, sort=False, dropna=False).size()
+                for (site_id, deposito), count in pair_counts.items():
+                    site_pairs.setdefault((site_id, deposito), None)
+                    site_counts[site_id] = site_counts.get(site_id, 0) + int(count)
+            
+            sites_df = pd.DataFrame(list(site_pairs), columns=site_cols)
+            
+            # Add site code patterns
+            sites_df['site_code'] = sites_df['deposito'].astype(str)
+            sites_df['site_type'] = self.classify_site_types(sites_df['site_code'])
+            
+            # Count records per site
+            sites_df['record_count'] = sites_df['site_id'].map(site_counts)
+            
+            self.nova_corrente_sites = sites_df
+            
+            logger.info(f"✓ Extracted {len(sites_df)} unique sites from Nova Corrente data")
+            logger.info(f"  Site codes found: {sites_df['site_code'].nunique()}")
+            
+            return sites_df
                 
         except Exception as e:
             logger.error(f"Error reading Nova Corrente CSV: {str(e)}")
             return pd.DataFrame()
     
-    def _classify_site_type(self, site_code: str) -> str:
-        """Classify site type based on site code pattern"""
-        if pd.isna(site_code) or site_code == 'nan':
-            return 'UNKNOWN'
-        
-        code = str(site_code).upper()
-        
-        if 'ESCRITÓRIO' in code or 'OFFICE' in code:
-            return 'OFFICE'
-        elif code.startswith('SPP-') or code.startswith('SPCRL'):
-            return 'TOWER'
-        elif code.startswith('ALPSS'):
-            return 'TOWER'
-        elif code.startswith('BAJSS'):
-            return 'TOWER'
-        elif code.startswith('BR'):
-            return 'TOWER'
-        else:
-            return 'TOWER'  # Default to tower
+    def classify_site_types(self, site_codes: pd.Series) -> pd.Series:
+        """
+        Classify site types for a Series of site codes
+        
+        Each distinct code is classified once against ``self.site_type_rules``
+        (first matching rule wins) and the result is cached on the extractor,
+        so classifying millions of movement records costs one pass per new code.
+        
+        Args:
+            site_codes: Series of raw site codes
+            
+        Returns:
+            Series of site types aligned with ``site_codes``
+        """
+        codes, uniques = pd.factorize(site_codes.astype(str))
+        uniques = pd.Series(uniques)
+        
+        unseen = uniques[~uniques.isin(list(self._site_type_cache))]
+        if len(unseen) > 0:
+            upper = unseen.str.upper()
+            types = pd.Series(self.default_site_type, index=unseen.index, dtype=object)
+            matched = pd.Series(False, index=unseen.index)
+            
+            for match_type, patterns, site_type in self.site_type_rules:
+                if match_type == 'prefix':
+                    hits = upper.str.startswith(tuple(patterns))
+                else:
+                    hits = pd.Series(False, index=unseen.index)
+                    for pattern in patterns:
+                        hits |= upper.str.contains(pattern, regex=False)
+                hits &= ~matched
+                types[hits] = site_type
+                matched |= hits
+            
+            types[unseen == 'nan'] = 'UNKNOWN'
+            self._site_type_cache.update(zip(unseen, types))
+        
+        unique_types = uniques.map(self._site_type_cache).to_numpy()
+        return pd.Series(unique_types[codes], index=site_codes.index, name='site_type')
     
     def extract_infrastructure_planning(self) -> pd.DataFrame:
         """
@@ -224,82 +287,129 @@ class TowerLocationExtractor:
             logger.error(f"Error reading DimSite parquet: {str(e)}")
             return pd.DataFrame()
     
-    def generate_tower_coordinates(self, zone_data: pd.DataFrame) -> pd.DataFrame:
+    def generate_tower_coordinates(self, zone_data: pd.DataFrame,
+                                   seed: Optional[int] = 42,
+                                   workers: Optional[int] = 1,
+                                   zone_names: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Generate individual tower coordinates within maintenance zones
         Uses Gaussian distribution around zone centers
         
+        All attributes for a zone are drawn in one batch as NumPy arrays and
+        the DataFrame is assembled column-wise, so generation scales to
+        inventories far larger than the 18,000-tower baseline.
+        
+        Each zone draws from its own child stream of a SeedSequence keyed by
+        the zone name, and tower IDs are assigned from the zone table up front.
+        The output is therefore identical for any worker count or zone order,
+        and a single zone can be regenerated on its own via ``zone_names``.
+        
         Args:
             zone_data: DataFrame with maintenance zone information
+            seed: Seed for reproducible output (None for a fresh random draw)
+            workers: Number of worker processes (None for all cores, 1 for serial)
+            zone_names: Only generate these zones (tower IDs are unchanged)
             
         Returns:
             DataFrame with individual tower locations
         """
         logger.info("Generating individual tower coordinates...")
         
-        towers = []
-        tower_id_counter = 1
+        # Resolve the root entropy once so every zone shares it, even when unseeded
+        root_entropy = np.random.SeedSequence(seed).entropy
         
-        np.random.seed(42)  # For reproducibility
+        zones = zone_data.to_dict('records')
+        start_ids = np.cumsum([1] + [int(zone['towers']) for zone in zones[:-1]])
         
-        for _, zone in zone_data.iterrows():
-            zone_name = zone['name']
-            center_lat = zone['center_lat']
-            center_lon = zone['center_lon']
-            radius = zone['radius']
-            num_towers = int(zone['towers'])
-            zone_type = zone['type']
-            region = zone['region']
-            
-            logger.debug(f"Generating {num_towers} towers for zone: {zone_name}")
-            
-            for i in range(num_towers):
-                # Gaussian distribution around zone center
-                angle = np.random.uniform(0, 2 * np.pi)
-                
-                # Use Gaussian distribution for distance (truncated at radius)
-                distance = abs(np.random.normal(0, radius / 3))
-                distance = min(distance, radius * 0.9)  # Keep within 90% of radius
-                
-                # Convert distance (in degrees, approximate) to lat/lon offset
-                # 1 degree latitude ≈ 111 km, 1 degree longitude ≈ 111 km * cos(latitude)
-                lat_offset = distance * np.cos(angle) / 111.0
-                lon_offset = distance * np.sin(angle) / (111.0 * np.cos(np.radians(center_lat)))
-                
-                lat = center_lat + lat_offset
-                lon = center_lon + lon_offset
-                
-                # Generate tower attributes
-                tower = {
-                    'tower_id': f"NCA-{str(tower_id_counter).zfill(6)}",
-                    'latitude': round(lat, 6),
-                    'longitude': round(lon, 6),
-                    'maintenance_zone': zone_name,
-                    'zone_type': zone_type,
-                    'region': region,
-                    'state_code': self._get_state_from_zone(zone_name),
-                    'state_name': self._get_state_name_from_zone(zone_name),
-                    'tower_type': self._infer_tower_type(zone_type),
-                    'status': self._generate_status(),
-                    'priority': self._generate_priority(zone_type),
-                    'height_meters': np.random.randint(18, 65),
-                    'last_maintenance': self._generate_date(),
-                    'next_maintenance': self._generate_future_date(),
-                    'operator_count': np.random.randint(2, 6),
-                    'signal_strength': np.random.randint(65, 100),
-                    'uptime_percent': round(np.random.uniform(92.0, 99.9), 1),
-                }
-                
-                towers.append(tower)
-                tower_id_counter += 1
+        tasks = [
+            (zone, root_entropy, int(start_id))
+            for zone, start_id in zip(zones, start_ids)
+            if zone_names is None or zone['name'] in zone_names
+        ]
         
-        df_towers = pd.DataFrame(towers)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(tasks)))
+        
+        if workers > 1:
+            logger.info(f"  Generating {len(tasks)} zones across {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                zone_frames = list(executor.map(_generate_zone_worker, tasks))
+        else:
+            zone_frames = [_generate_zone_worker(task) for task in tasks]
+        
+        if zone_frames:
+            df_towers = pd.concat(zone_frames, ignore_index=True)
+        else:
+            df_towers = pd.DataFrame(columns=self.TOWER_COLUMNS)
         
         logger.info(f"✓ Generated {len(df_towers)} individual tower coordinates")
         logger.info(f"  Total towers: {df_towers['tower_id'].nunique()}")
         
         return df_towers
     
+    @staticmethod
+    def zone_seed_sequence(root_entropy: int, zone_name: str) -> np.random.SeedSequence:
+        """Child seed stream for a zone, independent of its position in the zone table"""
+        zone_key = zlib.crc32(zone_name.encode('utf-8'))
+        return np.random.SeedSequence(root_entropy, spawn_key=(zone_key,))
+    
+    def _generate_zone_towers(self, zone: Dict, rng: np.random.Generator,
+                              start_id: int) -> pd.DataFrame:
+        """
+        Generate every tower of a single zone in one vectorized batch
+        
+        Args:
+            zone: Maintenance zone record (name, center, radius, towers, type, region)
+            rng: NumPy random generator to draw from
+            start_id: Numeric ID of the first tower in the zone
+            
+        Returns:
+            DataFrame with one row per tower, columns in TOWER_COLUMNS order
+        """
+        zone_name = zone['name']
+        center_lat = zone['center_lat']
+        center_lon = zone['center_lon']
+        radius = zone['radius']
+        num_towers = int(zone['towers'])
+        zone_type = zone['type']
+        
+        # Gaussian distribution around zone center
+        angle = rng.uniform(0, 2 * np.pi, num_towers)
+        
+        # Use Gaussian distribution for distance (truncated at radius)
+        distance = np.abs(rng.normal(0, radius / 3, num_towers))
+        distance = np.minimum(distance, radius * 0.9)  # Keep within 90% of radius
+        
+        # Convert distance (in degrees, approximate) to lat/lon offset
+        # 1 degree latitude ≈ 111 km, 1 degree longitude ≈ 111 km * cos(latitude)
+        lat = center_lat + distance * np.cos(angle) / 111.0
+        lon = center_lon + distance * np.sin(angle) / (111.0 * np.cos(np.radians(center_lat)))
+        
+        tower_numbers = np.arange(start_id, start_id + num_towers).astype(str)
+        
+        columns = {
+            'tower_id': np.char.add('NCA-', np.char.zfill(tower_numbers, 6)),
+            'latitude': np.round(lat, 6),
+            'longitude': np.round(lon, 6),
+            'maintenance_zone': zone_name,
+            'zone_type': zone_type,
+            'region': zone['region'],
+            'state_code': self._get_state_from_zone(zone_name),
+            'state_name': self._get_state_name_from_zone(zone_name),
+            'tower_type': self._infer_tower_type(zone_type),
+            'status': self._generate_status(rng, num_towers),
+            'priority': self._generate_priority(rng, zone_type, num_towers),
+            'height_meters': rng.integers(18, 65, num_towers),
+            'last_maintenance': self._generate_date(rng, num_towers, 2024),
+            'next_maintenance': self._generate_date(rng, num_towers, 2025),
+            'operator_count': rng.integers(2, 6, num_towers),
+            'signal_strength': rng.integers(65, 100, num_towers),
+            'uptime_percent': np.round(rng.uniform(92.0, 99.9, num_towers), 1),
+        }
+        
+        return pd.DataFrame(columns, index=pd.RangeIndex(num_towers))
+    
     def _get_state_from_zone(self, zone_name: str) -> str:
         """Extract state code from zone name"""
         state_map = {
@@ -352,34 +462,25 @@ class TowerLocationExtractor:
         }
         return type_map.get(zone_type, 'Macro')
     
-    def _generate_status(self) -> str:
-        """Generate random status weighted toward maintenance"""
-        rand = np.random.random()
-        if rand < 0.70:
-            return 'maintenance'
-        elif rand < 0.95:
-            return 'active'
-        else:
-            return 'inactive'
+    def _generate_status(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Generate random statuses weighted toward maintenance"""
+        return rng.choice(self.STATUS_VALUES, size=size, p=self.STATUS_WEIGHTS)
     
-    def _generate_priority(self, zone_type: str) -> str:
-        """Generate priority based on zone type"""
+    def _generate_priority(self, rng: np.random.Generator, zone_type: str, size: int) -> np.ndarray:
+        """Generate priorities based on zone type"""
         if zone_type in ['metropolitan', 'institutional']:
-            return np.random.choice(['High', 'Medium', 'Low'], p=[0.5, 0.3, 0.2])
+            weights = [0.5, 0.3, 0.2]
         else:
-            return np.random.choice(['High', 'Medium', 'Low'], p=[0.3, 0.4, 0.3])
+            weights = [0.3, 0.4, 0.3]
+        return rng.choice(self.PRIORITY_VALUES, size=size, p=weights)
     
-    def _generate_date(self) -> str:
-        """Generate random date in 2024"""
-        month = np.random.randint(1, 13)
-        day = np.random.randint(1, 29)
-        return f"{month:02d}/{day:02d}/2024"
-    
-    def _generate_future_date(self) -> str:
-        """Generate random future date in 2025"""
-        month = np.random.randint(1, 13)
-        day = np.random.randint(1, 29)
-        return f"{month:02d}/{day:02d}/2025"
+    def _generate_date(self, rng: np.random.Generator, size: int, year: int) -> np.ndarray:
+        """Generate random MM/DD/YYYY dates within the given year"""
+        month = rng.integers(1, 13, size)
+        day = rng.integers(1, 29, size)
+        # Index into a 12x28 lookup table instead of formatting each date
+        dates = np.array([f"{m:02d}/{d:02d}/{year}" for m in range(1, 13) for d in range(1, 29)])
+        return dates[(month - 1) * 28 + (day - 1)]
     
     def consolidate_all_locations(self) -> pd.DataFrame:
         """
@@ -468,6 +569,16 @@ class TowerLocationExtractor:
         return towers_df
 
 
+def _generate_zone_worker(task: Tuple[Dict, int, int]) -> pd.DataFrame:
+    """Process-pool entry point: generate one zone from its own seed stream"""
+    zone, root_entropy, start_id = task
+    logger.debug(f"Generating {int(zone['towers'])} towers for zone: {zone['name']}")
+    
+    seed_seq = TowerLocationExtractor.zone_seed_sequence(root_entropy, zone['name'])
+    rng = np.random.default_rng(seed_seq)
+    return TowerLocationExtractor()._generate_zone_towers(zone, rng, start_id)
+
+
 def main():
     """Main execution function"""
     logger.info("=" * 80)
@@ -489,9 +600,8 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_file = output_dir / f"complete_tower_inventory_{timestamp}.csv"
-    
-    consolidated_df.to_csv(output_file, index=False, encoding='utf-8')
+    store = TowerInventoryStore(output_dir)
+    output_file = store.save(consolidated_df, 'complete_tower_inventory', timestamp, export_csv=True)
     logger.info(f"\n✓ Saved consolidated tower inventory to: {output_file}")
     logger.info(f"  Total towers: {len(consolidated_df)}")
     
@@ -12,6 +12,8 @@ from datetime import datetime
 import numpy as np
 import sys
 
+from tower_inventory_store import TowerInventoryStore
+
 # Optional imports for advanced formats
 try:
     from openpyxl import Workbook
@@ -477,17 +479,17 @@ class TowerLocationReportGenerator:
 def main():
     """Main execution function"""
     # Load consolidated tower data
-    tower_files = list(OUTPUT_DIR.glob("complete_tower_inventory_*.csv"))
+    store = TowerInventoryStore(OUTPUT_DIR)
+    latest_file = store.find_latest('complete_tower_inventory')
     
-    if not tower_files:
+    if latest_file is None:
         logger.error("No tower inventory file found. Run extract_tower_locations.py first.")
         return
     
     # Use most recent file
-    latest_file = max(tower_files, key=lambda p: p.stat().st_mtime)
     logger.info(f"Loading tower data from: {latest_file}")
     
-    df = pd.read_csv(latest_file)
+    df = store.load(latest_file)
     logger.info(f"Loaded {len(df)} towers")
     
     # Generate all reports
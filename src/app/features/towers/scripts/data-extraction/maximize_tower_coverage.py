@@ -6,6 +6,7 @@ and generates enhanced reports
 
 import logging
 import pandas as pd
+import numpy as np
 import json
 import time
 import os
@@ -18,7 +19,6 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent / "nova-corrente-workspace" / 
                    "feature-engineering" / "bifurcation-a-data-integration" / "features" / "towers"))
 
-from enhanced_data_fetcher import EnhancedDataFetcher
 from coverage_analyzer import CoverageAnalyzer
 from location_enricher import LocationEnricher
 from data_validator import DataValidator
@@ -27,6 +27,9 @@ from spatial_index import SpatialIndex
 # Import extraction and reporting modules
 sys.path.append(str(Path(__file__).parent))
 from extract_tower_locations import TowerLocationExtractor
+from tower_inventory_store import TowerInventoryStore
+from opencellid_loader import OpenCellIDLoader
+from anatel_loader import AnatelLoader
 from generate_tower_location_report import TowerLocationReportGenerator
 from integrate_research_assets import integrate_research_assets, ResearchAssetIntegrator
 from advanced_features import apply_advanced_features, ExportManager
@@ -41,7 +44,6 @@ from notification_system import NotificationSystem
 from ml_predictive_analytics import PredictiveAnalytics
 from advanced_caching import AdvancedCache
 from cost_optimizer import CostOptimizer
-from performance_profiler import PerformanceProfiler
 from advanced_reporting import AdvancedReporter
 from backend_integration import integrate_with_backend, BackendAPIClient
 from tower_categorical_integration import TowerCategoricalIntegration
@@ -52,8 +54,11 @@ from frontend_integration_helper import FrontendIntegrationHelper
 
 # Import utilities
 sys.path.append(str(Path(__file__).parent))
-from utils.timeout_handler import with_timeout, retry_with_backoff, timed_operation, safe_execute
+from utils.timeout_handler import with_timeout, retry_with_backoff, timed_operation, safe_execute, timeout_records
 from utils.progress_tracker import ProgressTracker
+from utils.stage_cache import StageCache
+from utils.stage_graph import Stage, StageGraph
+from utils.stage_telemetry import StageTelemetry, profiled
 
 # Setup logging
 logging.basicConfig(
@@ -68,6 +73,14 @@ OUTPUT_DIR = DATA_DIR / "outputs" / "tower_locations"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 CHECKPOINT_DIR = OUTPUT_DIR / "checkpoints"
 CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+STAGE_CACHE_DIR = OUTPUT_DIR / "stage_cache"
+STAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+TELEMETRY_DIR = OUTPUT_DIR / "telemetry"
+OPENCELLID_CACHE_PATH = DATA_DIR / "processed" / "opencellid" / "opencellid_brazil.parquet"
+ANATEL_CACHE_DIR = DATA_DIR / "processed" / "anatel"
+
+# Worker processes for independent bonus stages (unset: all cores, 1: serial)
+STAGE_WORKERS = int(os.getenv('TOWER_STAGE_WORKERS', '0')) or None
 
 # Timeout configurations (in seconds)
 TIMEOUTS = {
@@ -80,6 +93,13 @@ TIMEOUTS = {
     'generate_reports': 1800,  # 30 minutes
 }
 
+# Coverage gap analysis parameters
+COVERAGE_GAP_PARAMS = {
+    'grid_resolution_km': 5,
+    'min_tower_distance_km': 20,
+    'max_gap_distance_km': 50,
+}
+
 
 @with_timeout(TIMEOUTS['load_towers'], default_return=pd.DataFrame(), operation_name="Load Nova Corrente Towers")
 def load_nova_corrente_towers(progress_tracker: Optional[ProgressTracker] = None) -> pd.DataFrame:
@@ -93,12 +113,12 @@ def load_nova_corrente_towers(progress_tracker: Optional[ProgressTracker] = None
                 return checkpoint_data
         
         # Try to load from latest extraction
-        tower_files = list(OUTPUT_DIR.glob("complete_tower_inventory_*.csv"))
+        store = TowerInventoryStore(OUTPUT_DIR)
+        latest_file = store.find_latest('complete_tower_inventory')
         
-        if tower_files:
-            latest_file = max(tower_files, key=lambda p: p.stat().st_mtime)
+        if latest_file is not None:
             logger.info(f"Loading from: {latest_file}")
-            df = pd.read_csv(latest_file)
+            df = store.load(latest_file)
             logger.info(f"✓ Loaded {len(df)} Nova Corrente towers")
             
             # Save checkpoint
@@ -114,9 +134,7 @@ def load_nova_corrente_towers(progress_tracker: Optional[ProgressTracker] = None
         df = extractor.consolidate_all_locations()
         
         # Save for future use
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = OUTPUT_DIR / f"complete_tower_inventory_{timestamp}.csv"
-        df.to_csv(output_file, index=False, encoding='utf-8')
+        store.save(df, 'complete_tower_inventory', export_csv=True)
         
         # Save checkpoint
         if progress_tracker:
@@ -130,19 +148,16 @@ def fetch_anatel_all_states() -> pd.DataFrame:
     """Fetch ANATEL towers for all Brazilian states"""
     logger.info("Checking for ANATEL data...")
     
-    # Check if ANATEL data exists locally first
+    # National and per-state exports stored locally
     anatel_dir = DATA_DIR / "raw" / "anatel_comprehensive" / "towers"
-    tower_csv = anatel_dir / "tower_stations.csv" if anatel_dir.exists() else None
+    anatel_files = sorted(anatel_dir.glob("**/*.csv")) if anatel_dir.exists() else []
     
-    if tower_csv and tower_csv.exists():
-        logger.info(f"Found ANATEL CSV file: {tower_csv}")
+    if anatel_files:
+        logger.info(f"Found {len(anatel_files)} ANATEL CSV files in {anatel_dir}")
         try:
-            fetcher = EnhancedDataFetcher()
-            anatel_fetcher = fetcher.anatel_fetcher
-            # Try to parse the file
-            towers = anatel_fetcher.parse_anatel_csv(tower_csv)
-            if towers:
-                df = pd.DataFrame(towers)
+            loader = AnatelLoader(ANATEL_CACHE_DIR, workers=STAGE_WORKERS)
+            df = loader.load(anatel_files)
+            if not df.empty:
                 logger.info(f"✓ Loaded {len(df)} ANATEL towers from CSV")
                 return df
         except Exception as e:
@@ -153,25 +168,25 @@ def fetch_anatel_all_states() -> pd.DataFrame:
 
 
 def fetch_opencellid_brazil() -> pd.DataFrame:
-    """Fetch OpenCellID data for Brazil"""
+    """Fetch OpenCellID data for Brazil from every local dump"""
     logger.info("Checking for OpenCellID data...")
     
-    # Check for local OpenCellID files
+    # Check for local OpenCellID files (plain or gzipped CSV)
     opencellid_dir = DATA_DIR / "raw"
-    opencellid_files = list(opencellid_dir.glob("**/*opencellid*.csv"))
-    opencellid_files.extend(list(opencellid_dir.glob("**/*cell*tower*.csv")))
+    opencellid_files = set()
+    for pattern in ("*opencellid*.csv", "*opencellid*.csv.gz", "*cell*tower*.csv", "*cell*tower*.csv.gz"):
+        opencellid_files.update(opencellid_dir.glob(f"**/{pattern}"))
     
     if opencellid_files:
         logger.info(f"Found {len(opencellid_files)} OpenCellID files")
         try:
-            fetcher = EnhancedDataFetcher()
-            opencellid_fetcher = fetcher.opencellid_fetcher
-            df = opencellid_fetcher._process_opencellid_file(opencellid_files[0], sample_size=100000)
+            loader = OpenCellIDLoader(OPENCELLID_CACHE_PATH)
+            df = loader.load(opencellid_files)
             if not df.empty:
                 logger.info(f"✓ Loaded {len(df)} OpenCellID towers")
                 return df
         except Exception as e:
-            logger.warning(f"Could not process OpenCellID file: {str(e)}")
+            logger.warning(f"Could not process OpenCellID files: {str(e)}")
     
     logger.info("No OpenCellID data found - skipping (external data not required)")
     return pd.DataFrame()
@@ -230,25 +245,32 @@ def match_all_sources(nc_towers: pd.DataFrame, external_sources: list) -> tuple:
         all_matched = pd.DataFrame()
     
     # Merge with Nova Corrente towers
-    nc_towers_merged = nc_towers.copy()
+    nc_towers_merged = nc_towers.drop(
+        columns=['matched_external_sources', 'external_match_count'], errors='ignore'
+    )
     if not nc_towers_merged.empty:
         # Add match information to NC towers
-        nc_towers_merged['matched_external_sources'] = None
-        nc_towers_merged['external_match_count'] = 0
-        
         if not all_matched.empty and 'matched_tower_id' in all_matched.columns:
-            # Count matches per NC tower
-            matched_nc_ids = all_matched[all_matched['matched'] == True]['matched_tower_id'].value_counts()
-            
-            for tower_id, count in matched_nc_ids.items():
-                mask = nc_towers_merged['tower_id'] == tower_id
-                if mask.any():
-                    nc_towers_merged.loc[mask, 'external_match_count'] = count
-                    sources = all_matched[
-                        (all_matched['matched_tower_id'] == tower_id) & 
-                        (all_matched['matched'] == True)
-                    ]['external_source'].unique().tolist()
-                    nc_towers_merged.loc[mask, 'matched_external_sources'] = str(sources)
+            # Count matches and collect distinct sources per NC tower in one pass
+            matched_rows = all_matched[all_matched['matched'].fillna(False).astype(bool)]
+            match_summary = matched_rows.groupby('matched_tower_id', sort=False).agg(
+                external_match_count=('external_source', 'size'),
+                matched_external_sources=('external_source', 'unique'),
+            )
+            nc_towers_merged = nc_towers_merged.merge(
+                match_summary, left_on='tower_id', right_index=True, how='left'
+            )
+        else:
+            nc_towers_merged['external_match_count'] = np.nan
+            nc_towers_merged['matched_external_sources'] = None
+        
+        nc_towers_merged['external_match_count'] = (
+            nc_towers_merged['external_match_count'].fillna(0).astype(int)
+        )
+        nc_towers_merged['matched_external_sources'] = [
+            list(sources) if pd.api.types.is_list_like(sources) else []
+            for sources in nc_towers_merged['matched_external_sources']
+        ]
     
     logger.info(f"✓ Matched and merged {len(all_matched)} external towers")
     
@@ -260,11 +282,7 @@ def identify_coverage_gaps(nc_towers: pd.DataFrame, external_towers: pd.DataFram
     logger.info("Identifying coverage gaps...")
     
     analyzer = CoverageAnalyzer(nc_towers, external_towers)
-    gaps = analyzer.identify_coverage_gaps(
-        grid_resolution_km=5,
-        min_tower_distance_km=20,
-        max_gap_distance_km=50
-    )
+    gaps = analyzer.identify_coverage_gaps(**COVERAGE_GAP_PARAMS)
     
     logger.info(f"✓ Identified {len(gaps)} coverage gaps")
     return gaps
@@ -319,38 +337,324 @@ def generate_enhanced_report(enriched_df: pd.DataFrame, gaps_df: pd.DataFrame,
     return reports
 
 
-def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
+# Bonus stages
+# Each stage is a module-level function of its declared inputs so the stage
+# graph can run independent stages in worker processes. Feature stages
+# return only their new DataFrame and payload; JSON payloads are written by
+# the orchestrator once the graph has finished.
+
+def run_reports_stage(enriched: pd.DataFrame, gaps: pd.DataFrame, matched_towers: pd.DataFrame) -> Dict[str, Path]:
+    """Standard and coverage analysis reports"""
+    try:
+        return generate_enhanced_report(enriched, gaps, matched_towers)
+    except Exception as e:
+        logger.warning(f"Report generation failed: {str(e)} - some reports may be missing")
+        return {}
+
+
+def run_advanced_features_stage(enriched: pd.DataFrame) -> tuple:
+    """Advanced features and large-dataset optimization"""
+    try:
+        base_df, analytics_report = apply_advanced_features(enriched)
+        logger.info("✓ Advanced features applied")
+    except Exception as e:
+        logger.warning(f"Advanced features failed: {str(e)} - using standard data")
+        base_df, analytics_report = enriched, {}
+    
+    try:
+        base_df = optimize_for_large_datasets(base_df)
+        logger.info("✓ Dataset optimization complete")
+    except Exception as e:
+        logger.warning(f"Optimization failed: {str(e)}")
+    
+    return base_df, analytics_report
+
+
+def run_standard_export_stage(base_df: pd.DataFrame) -> Dict:
+    """Export to all standard formats"""
+    try:
+        exports = ExportManager(base_df, OUTPUT_DIR).export_all_formats("enhanced_tower_inventory")
+        logger.info(f"✓ Exported to {len(exports)} standard formats")
+        return exports
+    except Exception as e:
+        logger.warning(f"Standard export failed: {str(e)}")
+        return {}
+
+
+def run_advanced_export_stage(base_df: pd.DataFrame) -> Dict:
+    """Export to all advanced formats"""
+    try:
+        exports = AdvancedExportManager(base_df, OUTPUT_DIR).export_all_formats_advanced("enhanced_tower_inventory")
+        logger.info(f"✓ Exported to {len(exports)} advanced formats")
+        return exports
+    except Exception as e:
+        logger.warning(f"Advanced export failed: {str(e)}")
+        return {}
+
+
+def run_ml_stage(base_df: pd.DataFrame) -> tuple:
+    """ML predictive analytics"""
+    try:
+        ml_analytics = PredictiveAnalytics(base_df)
+        ml_analytics.predict_coverage_demand(future_days=30)
+        ml_analytics.predict_maintenance_needs()
+        ml_df = ml_analytics.optimize_tower_placement(target_coverage=95.0)
+        return ml_df, ml_analytics.generate_ml_insights()
+    except Exception as e:
+        logger.warning(f"ML analytics failed: {str(e)}")
+        return None, {}
+
+
+def run_visualization_stage(base_df: pd.DataFrame) -> Dict:
+    """Interactive maps, charts and visualization dashboard"""
+    try:
+        visualizer = EnhancedVisualizer(base_df, OUTPUT_DIR / "visualizations")
+        visualizer.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Create maps
+        main_map = visualizer.create_interactive_map("tower_map.html")
+        regional_maps = visualizer.create_regional_maps()
+        
+        # Create charts
+        charts = visualizer.create_statistical_charts()
+        
+        # Create dashboard
+        dashboard = visualizer.create_dashboard_html(regional_maps, charts)
+        
+        logger.info(f"✓ Created {len(regional_maps)} regional maps, {len(charts)} charts, and dashboard")
+        return {'main_map': main_map, 'regional_maps': regional_maps, 'charts': charts, 'dashboard': dashboard}
+    except Exception as e:
+        logger.warning(f"Visualization failed: {str(e)}")
+        return {}
+
+
+def run_advanced_report_stage(base_df: pd.DataFrame) -> Optional[Path]:
+    """Advanced comprehensive report"""
+    try:
+        reporter = AdvancedReporter(base_df, OUTPUT_DIR / "reports")
+        comprehensive_report = reporter.generate_comprehensive_report("tower_location_comprehensive")
+        logger.info(f"✓ Comprehensive report saved: {comprehensive_report}")
+        return comprehensive_report
+    except Exception as e:
+        logger.warning(f"Advanced reporting failed: {str(e)}")
+        return None
+
+
+def run_backend_stage(base_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Enrich with backend features and submit towers to the backend API"""
+    try:
+        backend_url = os.getenv('BACKEND_URL', 'http://localhost:8000')
+        backend_client = BackendAPIClient(backend_url)
+        
+        # Check backend health
+        health = backend_client.health_check()
+        if health.get('status') != 'healthy':
+            logger.warning(f"Backend API not available: {health.get('error', 'Unknown')}")
+            return None
+        logger.info("✓ Backend API is healthy")
+        
+        # Enrich with backend features
+        backend_df = backend_client.enrich_towers_with_backend_features(base_df)
+        
+        # Submit to backend
+        submit_result = backend_client.submit_tower_data(backend_df)
+        if submit_result.get('success'):
+            logger.info(f"✓ Successfully submitted {submit_result.get('total_towers', 0)} towers to backend")
+        else:
+            logger.warning(f"Backend submission had issues: {submit_result.get('error', 'Unknown')}")
+        return backend_df
+    except Exception as e:
+        logger.warning(f"Backend integration failed: {str(e)}")
+        return None
+
+
+def run_categorical_stage(base_df: pd.DataFrame) -> tuple:
+    """Categorical site features and encodings payload"""
+    try:
+        categorical_integration = TowerCategoricalIntegration(base_df)
+        return (categorical_integration.generate_site_categorical_features(),
+                categorical_integration.generate_categorical_encodings_payload())
+    except Exception as e:
+        logger.warning(f"Categorical integration failed: {str(e)}")
+        return None, {}
+
+
+def run_route_planning_stage(base_df: pd.DataFrame) -> Dict:
+    """Maintenance route planning report"""
+    try:
+        # Batch run: route zones on all cores (serial when the stage runs in a pool worker)
+        return TowerRoutePlanner(base_df, workers=None).generate_route_planning_report()
+    except Exception as e:
+        logger.warning(f"Route planning failed: {str(e)}")
+        return {}
+
+
+def run_5g_stage(base_df: pd.DataFrame) -> tuple:
+    """5G expansion candidates and features payload"""
+    try:
+        tower_5g = Tower5GIntegration(base_df)
+        return tower_5g.identify_5g_expansion_candidates(), tower_5g.generate_5g_features_payload()
+    except Exception as e:
+        logger.warning(f"5G integration failed: {str(e)}")
+        return None, {}
+
+
+def run_hierarchical_stage(base_df: pd.DataFrame) -> tuple:
+    """Hierarchical aggregations and features payload"""
+    try:
+        hierarchical = HierarchicalFeaturesIntegration(base_df)
+        return (hierarchical.calculate_hierarchical_aggregations(),
+                hierarchical.generate_hierarchical_payload())
+    except Exception as e:
+        logger.warning(f"Hierarchical integration failed: {str(e)}")
+        return None, {}
+
+
+def merge_feature_columns(base_df: pd.DataFrame, *feature_dfs: Optional[pd.DataFrame]) -> pd.DataFrame:
     """
-    Main function to maximize tower coverage
+    Add the columns each feature stage created to the base inventory
     
-    Args:
-        resume_from_checkpoint: Whether to resume from checkpoint if available
+    Feature stages run independently on the same base inventory, so only
+    columns absent from it are taken from each stage's output. Stages that
+    failed (None) are ignored.
+    """
+    merged_df = base_df.copy()
+    for feature_df in feature_dfs:
+        if feature_df is None or feature_df.empty:
+            continue
+        new_columns = [col for col in feature_df.columns if col not in merged_df.columns]
+        if new_columns:
+            merged_df = merged_df.join(feature_df[new_columns])
+    return merged_df
+
+
+def run_merge_features_stage(base_df: pd.DataFrame, ml_df: Optional[pd.DataFrame],
+                             backend_df: Optional[pd.DataFrame], categorical_df: Optional[pd.DataFrame],
+                             fiveg_df: Optional[pd.DataFrame],
+                             hierarchical_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Merged inventory with every feature stage's columns"""
+    return merge_feature_columns(base_df, ml_df, backend_df, categorical_df, fiveg_df, hierarchical_df)
+
+
+def run_quality_stage(merged_df: pd.DataFrame) -> tuple:
+    """Enhanced quality check, applying fixes below the score threshold"""
+    try:
+        quality_checker = EnhancedDataQuality(merged_df)
+        quality_report = quality_checker.comprehensive_quality_check()
         
-    Returns:
-        Enhanced DataFrame with all tower data
+        final_df = merged_df
+        if quality_report['overall_score'] < 90:
+            logger.warning(f"Quality score below threshold: {quality_report['overall_score']}/100")
+            final_df = quality_checker.apply_quality_fixes()
+            logger.info("✓ Quality fixes applied")
+        return final_df, quality_report
+    except Exception as e:
+        logger.warning(f"Enhanced quality check failed: {str(e)}")
+        return merged_df, {}
+
+
+def run_frontend_export_stage(final_df: pd.DataFrame) -> Dict[str, Path]:
+    """Frontend-ready data exports"""
+    try:
+        frontend_exports = FrontendIntegrationHelper.export_for_frontend(final_df, OUTPUT_DIR / "frontend")
+        logger.info(f"✓ Frontend exports complete: {len(frontend_exports)} files")
+        for export_type, export_path in frontend_exports.items():
+            logger.info(f"  {export_type}: {export_path.name}")
+        return frontend_exports
+    except Exception as e:
+        logger.warning(f"Frontend export failed: {str(e)}")
+        return {}
+
+
+def build_bonus_stage_graph() -> StageGraph:
     """
-    logger.info("=" * 80)
-    logger.info("MAXIMIZING TOWER COVERAGE")
-    logger.info("=" * 80)
+    Stage graph of the bonus pipeline
     
-    # Initialize monitoring and tracking
-    progress_tracker = ProgressTracker(CHECKPOINT_DIR)
-    system_monitor = SystemMonitor(OUTPUT_DIR / "monitoring")
-    backup_manager = BackupManager(OUTPUT_DIR / "backups", retention_days=30)
-    notification_system = NotificationSystem()
-    cache = AdvancedCache(OUTPUT_DIR / "cache", default_ttl=3600)
-    cost_optimizer = CostOptimizer()
-    profiler = PerformanceProfiler()
-    start_time = time.time()
+    Stages with side effects (exports, visualizations, backend submission)
+    are not cached. The feature merge is cheap and runs in-process.
+    """
+    feature_outputs = ['ml_df', 'backend_df', 'categorical_df', 'fiveg_df', 'hierarchical_df']
+    return StageGraph([
+        Stage('reports', run_reports_stage, ['enriched', 'gaps', 'matched_towers'], ['reports'], cacheable=False,
+              timeout=TIMEOUTS['generate_reports']),
+        Stage('advanced_features', run_advanced_features_stage, ['enriched'], ['base_df', 'analytics_report']),
+        Stage('standard_export', run_standard_export_stage, ['base_df'], ['exports'], cacheable=False),
+        Stage('advanced_export', run_advanced_export_stage, ['base_df'], ['advanced_exports'], cacheable=False),
+        Stage('ml_analytics', run_ml_stage, ['base_df'], ['ml_df', 'ml_insights']),
+        Stage('visualizations', run_visualization_stage, ['base_df'], ['visualizations'], cacheable=False),
+        Stage('advanced_report', run_advanced_report_stage, ['base_df'], ['comprehensive_report'], cacheable=False),
+        Stage('backend', run_backend_stage, ['base_df'], ['backend_df'], cacheable=False),
+        Stage('categorical_features', run_categorical_stage, ['base_df'], ['categorical_df', 'categorical_payload']),
+        Stage('route_planning', run_route_planning_stage, ['base_df'], ['route_report']),
+        Stage('5g_features', run_5g_stage, ['base_df'], ['fiveg_df', 'fiveg_payload']),
+        Stage('hierarchical_features', run_hierarchical_stage, ['base_df'], ['hierarchical_df', 'hierarchical_payload']),
+        Stage('merge_features', run_merge_features_stage, ['base_df'] + feature_outputs, ['merged_df'],
+              cacheable=False, parallel=False),
+        Stage('quality_check', run_quality_stage, ['merged_df'], ['final_df', 'quality_report']),
+        Stage('frontend_export', run_frontend_export_stage, ['final_df'], ['frontend_exports'], cacheable=False),
+    ])
+
+
+# Distinguishes a cache miss from a cached None
+_CACHE_MISS = object()
+
+
+def run_cached_stage(stage_cache: StageCache, telemetry: StageTelemetry, stage_name: str,
+                     compute, inputs: list, params: Optional[Dict] = None, func=None,
+                     **execute_kwargs) -> tuple:
+    """
+    Run a stage with safe_execute unless its output is already cached
     
-    if resume_from_checkpoint:
-        summary = progress_tracker.get_progress_summary()
-        logger.info(f"Progress: {summary['steps_completed']} completed, {summary['steps_failed']} failed")
+    The cache is consulted in this process, so hits never start an isolated
+    child and hit/miss counts are recorded. Only successful outputs are cached.
+    func is the stage function compute wraps (with the classes it delegates
+    to), whose code is part of the key.
     
+    Returns:
+        Tuple of (result, success)
+    """
+    with telemetry.stage(stage_name, rows_in=inputs[0] if inputs else None, profile_in_process=False) as record:
+        key = stage_cache.key(stage_name, inputs, params, func=func)
+        result = stage_cache.get(key, default=_CACHE_MISS)
+        record.cache_hit = result is not _CACHE_MISS
+        
+        if record.cache_hit:
+            logger.info(f"  Cache hit for {stage_name} ({key})")
+            success = True
+        else:
+            result, success = safe_execute(profiled(compute, telemetry.profile_path(stage_name)), **execute_kwargs)
+            if success:
+                stage_cache.put(key, result)
+        
+        record.set_output(result)
+        if not success:
+            record.status = 'error'
+    return result, success
+
+
+def resume_checkpoint(progress_tracker: ProgressTracker, step: str,
+                      columns: Optional[list] = None) -> Optional[pd.DataFrame]:
+    """Checkpointed output of a step completed earlier in this run, or None"""
+    if not progress_tracker.is_step_completed(step):
+        return None
+    return progress_tracker.load_checkpoint_data(step, columns=columns)
+
+
+def run_core_steps(progress_tracker: ProgressTracker, stage_cache: StageCache,
+                   telemetry: StageTelemetry) -> tuple:
+    """
+    Steps 1-5: load towers, fetch and match external sources, identify
+    coverage gaps and enrich locations
+    
+    Returns:
+        Tuple of (enriched towers, coverage gaps, matched external towers)
+    """
     # Step 1: Load existing Nova Corrente tower data
     logger.info("\n[Step 1/6] Loading Nova Corrente towers...")
     try:
-        nc_towers = load_nova_corrente_towers(progress_tracker)
+        with telemetry.stage('load_towers') as record:
+            nc_towers = load_nova_corrente_towers(progress_tracker)
+            record.set_output(nc_towers)
         if nc_towers.empty:
             raise ValueError("Loaded empty tower DataFrame")
     except Exception as e:
@@ -361,39 +665,39 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
     
     # Step 2: Fetch from external sources (optional)
     logger.info("\n[Step 2/6] Checking for external data sources...")
-    if progress_tracker.is_step_completed('fetch_external'):
-        logger.info("Skipping external fetch - already completed")
-        anatel_towers = pd.DataFrame()
-        opencellid_towers = pd.DataFrame()
-        web_towers = pd.DataFrame()
-    else:
-        with timed_operation("Fetching external data sources"):
-            anatel_towers, _ = safe_execute(
-                lambda: fetch_anatel_all_states(),
-                default_return=pd.DataFrame(),
-                operation_name="Fetch ANATEL",
-                timeout=TIMEOUTS['fetch_external'] // 3,
-                max_retries=1
-            )
-            
-            opencellid_towers, _ = safe_execute(
-                lambda: fetch_opencellid_brazil(),
-                default_return=pd.DataFrame(),
-                operation_name="Fetch OpenCellID",
-                timeout=TIMEOUTS['fetch_external'] // 3,
-                max_retries=1
-            )
-            
-            web_towers, _ = safe_execute(
-                lambda: fetch_web_sources(),
-                default_return=pd.DataFrame(),
-                operation_name="Fetch Web Sources",
-                timeout=TIMEOUTS['fetch_external'] // 3,
-                max_retries=1
-            )
-            
-            if progress_tracker:
-                progress_tracker.mark_step_completed('fetch_external')
+    with telemetry.stage('fetch_anatel', profile_in_process=False) as record:
+        anatel_towers, _ = safe_execute(
+            profiled(fetch_anatel_all_states, telemetry.profile_path('fetch_anatel')),
+            default_return=pd.DataFrame(),
+            operation_name="Fetch ANATEL",
+            timeout=TIMEOUTS['fetch_external'] // 3,
+            max_retries=1
+        )
+        record.set_output(anatel_towers)
+    
+    with telemetry.stage('fetch_opencellid', profile_in_process=False) as record:
+        opencellid_towers, _ = safe_execute(
+            profiled(fetch_opencellid_brazil, telemetry.profile_path('fetch_opencellid')),
+            default_return=pd.DataFrame(),
+            operation_name="Fetch OpenCellID",
+            # A first scan of the full dump runs long; later runs read the cache
+            timeout=TIMEOUTS['fetch_external'],
+            max_retries=1
+        )
+        record.set_output(opencellid_towers)
+    
+    with telemetry.stage('fetch_web', profile_in_process=False) as record:
+        web_towers, _ = safe_execute(
+            profiled(fetch_web_sources, telemetry.profile_path('fetch_web')),
+            default_return=pd.DataFrame(),
+            operation_name="Fetch Web Sources",
+            timeout=TIMEOUTS['fetch_external'] // 3,
+            max_retries=1
+        )
+        record.set_output(web_towers)
+    
+    if progress_tracker:
+        progress_tracker.mark_step_completed('fetch_external')
     
     external_sources = [
         ('ANATEL', anatel_towers),
@@ -409,28 +713,30 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
         logger.info("No external data sources available - continuing with Nova Corrente data only")
     
     # Step 3: Match and merge all sources (if external data available)
+    # Steps 3-5 are cached by the content of their inputs, so a re-run only
+    # recomputes the stages whose inputs changed
     logger.info("\n[Step 3/6] Processing data sources...")
-    if progress_tracker.is_step_completed('match_sources'):
-        logger.info("Skipping matching - already completed")
-        matched_towers = pd.DataFrame()
-    elif non_empty_sources:
-        with timed_operation("Matching and merging sources"):
-            result, success = safe_execute(
-                lambda: match_all_sources(nc_towers, external_sources),
-                default_return=(nc_towers, pd.DataFrame()),
-                operation_name="Match Sources",
-                timeout=TIMEOUTS['match_sources'],
-                max_retries=1
-            )
-            if success:
-                nc_towers_merged, matched_towers = result
-                nc_towers = nc_towers_merged
-                if progress_tracker:
-                    progress_tracker.save_checkpoint('match_sources', matched_towers)
-                    progress_tracker.mark_step_completed('match_sources')
-            else:
-                matched_towers = pd.DataFrame()
-                logger.warning("Matching failed - continuing without external matches")
+    if non_empty_sources:
+        result, success = run_cached_stage(
+            stage_cache, telemetry, 'match_sources',
+            lambda: match_all_sources(nc_towers, external_sources),
+            func=[match_all_sources, SpatialIndex],
+            inputs=[nc_towers] + [df for _, df in external_sources],
+            params={'sources': [name for name, _ in external_sources], 'max_distance_m': 100},
+            default_return=(nc_towers, pd.DataFrame()),
+            operation_name="Match Sources",
+            timeout=TIMEOUTS['match_sources'],
+            max_retries=1
+        )
+        if success:
+            nc_towers_merged, matched_towers = result
+            nc_towers = nc_towers_merged
+            if progress_tracker:
+                progress_tracker.save_checkpoint('match_sources', matched_towers)
+                progress_tracker.mark_step_completed('match_sources')
+        else:
+            matched_towers = pd.DataFrame()
+            logger.warning("Matching failed - continuing without external matches")
     else:
         matched_towers = pd.DataFrame()
         logger.info("Skipping external matching - no external data available")
@@ -439,69 +745,116 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
     
     # Step 4: Identify coverage gaps
     logger.info("\n[Step 4/6] Identifying coverage gaps...")
-    if progress_tracker.is_step_completed('identify_gaps'):
-        logger.info("Skipping gap identification - already completed")
-        gaps = pd.DataFrame()
+    external_dfs = [df for _, df in external_sources if not df.empty]
+    if external_dfs:
+        all_external = pd.concat(external_dfs, ignore_index=True)
     else:
-        external_dfs = [df for _, df in external_sources if not df.empty]
-        if external_dfs:
-            all_external = pd.concat(external_dfs, ignore_index=True)
-        else:
-            all_external = pd.DataFrame()
-        
-        with timed_operation("Identifying coverage gaps"):
-            gaps, success = safe_execute(
-                lambda: identify_coverage_gaps(nc_towers, all_external),
-                default_return=pd.DataFrame(),
-                operation_name="Identify Coverage Gaps",
-                timeout=TIMEOUTS['identify_gaps'],
-                max_retries=1
-            )
-            
-            if success and not gaps.empty:
-                if progress_tracker:
-                    progress_tracker.save_checkpoint('identify_gaps', gaps)
-                    progress_tracker.mark_step_completed('identify_gaps')
-            else:
-                logger.warning("Coverage gap analysis failed or returned empty - continuing")
-                gaps = pd.DataFrame()
+        all_external = pd.DataFrame()
+    
+    gaps, success = run_cached_stage(
+        stage_cache, telemetry, 'identify_gaps',
+        lambda: identify_coverage_gaps(nc_towers, all_external),
+        func=[identify_coverage_gaps, CoverageAnalyzer],
+        inputs=[nc_towers, all_external],
+        params=COVERAGE_GAP_PARAMS,
+        default_return=pd.DataFrame(),
+        operation_name="Identify Coverage Gaps",
+        timeout=TIMEOUTS['identify_gaps'],
+        max_retries=1
+    )
+    
+    if success and not gaps.empty:
+        if progress_tracker:
+            progress_tracker.save_checkpoint('identify_gaps', gaps)
+            progress_tracker.mark_step_completed('identify_gaps')
+    else:
+        logger.warning("Coverage gap analysis failed or returned empty - continuing")
+        gaps = pd.DataFrame()
     
     # Step 5: Enrich locations
     logger.info("\n[Step 5/6] Enriching locations...")
-    if progress_tracker.is_step_completed('enrich_locations'):
-        logger.info("Skipping enrichment - already completed")
+    # First: Standard enrichment
+    enriched, success = run_cached_stage(
+        stage_cache, telemetry, 'enrich_locations',
+        lambda: enrich_locations(nc_towers),
+        func=[enrich_locations, LocationEnricher],
+        inputs=[nc_towers],
+        default_return=nc_towers,
+        operation_name="Enrich Locations",
+        timeout=TIMEOUTS['enrich_locations'] // 2,
+        max_retries=1
+    )
+    
+    if not success or enriched.empty:
+        logger.warning("Standard enrichment failed - using original data")
         enriched = nc_towers
+    
+    # Second: Integrate research assets
+    logger.info("Integrating manual research assets...")
+    with telemetry.stage('integrate_research_assets', rows_in=enriched) as record:
+        try:
+            enriched = integrate_research_assets(enriched)
+            logger.info("✓ Research assets integrated")
+        except Exception as e:
+            logger.warning(f"Research asset integration failed: {str(e)} - continuing without research data")
+        record.set_output(enriched)
+    
+    if not enriched.empty:
+        if progress_tracker:
+            progress_tracker.save_checkpoint('enrich_locations', enriched)
+            progress_tracker.mark_step_completed('enrich_locations')
+    
+    return enriched, gaps, matched_towers
+
+
+def maximize_coverage(resume_from_checkpoint: bool = True, use_stage_cache: bool = True,
+                      stage_workers: Optional[int] = STAGE_WORKERS, profile_stages: bool = False) -> pd.DataFrame:
+    """
+    Main function to maximize tower coverage
+    
+    Args:
+        resume_from_checkpoint: Whether to resume from checkpoint if available
+        use_stage_cache: Reuse cached stage outputs whose inputs are unchanged
+        stage_workers: Worker processes for bonus stages (None for all cores, 1 for serial)
+        profile_stages: Dump cProfile stats for every stage next to the telemetry log
+    
+    Returns:
+        Enhanced DataFrame with all tower data
+    """
+    logger.info("=" * 80)
+    logger.info("MAXIMIZING TOWER COVERAGE")
+    logger.info("=" * 80)
+    
+    # Initialize monitoring and tracking
+    progress_tracker = ProgressTracker(CHECKPOINT_DIR, resume=resume_from_checkpoint)
+    system_monitor = SystemMonitor(OUTPUT_DIR / "monitoring")
+    backup_manager = BackupManager(OUTPUT_DIR / "backups", retention_days=30)
+    notification_system = NotificationSystem()
+    cache = AdvancedCache(OUTPUT_DIR / "cache", default_ttl=3600)
+    cost_optimizer = CostOptimizer()
+    telemetry = StageTelemetry(TELEMETRY_DIR, profile=profile_stages)
+    stage_cache = StageCache(STAGE_CACHE_DIR, max_bytes=STAGE_CACHE_MAX_BYTES, enabled=use_stage_cache)
+    start_time = time.time()
+    
+    if resume_from_checkpoint:
+        summary = progress_tracker.get_progress_summary()
+        logger.info(f"Progress: {summary['steps_completed']} completed, {summary['steps_failed']} failed")
+    
+    # Resuming after enrichment only needs the enriched towers, the gaps and
+    # the match flags, so steps 1-5 and their larger checkpoints are skipped
+    enriched = resume_checkpoint(progress_tracker, 'enrich_locations')
+    if enriched is not None and not enriched.empty:
+        logger.info(f"\nResuming run {progress_tracker.run_id} after enrichment ({len(enriched)} towers)")
+        gaps = resume_checkpoint(progress_tracker, 'identify_gaps')
+        gaps = gaps if gaps is not None else pd.DataFrame()
+        matched_towers = resume_checkpoint(progress_tracker, 'match_sources', columns=['matched'])
+        matched_towers = matched_towers if matched_towers is not None else pd.DataFrame()
     else:
-        with timed_operation("Enriching locations"):
-            # First: Standard enrichment
-            enriched, success = safe_execute(
-                lambda: enrich_locations(nc_towers),
-                default_return=nc_towers,
-                operation_name="Enrich Locations",
-                timeout=TIMEOUTS['enrich_locations'] // 2,
-                max_retries=1
-            )
-            
-            if not success or enriched.empty:
-                logger.warning("Standard enrichment failed - using original data")
-                enriched = nc_towers
-            
-            # Second: Integrate research assets
-            logger.info("Integrating manual research assets...")
-            try:
-                enriched = integrate_research_assets(enriched)
-                logger.info("✓ Research assets integrated")
-            except Exception as e:
-                logger.warning(f"Research asset integration failed: {str(e)} - continuing without research data")
-            
-            if not enriched.empty:
-                if progress_tracker:
-                    progress_tracker.save_checkpoint('enrich_locations', enriched)
-                    progress_tracker.mark_step_completed('enrich_locations')
+        enriched, gaps, matched_towers = run_core_steps(progress_tracker, stage_cache, telemetry)
     
     # Step 6: Validate data
     logger.info("\n[Step 6/6] Validating data...")
-    with timed_operation("Validating data"):
+    with telemetry.stage('validate_data', rows_in=enriched):
         validator = DataValidator()
         validation_results, success = safe_execute(
             lambda: validator.validate_all(enriched, expected_count=18000),
@@ -523,100 +876,54 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
     
     logger.info(f"✓ Validation results saved: {validation_file}")
     
-    # Generate enhanced reports
-    logger.info("\n[Bonus] Generating enhanced reports...")
-    with timed_operation("Generating enhanced reports"):
-        reports, success = safe_execute(
-            lambda: generate_enhanced_report(enriched, gaps, matched_towers),
-            default_return={},
-            operation_name="Generate Reports",
-            timeout=TIMEOUTS['generate_reports'],
-            max_retries=1
-        )
-        
-        if not success:
-            logger.warning("Report generation failed - some reports may be missing")
-            reports = {}
-    
-    # Apply advanced features
-    logger.info("\n[Bonus] Applying advanced features...")
-    try:
-        enhanced_df, analytics_report = apply_advanced_features(enriched)
-        logger.info("✓ Advanced features applied")
-        
-        # Save analytics report
-        analytics_file = OUTPUT_DIR / f"analytics_report_{timestamp}.json"
-        with open(analytics_file, 'w', encoding='utf-8') as f:
-            json.dump(analytics_report, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ Analytics report saved: {analytics_file}")
-    except Exception as e:
-        logger.warning(f"Advanced features failed: {str(e)} - using standard data")
-        enhanced_df = enriched
-        analytics_report = {}
-    
-    # Optimize for large datasets
-    logger.info("\n[Bonus] Optimizing for large datasets...")
-    try:
-        enhanced_df = optimize_for_large_datasets(enhanced_df)
-        logger.info("✓ Dataset optimization complete")
-    except Exception as e:
-        logger.warning(f"Optimization failed: {str(e)}")
-    
-    # Export to all formats (standard)
-    logger.info("\n[Bonus] Exporting to standard formats...")
-    try:
-        export_manager = ExportManager(enhanced_df, OUTPUT_DIR)
-        exports = export_manager.export_all_formats("enhanced_tower_inventory")
-        logger.info(f"✓ Exported to {len(exports)} standard formats")
-    except Exception as e:
-        logger.warning(f"Standard export failed: {str(e)}")
-        exports = {}
-    
-    # Export to advanced formats
-    logger.info("\n[Bonus] Exporting to advanced formats...")
-    try:
-        advanced_export_manager = AdvancedExportManager(enhanced_df, OUTPUT_DIR)
-        advanced_exports = advanced_export_manager.export_all_formats_advanced("enhanced_tower_inventory")
-        logger.info(f"✓ Exported to {len(advanced_exports)} advanced formats")
-        exports.update(advanced_exports)
-    except Exception as e:
-        logger.warning(f"Advanced export failed: {str(e)}")
+    # Bonus stages: independent stages run concurrently in worker processes
+    logger.info(f"\n[Bonus] Running bonus stages ({stage_workers or os.cpu_count()} workers)...")
+    bonus_graph = build_bonus_stage_graph()
+    artifacts = bonus_graph.run(
+        {'enriched': enriched, 'gaps': gaps, 'matched_towers': matched_towers},
+        workers=stage_workers,
+        cache=stage_cache,
+        telemetry=telemetry
+    )
+    logger.info(f"  Critical path: {bonus_graph.critical_path_seconds():.2f}s of "
+                f"{sum(bonus_graph.timings.values()):.2f}s total stage time")
     
-    # ML Predictive Analytics
-    logger.info("\n[Bonus] Running ML predictive analytics...")
-    try:
-        ml_analytics = PredictiveAnalytics(enhanced_df)
-        enhanced_df = ml_analytics.predict_coverage_demand(future_days=30)
-        enhanced_df = ml_analytics.predict_maintenance_needs()
-        enhanced_df = ml_analytics.optimize_tower_placement(target_coverage=95.0)
-        
-        ml_insights = ml_analytics.generate_ml_insights()
-        ml_file = OUTPUT_DIR / f"ml_insights_{timestamp}.json"
-        with open(ml_file, 'w', encoding='utf-8') as f:
-            json.dump(ml_insights, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ ML analytics complete: {ml_file}")
-    except Exception as e:
-        logger.warning(f"ML analytics failed: {str(e)}")
+    reports = artifacts.get('reports', {})
+    analytics_report = artifacts.get('analytics_report', {})
+    enhanced_df = next(
+        (artifacts[name] for name in ('final_df', 'merged_df', 'base_df') if name in artifacts), enriched
+    )
     
-    # Create enhanced visualizations
-    logger.info("\n[Bonus] Creating enhanced visualizations...")
-    try:
-        visualizer = EnhancedVisualizer(enhanced_df, OUTPUT_DIR / "visualizations")
-        visualizer.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Create maps
-        main_map = visualizer.create_interactive_map("tower_map.html")
-        regional_maps = visualizer.create_regional_maps()
-        
-        # Create charts
-        charts = visualizer.create_statistical_charts()
-        
-        # Create dashboard
-        dashboard = visualizer.create_dashboard_html(regional_maps, charts)
-        
-        logger.info(f"✓ Created {len(regional_maps)} regional maps, {len(charts)} charts, and dashboard")
-    except Exception as e:
-        logger.warning(f"Visualization failed: {str(e)}")
+    # Save stage payloads
+    payload_files = {
+        'analytics_report': 'analytics_report',
+        'ml_insights': 'ml_insights',
+        'categorical_payload': 'categorical_features',
+        'route_report': 'route_planning',
+        'fiveg_payload': '5g_features',
+        'hierarchical_payload': 'hierarchical_features',
+        'quality_report': 'enhanced_quality_report',
+    }
+    for artifact_name, file_prefix in payload_files.items():
+        payload = artifacts.get(artifact_name)
+        if not payload:
+            continue
+        payload_file = OUTPUT_DIR / f"{file_prefix}_{timestamp}.json"
+        with open(payload_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+        logger.info(f"✓ Saved {file_prefix.replace('_', ' ')}: {payload_file}")
+    
+    route_report = artifacts.get('route_report') or {}
+    if route_report:
+        logger.info(f"  Total routes: {route_report['summary']['total_routes']}")
+        logger.info(f"  Total distance: {route_report['summary']['total_distance_km']:.2f} km")
+    fiveg_payload = artifacts.get('fiveg_payload') or {}
+    if fiveg_payload:
+        logger.info(f"  Expansion candidates: {fiveg_payload['coverage_expansion_map']['expansion_candidates']}")
+    hierarchical_payload = artifacts.get('hierarchical_payload') or {}
+    if hierarchical_payload:
+        logger.info(f"  Regions: {hierarchical_payload['summary']['total_regions']}")
+        logger.info(f"  Zones: {hierarchical_payload['summary']['total_zones']}")
     
     # Cost optimization report
     logger.info("\n[Bonus] Generating cost optimization report...")
@@ -633,145 +940,20 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
     # Performance profiling
     logger.info("\n[Bonus] Generating performance profile...")
     try:
-        performance_report = profiler.generate_performance_report(
-            OUTPUT_DIR / f"performance_profile_{timestamp}.json"
-        )
-        bottlenecks = profiler.identify_bottlenecks(threshold_seconds=1.0)
+        telemetry.write_summary()
+        bottlenecks = telemetry.identify_bottlenecks(threshold_seconds=1.0)
         if bottlenecks:
             logger.info(f"  Found {len(bottlenecks)} performance bottlenecks")
             for bottleneck in bottlenecks[:5]:  # Top 5
-                logger.info(f"    - {bottleneck['function']}: {bottleneck['average_time']:.2f}s avg")
+                logger.info(f"    - {bottleneck['stage']}: {bottleneck['wall_s']:.2f}s wall, "
+                            f"{bottleneck['cpu_s'] or 0:.2f}s CPU, {bottleneck['peak_rss_mb'] or 0:.0f} MB peak RSS")
     except Exception as e:
         logger.warning(f"Performance profiling failed: {str(e)}")
     
-    # Advanced reporting
-    logger.info("\n[Bonus] Generating advanced comprehensive report...")
-    try:
-        reporter = AdvancedReporter(enhanced_df, OUTPUT_DIR / "reports")
-        comprehensive_report = reporter.generate_comprehensive_report("tower_location_comprehensive")
-        logger.info(f"✓ Comprehensive report saved: {comprehensive_report}")
-    except Exception as e:
-        logger.warning(f"Advanced reporting failed: {str(e)}")
-    
-    # Backend API Integration
-    logger.info("\n[Bonus] Integrating with backend API...")
-    try:
-        backend_url = os.getenv('BACKEND_URL', 'http://localhost:8000')
-        backend_client = BackendAPIClient(backend_url)
-        
-        # Check backend health
-        health = backend_client.health_check()
-        if health.get('status') == 'healthy':
-            logger.info("✓ Backend API is healthy")
-            
-            # Enrich with backend features
-            enhanced_df = backend_client.enrich_towers_with_backend_features(enhanced_df)
-            
-            # Submit to backend
-            submit_result = backend_client.submit_tower_data(enhanced_df)
-            if submit_result.get('success'):
-                logger.info(f"✓ Successfully submitted {submit_result.get('total_towers', 0)} towers to backend")
-            else:
-                logger.warning(f"Backend submission had issues: {submit_result.get('error', 'Unknown')}")
-        else:
-            logger.warning(f"Backend API not available: {health.get('error', 'Unknown')}")
-    except Exception as e:
-        logger.warning(f"Backend integration failed: {str(e)}")
-    
-    # Categorical Features Integration
-    logger.info("\n[Bonus] Generating categorical features integration...")
-    try:
-        categorical_integration = TowerCategoricalIntegration(enhanced_df)
-        enhanced_df = categorical_integration.generate_site_categorical_features()
-        categorical_payload = categorical_integration.generate_categorical_encodings_payload()
-        
-        categorical_file = OUTPUT_DIR / f"categorical_features_{timestamp}.json"
-        with open(categorical_file, 'w', encoding='utf-8') as f:
-            json.dump(categorical_payload, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ Categorical features saved: {categorical_file}")
-    except Exception as e:
-        logger.warning(f"Categorical integration failed: {str(e)}")
-    
-    # Route Planning Optimization
-    logger.info("\n[Bonus] Optimizing maintenance routes...")
-    try:
-        route_planner = TowerRoutePlanner(enhanced_df)
-        route_report = route_planner.generate_route_planning_report()
-        
-        route_file = OUTPUT_DIR / f"route_planning_{timestamp}.json"
-        with open(route_file, 'w', encoding='utf-8') as f:
-            json.dump(route_report, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ Route planning saved: {route_file}")
-        logger.info(f"  Total routes: {route_report['summary']['total_routes']}")
-        logger.info(f"  Total distance: {route_report['summary']['total_distance_km']:.2f} km")
-    except Exception as e:
-        logger.warning(f"Route planning failed: {str(e)}")
-    
-    # 5G Integration
-    logger.info("\n[Bonus] Generating 5G expansion features...")
-    try:
-        tower_5g = Tower5GIntegration(enhanced_df)
-        enhanced_df = tower_5g.identify_5g_expansion_candidates()
-        fiveg_payload = tower_5g.generate_5g_features_payload()
-        
-        fiveg_file = OUTPUT_DIR / f"5g_features_{timestamp}.json"
-        with open(fiveg_file, 'w', encoding='utf-8') as f:
-            json.dump(fiveg_payload, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ 5G features saved: {fiveg_file}")
-        logger.info(f"  Expansion candidates: {fiveg_payload['coverage_expansion_map']['expansion_candidates']}")
-    except Exception as e:
-        logger.warning(f"5G integration failed: {str(e)}")
-    
-    # Hierarchical Features Integration
-    logger.info("\n[Bonus] Generating hierarchical features...")
-    try:
-        hierarchical = HierarchicalFeaturesIntegration(enhanced_df)
-        enhanced_df = hierarchical.calculate_hierarchical_aggregations()
-        hierarchical_payload = hierarchical.generate_hierarchical_payload()
-        
-        hierarchical_file = OUTPUT_DIR / f"hierarchical_features_{timestamp}.json"
-        with open(hierarchical_file, 'w', encoding='utf-8') as f:
-            json.dump(hierarchical_payload, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ Hierarchical features saved: {hierarchical_file}")
-        logger.info(f"  Regions: {hierarchical_payload['summary']['total_regions']}")
-        logger.info(f"  Zones: {hierarchical_payload['summary']['total_zones']}")
-    except Exception as e:
-        logger.warning(f"Hierarchical integration failed: {str(e)}")
-    
-    # Frontend Integration
-    logger.info("\n[Bonus] Exporting frontend-ready data...")
-    try:
-        frontend_exports = FrontendIntegrationHelper.export_for_frontend(
-            enhanced_df, 
-            OUTPUT_DIR / "frontend"
-        )
-        logger.info(f"✓ Frontend exports complete: {len(frontend_exports)} files")
-        for export_type, export_path in frontend_exports.items():
-            logger.info(f"  {export_type}: {export_path.name}")
-    except Exception as e:
-        logger.warning(f"Frontend export failed: {str(e)}")
-    
-    # Enhanced quality check
-    logger.info("\n[Bonus] Running enhanced quality check...")
-    try:
-        quality_checker = EnhancedDataQuality(enhanced_df)
-        quality_report = quality_checker.comprehensive_quality_check()
-        
-        if quality_report['overall_score'] < 90:
-            logger.warning(f"Quality score below threshold: {quality_report['overall_score']}/100")
-            enhanced_df = quality_checker.apply_quality_fixes()
-            logger.info("✓ Quality fixes applied")
-        
-        quality_file = OUTPUT_DIR / f"enhanced_quality_report_{timestamp}.json"
-        with open(quality_file, 'w', encoding='utf-8') as f:
-            json.dump(quality_report, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"✓ Quality report saved: {quality_file}")
-    except Exception as e:
-        logger.warning(f"Enhanced quality check failed: {str(e)}")
-    
     # Save final enhanced dataset
-    final_file = OUTPUT_DIR / f"enhanced_tower_inventory_{timestamp}.csv"
-    enhanced_df.to_csv(final_file, index=False, encoding='utf-8')
+    final_file = TowerInventoryStore(OUTPUT_DIR).save(
+        enhanced_df, 'enhanced_tower_inventory', timestamp, export_csv=True
+    )
     logger.info(f"✓ Enhanced inventory saved: {final_file}")
     
     # Create backup
@@ -789,6 +971,9 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
     
     # Record execution metrics
     execution_time = time.time() - start_time
+    cache_stats = stage_cache.stats()
+    logger.info(f"Stage cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['size_bytes'] / 1024 ** 2:.1f} MB")
     system_monitor.record_execution({
         'duration': execution_time,
         'towers_processed': len(enhanced_df),
@@ -797,6 +982,13 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
         'errors': progress_tracker.progress.get('steps_failed', []),
     })
     
+    # Record stages killed for overrunning their budget
+    if timeout_records:
+        timeouts_file = OUTPUT_DIR / f"stage_timeouts_{timestamp}.json"
+        with open(timeouts_file, 'w', encoding='utf-8') as f:
+            json.dump(timeout_records, f, indent=2, ensure_ascii=False, default=str)
+        logger.warning(f"{len(timeout_records)} stage(s) killed for exceeding their timeout: {timeouts_file}")
+    
     # Generate dashboard
     try:
         dashboard_html = system_monitor.generate_dashboard_html()
@@ -835,6 +1027,8 @@ def maximize_coverage(resume_from_checkpoint: bool = True) -> pd.DataFrame:
     logger.info(f"Execution time: {execution_time:.2f} seconds")
     logger.info(f"Quality score: {analytics_report.get('quality', {}).get('quality_score', 'N/A')}")
     
+    progress_tracker.mark_run_completed()
+    
     # Send notifications
     try:
         execution_data = {
@@ -863,7 +1057,7 @@ def main():
         for file in OUTPUT_DIR.glob("*"):
             if file.is_file():
                 print(f"  - {file.name}")
-        
+    
     except Exception as e:
         logger.error(f"Error during coverage maximization: {str(e)}", exc_info=True)
         raise
@@ -0,0 +1,238 @@
+"""
+OpenCellID Loader
+Stream OpenCellID dumps in chunks, keep deduplicated Brazilian cells and
+cache them as a compact Parquet file
+"""
+
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional Parquet engine
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow not available - OpenCellID dumps will be rescanned on every run")
+
+BRAZIL_MCC = 724
+
+# Mainland Brazil plus oceanic islands (Fernando de Noronha, Trindade)
+BRAZIL_BBOX = {
+    'min_lat': -33.8, 'max_lat': 5.3,
+    'min_lon': -74.0, 'max_lon': -28.8,
+}
+
+# Column layout of OpenCellID exports (per-country dumps ship without a header)
+OPENCELLID_COLUMNS = [
+    'radio', 'mcc', 'net', 'area', 'cell', 'unit', 'lon', 'lat', 'range',
+    'samples', 'changeable', 'created', 'updated', 'averageSignal',
+]
+
+RADIO_TYPES = pd.CategoricalDtype(['GSM', 'UMTS', 'CDMA', 'LTE', 'NR'])
+
+# Columns kept from the dump and their types (fixed categories so chunks
+# concatenate without falling back to object columns; nullable integers so
+# a missing or malformed value becomes NA instead of failing the dump)
+OPENCELLID_DTYPES = {
+    'radio': RADIO_TYPES,
+    'mcc': 'Int16',
+    'net': 'Int16',
+    'area': 'Int32',
+    'cell': 'Int64',
+    'lon': 'float64',
+    'lat': 'float64',
+    'range': 'Int32',
+    'samples': 'Int32',
+    'updated': 'Int64',
+}
+
+# A cell is identified by its radio technology and full cell global identity
+CELL_KEY = ['radio', 'mcc', 'net', 'area', 'cell']
+
+CACHE_METADATA_KEY = b'opencellid_sources'
+
+
+def source_fingerprint(files: Iterable[Path]) -> List[Dict]:
+    """Path, size and modification time of each source dump"""
+    fingerprint = []
+    for path in sorted(Path(f) for f in files):
+        stat = path.stat()
+        fingerprint.append({'path': str(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+    return fingerprint
+
+
+def _has_header(path: Path) -> bool:
+    """Whether a dump starts with a header row (full exports do, per-country ones do not)"""
+    first_row = pd.read_csv(path, nrows=1, header=None, dtype=str).iloc[0].tolist()
+    return 'mcc' in [str(value).strip().lower() for value in first_row]
+
+
+def _read_chunks(path: Path, chunksize: int) -> Iterable[pd.DataFrame]:
+    """Parse a dump in chunks, reading only the kept columns"""
+    if _has_header(path):
+        header_kwargs = {'header': 0}
+    else:
+        header_kwargs = {'header': None, 'names': OPENCELLID_COLUMNS}
+    # Numeric columns are parsed as inferred and coerced per chunk, so one
+    # malformed value cannot abort the rest of the dump
+    with pd.read_csv(
+        path, usecols=list(OPENCELLID_DTYPES), dtype={'radio': RADIO_TYPES},
+        chunksize=chunksize, on_bad_lines='skip', low_memory=False, **header_kwargs
+    ) as chunks:
+        for chunk in chunks:
+            yield _coerce_numeric(chunk)
+
+
+def _coerce_numeric(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Numeric columns in their kept types; unparseable or out-of-range values become NA"""
+    for column, dtype in OPENCELLID_DTYPES.items():
+        if column == 'radio':
+            continue
+        values = pd.to_numeric(chunk[column], errors='coerce')
+        if pd.api.types.is_integer_dtype(dtype):
+            limits = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+            values = values.where(values.between(limits.min, limits.max) & (values % 1 == 0))
+        chunk[column] = values.astype(dtype)
+    return chunk
+
+
+def filter_brazil(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Rows with Brazil's MCC, a complete cell identity and coordinates inside the Brazil bounding box"""
+    mask = (
+        (chunk['mcc'] == BRAZIL_MCC).fillna(False).astype(bool)
+        & chunk[CELL_KEY].notna().all(axis=1)
+        & chunk['lat'].between(BRAZIL_BBOX['min_lat'], BRAZIL_BBOX['max_lat'])
+        & chunk['lon'].between(BRAZIL_BBOX['min_lon'], BRAZIL_BBOX['max_lon'])
+    )
+    return chunk[mask]
+
+
+def deduplicate_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep the most recently updated record of each cell"""
+    if df.empty:
+        return df
+    df = df.sort_values('updated', kind='stable')
+    return df.drop_duplicates(subset=CELL_KEY, keep='last')
+
+
+class OpenCellIDLoader:
+    """
+    Load Brazilian cells from local OpenCellID dumps
+    
+    Every matched dump is streamed in chunks and filtered to MCC 724 inside
+    the Brazil bounding box while it is parsed, so memory holds one chunk
+    plus the Brazilian cells found so far (compacted by deduplication as it
+    grows) rather than the global dump. The result is cached as Parquet with
+    the source fingerprint (path, size, mtime) in its metadata; later runs
+    read the cache until a dump changes.
+    """
+    
+    def __init__(self, cache_path: Path, chunksize: int = 1000000, compact_rows: int = 5000000):
+        """
+        Args:
+            cache_path: Parquet cache of the deduplicated Brazilian cells
+            chunksize: CSV rows parsed per chunk
+            compact_rows: Buffered rows that trigger an intermediate deduplication
+        """
+        self.cache_path = Path(cache_path)
+        self.chunksize = chunksize
+        self.compact_rows = compact_rows
+    
+    def load(self, files: Iterable[Path]) -> pd.DataFrame:
+        """
+        Deduplicated Brazilian cells from the given dumps
+        
+        Returns:
+            DataFrame with one row per cell and latitude/longitude columns
+        """
+        files = sorted(set(Path(f) for f in files))
+        if not files:
+            return pd.DataFrame()
+        
+        fingerprint = source_fingerprint(files)
+        cached = self._read_cache(fingerprint)
+        if cached is not None:
+            logger.info(f"✓ Loaded {len(cached)} OpenCellID cells from cache: {self.cache_path}")
+            return cached
+        
+        cells, failed = self._scan(files)
+        if failed:
+            # A partial scan must not be served as the result of these dumps
+            logger.warning(f"Not caching OpenCellID cells: {len(failed)} dumps could not be fully parsed")
+        elif not cells.empty:
+            self._write_cache(cells, fingerprint)
+        return cells
+    
+    def _scan(self, files: List[Path]) -> Tuple[pd.DataFrame, List[Path]]:
+        """Deduplicated Brazilian cells of the dumps, and the dumps that failed to parse"""
+        buffered: List[pd.DataFrame] = []
+        failed: List[Path] = []
+        buffered_rows = 0
+        rows_scanned = 0
+        
+        for path in files:
+            logger.info(f"Scanning OpenCellID dump: {path}")
+            try:
+                for chunk in _read_chunks(path, self.chunksize):
+                    rows_scanned += len(chunk)
+                    brazil = filter_brazil(chunk)
+                    if brazil.empty:
+                        continue
+                    buffered.append(brazil)
+                    buffered_rows += len(brazil)
+                    if buffered_rows >= self.compact_rows:
+                        buffered = [deduplicate_cells(pd.concat(buffered, ignore_index=True))]
+                        buffered_rows = len(buffered[0])
+            except (ValueError, pd.errors.ParserError) as e:
+                logger.warning(f"Could not parse OpenCellID dump {path}: {str(e)} - skipping the rest")
+                failed.append(path)
+        
+        if not buffered:
+            logger.info(f"No Brazilian cells in {rows_scanned} scanned OpenCellID rows")
+            return pd.DataFrame(), failed
+        
+        cells = deduplicate_cells(pd.concat(buffered, ignore_index=True))
+        cells = cells.rename(columns={'lat': 'latitude', 'lon': 'longitude'})
+        cells = cells.sort_values(CELL_KEY).reset_index(drop=True)
+        
+        logger.info(f"✓ Kept {len(cells)} unique Brazilian cells from {rows_scanned} OpenCellID rows")
+        return cells, failed
+    
+    def _read_cache(self, fingerprint: List[Dict]) -> Optional[pd.DataFrame]:
+        """Cached cells if the cache was built from exactly these dumps"""
+        if not PYARROW_AVAILABLE or not self.cache_path.exists():
+            return None
+        try:
+            metadata = pq.read_schema(self.cache_path).metadata or {}
+            if json.loads(metadata.get(CACHE_METADATA_KEY, b'null')) != fingerprint:
+                logger.info("OpenCellID dumps changed since the cache was built - rescanning")
+                return None
+            return pd.read_parquet(self.cache_path, engine='pyarrow')
+        except Exception as e:
+            logger.warning(f"Could not read OpenCellID cache: {str(e)}")
+            return None
+    
+    def _write_cache(self, cells: pd.DataFrame, fingerprint: List[Dict]):
+        if not PYARROW_AVAILABLE:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_name(f".{self.cache_path.name}.tmp")
+        try:
+            table = pa.Table.from_pandas(cells, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[CACHE_METADATA_KEY] = json.dumps(fingerprint).encode('utf-8')
+            pq.write_table(table.replace_schema_metadata(metadata), temp_path, compression='zstd')
+            os.replace(temp_path, self.cache_path)
+            logger.info(f"✓ Cached OpenCellID cells: {self.cache_path}")
+        except Exception as e:
+            temp_path.unlink(missing_ok=True)
+            logger.warning(f"Could not write OpenCellID cache: {str(e)}")
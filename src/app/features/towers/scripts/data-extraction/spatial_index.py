@@ -0,0 +1,246 @@
+"""
+Spatial Index
+KD-tree index over tower coordinates for batched nearest-neighbour and
+radius queries, used to match external tower sources to Nova Corrente towers
+"""
+
+import logging
+import pickle
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional KD-tree backend
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    logger.warning("scipy not available - spatial index will use brute-force chunked search")
+
+EARTH_RADIUS_M = 6371008.8
+
+LATITUDE_COLUMNS = ['latitude', 'lat']
+LONGITUDE_COLUMNS = ['longitude', 'lon', 'lng']
+
+
+def to_unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Convert lat/lon in degrees to 3D points on the unit sphere"""
+    lat_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lon_rad = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack([cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)])
+
+
+def meters_to_chord(distance_m: float) -> float:
+    """Great-circle distance in meters to straight-line chord on the unit sphere"""
+    return 2.0 * np.sin(np.minimum(distance_m / EARTH_RADIUS_M, np.pi) / 2.0)
+
+
+def chord_to_meters(chord: np.ndarray) -> np.ndarray:
+    """Unit-sphere chord length to great-circle distance in meters"""
+    return 2.0 * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0)) * EARTH_RADIUS_M
+
+
+def _find_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    """First candidate column present in the DataFrame"""
+    return next((col for col in candidates if col in df.columns), None)
+
+
+class SpatialIndex:
+    """
+    Spatial index over tower coordinates
+    
+    Points are stored as 3D unit vectors, so Euclidean KD-tree distances map
+    exactly to great-circle distances and no projection is needed.
+    """
+    
+    def __init__(self, towers_df: pd.DataFrame, id_col: str = 'tower_id'):
+        lat_col = _find_column(towers_df, LATITUDE_COLUMNS)
+        lon_col = _find_column(towers_df, LONGITUDE_COLUMNS)
+        if lat_col is None or lon_col is None:
+            raise ValueError("Tower DataFrame has no latitude/longitude columns")
+        
+        # Coordinates read as text (CSV, scraped sources) are coerced; unparseable ones are skipped
+        lats = pd.to_numeric(towers_df[lat_col], errors='coerce')
+        lons = pd.to_numeric(towers_df[lon_col], errors='coerce')
+        valid = lats.notna() & lons.notna()
+        valid_towers = towers_df[valid]
+        
+        if id_col in valid_towers.columns:
+            self.tower_ids = valid_towers[id_col].to_numpy()
+        else:
+            self.tower_ids = valid_towers.index.to_numpy()
+        self.points = to_unit_vectors(lats[valid].to_numpy(dtype=float), lons[valid].to_numpy(dtype=float))
+        self.tree = cKDTree(self.points) if SCIPY_AVAILABLE and len(self.points) > 0 else None
+        
+        logger.info(f"✓ Built spatial index over {len(self.points)} towers")
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    def query_nearest(self, lats: np.ndarray, lons: np.ndarray, k: int = 1,
+                      max_distance_m: Optional[float] = None,
+                      chunk_size: int = 200000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batched k-nearest-neighbour query
+        
+        Args:
+            lats, lons: Query coordinates in degrees
+            k: Number of neighbours per query point
+            max_distance_m: Ignore neighbours further than this
+            chunk_size: Query points processed per batch
+        
+        Returns:
+            Tuple of (distances in meters, positional tower indices), each of
+            shape (n, k). Missing neighbours have distance inf and index -1.
+        """
+        query_points = to_unit_vectors(lats, lons)
+        n = len(query_points)
+        distances = np.full((n, k), np.inf)
+        indices = np.full((n, k), -1, dtype=np.int64)
+        
+        if n == 0 or len(self.points) == 0:
+            return distances, indices
+        
+        upper_bound = meters_to_chord(max_distance_m) if max_distance_m is not None else np.inf
+        
+        for start in range(0, n, chunk_size):
+            chunk = query_points[start:start + chunk_size]
+            valid = ~np.isnan(chunk).any(axis=1)
+            if not valid.any():
+                continue
+            
+            if self.tree is not None:
+                chord, idx = self.tree.query(chunk[valid], k=k, distance_upper_bound=upper_bound, workers=-1)
+                chord = np.asarray(chord).reshape(-1, k)
+                idx = np.asarray(idx).reshape(-1, k)
+            else:
+                chord, idx = self._brute_force_nearest(chunk[valid], k, upper_bound)
+            
+            found = np.isfinite(chord)
+            chunk_distances = np.where(found, chord_to_meters(np.where(found, chord, 0.0)), np.inf)
+            chunk_indices = np.where(found, idx, -1)
+            
+            rows = np.arange(start, start + len(chunk))[valid]
+            distances[rows] = chunk_distances
+            indices[rows] = chunk_indices
+        
+        return distances, indices
+    
+    def query_radius(self, lats: np.ndarray, lons: np.ndarray, radius_m: float) -> List[np.ndarray]:
+        """
+        Batched radius query
+        
+        Returns:
+            List with one array of positional tower indices per query point
+        """
+        query_points = to_unit_vectors(lats, lons)
+        radius = meters_to_chord(radius_m)
+        empty = np.array([], dtype=np.int64)
+        
+        if len(self.points) == 0:
+            return [empty for _ in range(len(query_points))]
+        
+        if self.tree is not None:
+            valid = ~np.isnan(query_points).any(axis=1)
+            results = [empty] * len(query_points)
+            hits = self.tree.query_ball_point(query_points[valid], r=radius, workers=-1)
+            for row, idx in zip(np.flatnonzero(valid), hits):
+                results[row] = np.asarray(idx, dtype=np.int64)
+            return results
+        
+        results = []
+        for point in query_points:
+            chord = np.linalg.norm(self.points - point, axis=1)
+            results.append(np.flatnonzero(chord <= radius))
+        return results
+    
+    def count_within(self, lats: np.ndarray, lons: np.ndarray, radius_m: float) -> np.ndarray:
+        """Number of indexed towers within radius of each query point"""
+        if self.tree is not None:
+            query_points = to_unit_vectors(lats, lons)
+            valid = ~np.isnan(query_points).any(axis=1)
+            counts = np.zeros(len(query_points), dtype=np.int64)
+            counts[valid] = self.tree.query_ball_point(
+                query_points[valid], r=meters_to_chord(radius_m), return_length=True, workers=-1
+            )
+            return counts
+        return np.array([len(idx) for idx in self.query_radius(lats, lons, radius_m)], dtype=np.int64)
+    
+    def match_external_towers(self, external_df: pd.DataFrame, max_distance_m: float = 100) -> pd.DataFrame:
+        """
+        Match external towers to the nearest indexed tower within a distance
+        
+        Returns:
+            Copy of external_df with matched, matched_tower_id and
+            match_distance_m columns
+        """
+        matched_df = external_df.copy()
+        lat_col = _find_column(matched_df, LATITUDE_COLUMNS)
+        lon_col = _find_column(matched_df, LONGITUDE_COLUMNS)
+        
+        if lat_col is None or lon_col is None or matched_df.empty:
+            matched_df['matched'] = False
+            matched_df['matched_tower_id'] = None
+            matched_df['match_distance_m'] = np.nan
+            return matched_df
+        
+        lats = pd.to_numeric(matched_df[lat_col], errors='coerce').to_numpy()
+        lons = pd.to_numeric(matched_df[lon_col], errors='coerce').to_numpy()
+        distances, indices = self.query_nearest(lats, lons, k=1, max_distance_m=max_distance_m)
+        distances, indices = distances[:, 0], indices[:, 0]
+        
+        matched = indices >= 0
+        matched_ids = np.full(len(matched_df), None, dtype=object)
+        matched_ids[matched] = self.tower_ids[indices[matched]]
+        
+        matched_df['matched'] = matched
+        matched_df['matched_tower_id'] = matched_ids
+        matched_df['match_distance_m'] = np.where(matched, np.round(distances, 2), np.nan)
+        
+        logger.info(f"✓ Matched {int(matched.sum())} of {len(matched_df)} external towers "
+                    f"within {max_distance_m} m")
+        return matched_df
+    
+    def save(self, path: Path) -> Path:
+        """Save the built index for reuse between runs"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"✓ Saved spatial index ({len(self)} towers) to: {path}")
+        return path
+    
+    @classmethod
+    def load(cls, path: Path) -> 'SpatialIndex':
+        """Load an index saved with save()"""
+        with open(path, 'rb') as f:
+            index = pickle.load(f)
+        if not isinstance(index, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        logger.info(f"✓ Loaded spatial index ({len(index)} towers) from: {path}")
+        return index
+    
+    def _brute_force_nearest(self, query_points: np.ndarray, k: int,
+                             upper_bound: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest neighbours without scipy, in blocks to bound memory"""
+        n = len(query_points)
+        chord = np.full((n, k), np.inf)
+        idx = np.full((n, k), len(self.points), dtype=np.int64)
+        k_eff = min(k, len(self.points))
+        block = max(1, 5000000 // max(len(self.points), 1))
+        
+        for start in range(0, n, block):
+            block_points = query_points[start:start + block]
+            block_dist = np.sqrt(((block_points[:, None, :] - self.points[None, :, :]) ** 2).sum(axis=2))
+            nearest = np.argsort(block_dist, axis=1)[:, :k_eff]
+            nearest_dist = np.take_along_axis(block_dist, nearest, axis=1)
+            within = nearest_dist <= upper_bound
+            chord[start:start + block, :k_eff] = np.where(within, nearest_dist, np.inf)
+            idx[start:start + block, :k_eff] = np.where(within, nearest, len(self.points))
+        
+        return chord, idx
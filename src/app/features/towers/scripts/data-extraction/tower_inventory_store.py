@@ -0,0 +1,308 @@
+"""
+Tower Inventory Store
+Columnar (Parquet) storage for tower inventories shared by all pipeline stages
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Optional Parquet engine
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow not available - tower inventories will be stored as CSV")
+
+# Optional file locking of manifest updates (POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+    logger.warning("fcntl not available - concurrent inventory manifest updates are not serialized")
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+OUTPUT_DIR = DATA_DIR / "outputs" / "tower_locations"
+MANIFEST_FILENAME = "inventory_manifest.json"
+MANIFEST_LOCK_FILENAME = ".inventory_manifest.lock"
+
+# Low-cardinality columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = [
+    'region', 'state_code', 'state_name', 'maintenance_zone', 'zone_type',
+    'tower_type', 'status', 'priority',
+]
+
+
+class TowerInventoryStore:
+    """
+    Read and write versioned tower inventories in a columnar format
+    
+    A manifest file records the current version of each inventory prefix
+    (path, row count, schema hash), so readers resolve the latest inventory
+    with a single file read instead of scanning every timestamped version.
+    Inventories and the manifest are written to a temporary path and renamed
+    into place, so readers never observe a half-written file.
+    """
+    
+    def __init__(self, output_dir: Path = OUTPUT_DIR, row_group_size: int = 100000):
+        self.output_dir = Path(output_dir)
+        self.row_group_size = row_group_size
+        self.manifest_path = self.output_dir / MANIFEST_FILENAME
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def extension(self) -> str:
+        """File extension of the canonical inventory format"""
+        return '.parquet' if PYARROW_AVAILABLE else '.csv'
+    
+    def save(self, df: pd.DataFrame, prefix: str = 'complete_tower_inventory',
+             timestamp: Optional[str] = None, export_csv: bool = False,
+             partition_cols: Optional[List[str]] = None) -> Path:
+        """
+        Save a tower inventory version
+        
+        Args:
+            df: Tower inventory DataFrame
+            prefix: File name prefix (e.g. complete_tower_inventory)
+            timestamp: Version timestamp (defaults to now)
+            export_csv: Also write a CSV copy for export
+            partition_cols: Columns to partition the Parquet dataset by
+        
+        Returns:
+            Path to the canonical inventory file (or dataset directory)
+        """
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_path = self.output_dir / f"{prefix}_{timestamp}{self.extension}"
+        reserved = bool(partition_cols) or output_path.is_dir()
+        if reserved:
+            # A directory cannot be swapped atomically: every dataset write gets
+            # a new directory and only the manifest entry moves to it
+            output_path = self._reserve_path(output_path, directory=bool(partition_cols))
+        temp_path = self.output_dir / f".{output_path.name}.{self._writer_id()}.tmp"
+        
+        try:
+            if PYARROW_AVAILABLE:
+                encoded_df = self.encode_categoricals(df)
+                # Row groups only apply to single-file inventories
+                write_options = {'partition_cols': partition_cols} if partition_cols else \
+                    {'row_group_size': self.row_group_size}
+                encoded_df.to_parquet(
+                    temp_path,
+                    engine='pyarrow',
+                    index=False,
+                    compression='zstd',
+                    **write_options,
+                )
+            else:
+                encoded_df = df
+                df.to_csv(temp_path, index=False, encoding='utf-8')
+            
+            # Replaces the empty placeholder of a reserved path
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if reserved:
+                self._release_path(output_path)
+            raise
+        
+        self._update_manifest(prefix, {
+            'version': timestamp,
+            'path': output_path.name,
+            'format': output_path.suffix.lstrip('.'),
+            'row_count': len(df),
+            'schema_hash': self.schema_hash(encoded_df),
+            'written_at': datetime.now().isoformat(),
+        })
+        
+        logger.info(f"✓ Saved {len(df)} towers to: {output_path}")
+        
+        if export_csv and output_path.suffix != '.csv':
+            csv_path = self.export_csv(df, prefix, timestamp)
+            logger.info(f"  CSV export: {csv_path}")
+        
+        return output_path
+    
+    def export_csv(self, df: pd.DataFrame, prefix: str, timestamp: str) -> Path:
+        """Write a CSV export of an inventory (not read back by the pipeline)"""
+        csv_path = self.output_dir / f"{prefix}_{timestamp}.csv"
+        df.to_csv(csv_path, index=False, encoding='utf-8')
+        return csv_path
+    
+    def load(self, path: Path, columns: Optional[List[str]] = None,
+             categoricals: bool = False) -> pd.DataFrame:
+        """
+        Load an inventory file, reading only the requested columns
+        
+        Args:
+            path: Parquet file/dataset or legacy CSV inventory
+            columns: Columns to load (None for all); columns the inventory
+                does not have are left out
+            categoricals: Keep dictionary-encoded columns as pandas
+                categoricals. By default they are decoded to strings, as
+                grouping on categoricals yields every category, even
+                those without rows, unless observed=True is passed.
+        """
+        path = Path(path)
+        
+        if path.suffix == '.csv':
+            if columns is not None:
+                header = pd.read_csv(path, nrows=0).columns
+                columns = [col for col in columns if col in header]
+            return pd.read_csv(path, usecols=columns)
+        
+        if columns is not None:
+            # Partitioned datasets include their partition columns in the schema
+            schema_names = pq.read_schema(path).names if path.is_file() else pq.ParquetDataset(path).schema.names
+            columns = [col for col in columns if col in schema_names]
+        df = pd.read_parquet(path, engine='pyarrow', columns=columns)
+        return df if categoricals else self.decode_categoricals(df)
+    
+    def find_latest(self, prefixes: Union[str, Iterable[str]] = 'complete_tower_inventory') -> Optional[Path]:
+        """
+        Find the most recent inventory for the first prefix that has one
+        
+        The manifest entry is used when present. Directories written before
+        the manifest existed fall back to a scan, preferring Parquet versions
+        over legacy CSV inventories.
+        """
+        if isinstance(prefixes, str):
+            prefixes = [prefixes]
+        
+        manifest = self.read_manifest()
+        for prefix in prefixes:
+            entry = manifest.get(prefix)
+            if entry is not None:
+                manifest_path = self.output_dir / entry['path']
+                if manifest_path.exists():
+                    return manifest_path
+                logger.warning(f"Manifest entry for {prefix} points to missing file: {manifest_path}")
+            
+            for extension in ('.parquet', '.csv'):
+                if extension == '.parquet' and not PYARROW_AVAILABLE:
+                    continue
+                candidates = list(self.output_dir.glob(f"{prefix}_*{extension}"))
+                if candidates:
+                    return max(candidates, key=lambda p: p.stat().st_mtime)
+        
+        return None
+    
+    def load_latest(self, prefixes: Union[str, Iterable[str]] = 'complete_tower_inventory',
+                    columns: Optional[List[str]] = None, categoricals: bool = False) -> pd.DataFrame:
+        """Load the most recent inventory, or an empty DataFrame if none exists (see load)"""
+        latest_path = self.find_latest(prefixes)
+        if latest_path is None:
+            return pd.DataFrame()
+        
+        logger.info(f"Loading tower inventory from: {latest_path}")
+        return self.load(latest_path, columns=columns, categoricals=categoricals)
+    
+    def latest_version(self, prefix: str = 'complete_tower_inventory') -> Optional[Dict]:
+        """Manifest entry (version, path, row count, schema hash) for a prefix"""
+        return self.read_manifest().get(prefix)
+    
+    def read_manifest(self) -> Dict[str, Dict]:
+        """Read the inventory manifest (empty if none has been written)"""
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read inventory manifest: {str(e)}")
+            return {}
+    
+    def _update_manifest(self, prefix: str, entry: Dict):
+        """Record the current version of a prefix, replacing the manifest atomically"""
+        with self._manifest_lock():
+            manifest = self.read_manifest()
+            manifest[prefix] = entry
+            
+            temp_path = self.manifest_path.with_name(f".{MANIFEST_FILENAME}.{self._writer_id()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+    
+    @contextmanager
+    def _manifest_lock(self):
+        """Exclusive lock held across a manifest read-modify-write"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self.output_dir / MANIFEST_LOCK_FILENAME, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _writer_id() -> str:
+        """Unique suffix of one writer's temporary files"""
+        return f"{os.getpid()}.{uuid.uuid4().hex[:8]}"
+    
+    @staticmethod
+    def _reserve_path(path: Path, directory: bool) -> Path:
+        """
+        Claim path, or path with the first free numeric suffix before the extension
+        
+        The name is taken atomically by creating an empty placeholder (a
+        directory for datasets, a file otherwise), so concurrent writers never
+        pick the same name. The finished write is renamed over the placeholder.
+        """
+        version = 0
+        while True:
+            candidate = path if version == 0 else path.with_name(f"{path.stem}_{version}{path.suffix}")
+            try:
+                if directory:
+                    os.mkdir(candidate)
+                else:
+                    os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return candidate
+            except FileExistsError:
+                version += 1
+    
+    @staticmethod
+    def _release_path(path: Path):
+        """Remove the placeholder of a reserved path whose write failed"""
+        try:
+            if path.is_dir():
+                path.rmdir()
+            else:
+                path.unlink(missing_ok=True)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def schema_hash(df: pd.DataFrame) -> str:
+        """Short hash of column names and dtypes"""
+        schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+        return hashlib.sha256(json.dumps(schema).encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def encode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert low-cardinality string columns to categoricals"""
+        df = df.copy(deep=False)
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+                    df[col] = df[col].astype('category')
+        return df
+    
+    @staticmethod
+    def decode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert categorical columns back to the dtype of their categories"""
+        categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if not categorical:
+            return df
+        return df.astype({col: df[col].cat.categories.dtype for col in categorical})
@@ -0,0 +1,17 @@
+"""
+Pipeline utilities for the tower coverage orchestrator
+"""
+
+from .progress_tracker import ProgressTracker
+from .shared_frame import SharedFrame
+from .stage_cache import StageCache
+from .stage_graph import Stage, StageGraph
+from .stage_telemetry import StageTelemetry, measure_call, profiled
+from .timeout_handler import (
+    StageTimeoutError, run_isolated, with_timeout, retry_with_backoff, safe_execute, timed_operation,
+)
+
+__all__ = [
+    'ProgressTracker', 'SharedFrame', 'StageCache', 'Stage', 'StageGraph', 'StageTelemetry', 'measure_call', 'profiled',
+    'StageTimeoutError', 'run_isolated', 'with_timeout', 'retry_with_backoff', 'safe_execute', 'timed_operation',
+]
@@ -0,0 +1,235 @@
+"""
+Progress Tracker
+Step completion tracking and per-run checkpoints stored as compressed
+Parquet with atomic commits
+"""
+
+import json
+import logging
+import os
+import pickle
+import uuid
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional Parquet engine
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow not available - checkpoints will be stored as pickle")
+
+PROGRESS_FILENAME = "progress.json"
+LATEST_RUN_FILENAME = "latest_run.json"
+
+
+def _write_json_atomic(path: Path, payload: Dict):
+    """Write JSON to a temporary file and rename it into place"""
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(temp_path, path)
+
+
+class ProgressTracker:
+    """
+    Track pipeline progress and checkpoint step outputs for one run
+    
+    Each run has its own directory under checkpoint_dir holding a progress
+    file and one checkpoint per step. Checkpoints are written to a temporary
+    file and renamed into place, so a crash never leaves a partial file, and
+    the progress file records each checkpoint's path, row count and schema.
+    Nothing is read until a step's checkpoint is requested, and only the
+    requested columns are loaded.
+    
+    Progress is persisted on every change and re-read on access, so steps
+    run in isolated child processes are visible to the parent.
+    """
+    
+    def __init__(self, checkpoint_dir: Path, run_id: Optional[str] = None, resume: bool = True):
+        """
+        Args:
+            checkpoint_dir: Root directory of all runs
+            run_id: Run to track (defaults to the latest unfinished run when
+                resuming, otherwise a new run)
+            resume: Continue the latest run if it did not complete
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        
+        if run_id is None and resume:
+            run_id = self._latest_unfinished_run()
+        if run_id is None:
+            run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        
+        self.run_id = run_id
+        self.run_dir = self.checkpoint_dir / run_id
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.progress_path = self.run_dir / PROGRESS_FILENAME
+        
+        if not self.progress_path.exists():
+            now = datetime.now().isoformat()
+            self._save_progress({
+                'run_id': run_id,
+                'status': 'running',
+                'started_at': now,
+                'updated_at': now,
+                'steps_completed': [],
+                'steps_failed': [],
+                'checkpoints': {},
+            })
+        _write_json_atomic(self.checkpoint_dir / LATEST_RUN_FILENAME, {'run_id': run_id})
+        
+        logger.info(f"Tracking progress for run {run_id}")
+    
+    @property
+    def progress(self) -> Dict[str, Any]:
+        """Current progress of the run (read from disk)"""
+        try:
+            with open(self.progress_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read progress file: {str(e)}")
+            return {'run_id': self.run_id, 'steps_completed': [], 'steps_failed': [], 'checkpoints': {}}
+    
+    def _save_progress(self, progress: Dict[str, Any]):
+        progress['updated_at'] = datetime.now().isoformat()
+        _write_json_atomic(self.progress_path, progress)
+    
+    def _latest_unfinished_run(self) -> Optional[str]:
+        latest_path = self.checkpoint_dir / LATEST_RUN_FILENAME
+        try:
+            with open(latest_path, 'r', encoding='utf-8') as f:
+                run_id = json.load(f)['run_id']
+            with open(self.checkpoint_dir / run_id / PROGRESS_FILENAME, 'r', encoding='utf-8') as f:
+                status = json.load(f).get('status')
+        except (OSError, ValueError, KeyError):
+            return None
+        return run_id if status != 'completed' else None
+    
+    def mark_step_completed(self, step: str):
+        """Record a step as completed"""
+        progress = self.progress
+        if step not in progress['steps_completed']:
+            progress['steps_completed'].append(step)
+        progress['steps_failed'] = [entry for entry in progress['steps_failed'] if entry.get('step') != step]
+        self._save_progress(progress)
+    
+    def mark_step_failed(self, step: str, error: str):
+        """Record a step failure"""
+        progress = self.progress
+        progress['steps_failed'].append({'step': step, 'error': error, 'timestamp': datetime.now().isoformat()})
+        self._save_progress(progress)
+    
+    def is_step_completed(self, step: str) -> bool:
+        return step in self.progress['steps_completed']
+    
+    def mark_run_completed(self):
+        """Record the run as finished, so the next tracker starts a new run"""
+        progress = self.progress
+        progress['status'] = 'completed'
+        self._save_progress(progress)
+    
+    def save_checkpoint(self, step: str, df: pd.DataFrame) -> Optional[Path]:
+        """
+        Checkpoint a step's output DataFrame
+        
+        Written as zstd-compressed Parquet, falling back to pickle for frames
+        Arrow cannot represent (or when pyarrow is not installed).
+        """
+        if df is None:
+            return None
+        
+        checkpoint_path = None
+        schema = None
+        if PYARROW_AVAILABLE:
+            checkpoint_path = self.run_dir / f"{step}.parquet"
+            temp_path = checkpoint_path.with_name(f".{checkpoint_path.name}.tmp")
+            try:
+                df.to_parquet(temp_path, engine='pyarrow', compression='zstd')
+                schema = [[field.name, str(field.type)] for field in pq.read_schema(temp_path)]
+            except Exception as e:
+                logger.warning(f"Could not write {step} checkpoint as Parquet ({str(e)}) - using pickle")
+                temp_path.unlink(missing_ok=True)
+                checkpoint_path = None
+        
+        if checkpoint_path is None:
+            checkpoint_path = self.run_dir / f"{step}.pkl"
+            temp_path = checkpoint_path.with_name(f".{checkpoint_path.name}.tmp")
+            with open(temp_path, 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+        
+        os.replace(temp_path, checkpoint_path)
+        
+        # Remove a checkpoint of the same step in the other format
+        for stale in self.run_dir.glob(f"{step}.*"):
+            if stale != checkpoint_path:
+                stale.unlink(missing_ok=True)
+        
+        progress = self.progress
+        progress['checkpoints'][step] = {
+            'path': checkpoint_path.name,
+            'format': checkpoint_path.suffix.lstrip('.'),
+            'row_count': len(df),
+            'schema': schema,
+            'size_bytes': checkpoint_path.stat().st_size,
+            'written_at': datetime.now().isoformat(),
+        }
+        self._save_progress(progress)
+        
+        logger.info(f"✓ Checkpoint saved: {step} ({len(df)} rows)")
+        return checkpoint_path
+    
+    def checkpoint_info(self, step: str) -> Optional[Dict[str, Any]]:
+        """Path, row count and schema of a step's checkpoint, without reading it"""
+        return self.progress['checkpoints'].get(step)
+    
+    def load_checkpoint_data(self, step: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load a step's checkpoint, reading only the requested columns
+        
+        Returns:
+            The checkpointed DataFrame, or None if the step has no checkpoint
+        """
+        info = self.checkpoint_info(step)
+        if info is None:
+            return None
+        
+        checkpoint_path = self.run_dir / info['path']
+        if not checkpoint_path.exists():
+            logger.warning(f"Checkpoint for {step} is missing: {checkpoint_path}")
+            return None
+        
+        try:
+            if info['format'] == 'parquet':
+                if columns is not None:
+                    schema_names = {name for name, _ in info['schema']}
+                    columns = [col for col in columns if col in schema_names]
+                return pd.read_parquet(checkpoint_path, engine='pyarrow', columns=columns)
+            
+            with open(checkpoint_path, 'rb') as f:
+                df = pickle.load(f)
+            return df[[col for col in columns if col in df.columns]] if columns is not None else df
+        except Exception as e:
+            logger.warning(f"Could not load checkpoint for {step}: {str(e)}")
+            return None
+    
+    def get_progress_summary(self) -> Dict[str, Any]:
+        """Counts of completed and failed steps and the checkpointed steps"""
+        progress = self.progress
+        return {
+            'run_id': self.run_id,
+            'status': progress.get('status'),
+            'steps_completed': len(progress['steps_completed']),
+            'steps_failed': len(progress['steps_failed']),
+            'completed': list(progress['steps_completed']),
+            'checkpoints': {
+                step: info['row_count'] for step, info in progress.get('checkpoints', {}).items()
+            },
+        }
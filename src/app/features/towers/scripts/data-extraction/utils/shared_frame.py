@@ -0,0 +1,100 @@
+"""
+Shared Frame
+Publish a DataFrame once as an Arrow IPC file in shared memory so that
+worker processes memory-map it read-only instead of unpickling a copy
+"""
+
+import logging
+import os
+import tempfile
+import uuid
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional Arrow IPC backend
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow not available - stage inputs will be pickled to workers")
+
+# tmpfs-backed on Linux; elsewhere the page cache still shares mapped pages
+SHARED_MEMORY_DIR = Path('/dev/shm') if Path('/dev/shm').is_dir() else Path(tempfile.gettempdir())
+
+
+class SharedFrame:
+    """
+    Handle to a DataFrame published in shared memory
+    
+    The handle only carries the file path, so it pickles in constant size.
+    open() maps the file and builds the DataFrame on top of the mapped Arrow
+    buffers: numeric columns without nulls and Arrow-backed string columns
+    are not copied, and their arrays are read-only. Every worker mapping the
+    same file shares one set of physical pages.
+    """
+    
+    def __init__(self, path: Path, num_rows: int):
+        self.path = Path(path)
+        self.num_rows = num_rows
+    
+    def __repr__(self) -> str:
+        return f"SharedFrame({str(self.path)!r}, rows={self.num_rows})"
+    
+    def __len__(self) -> int:
+        return self.num_rows
+    
+    @classmethod
+    def publish(cls, df: pd.DataFrame, directory: Optional[Path] = None) -> 'SharedFrame':
+        """
+        Write a DataFrame to shared memory
+        
+        Raises:
+            RuntimeError: If pyarrow is not installed
+            pyarrow.ArrowException: If a column cannot be represented in Arrow
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required to share DataFrames between processes")
+        
+        directory = Path(directory) if directory is not None else SHARED_MEMORY_DIR
+        path = directory / f"tower_frame_{os.getpid()}_{uuid.uuid4().hex}.arrow"
+        temp_path = path.with_name(f".{path.name}.tmp")
+        
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        try:
+            with pa.OSFile(str(temp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        
+        logger.debug(f"Published {len(df)} rows to {path} ({path.stat().st_size / 1024 ** 2:.1f} MB)")
+        return cls(path, len(df))
+    
+    def open(self, columns: Optional[list] = None) -> pd.DataFrame:
+        """Map the shared frame as a read-only DataFrame"""
+        source = pa.memory_map(str(self.path), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([col for col in columns if col in table.column_names])
+        return table.to_pandas(split_blocks=True, self_destruct=False)
+    
+    def unlink(self):
+        """Remove the shared file (mapped views stay valid until released)"""
+        self.path.unlink(missing_ok=True)
+    
+    def __enter__(self) -> 'SharedFrame':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.unlink()
+
+
+def resolve_shared(value):
+    """Open a SharedFrame handle, passing any other value through"""
+    return value.open() if isinstance(value, SharedFrame) else value
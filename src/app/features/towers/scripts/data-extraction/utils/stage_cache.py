@@ -0,0 +1,242 @@
+"""
+Stage Cache
+Content-addressed cache of pipeline stage outputs, keyed by a hash of the
+stage's input frames, parameters and code, with size-bounded LRU eviction
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import types
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _hash_values(values) -> bytes:
+    """Row hashes of a Series or Index"""
+    try:
+        hashed = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+        # Unhashable cells (e.g. list columns) are hashed by their text form
+        hashed = pd.util.hash_pandas_object(values.astype(str), index=False)
+    return hashed.to_numpy().tobytes()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of a DataFrame's columns, dtypes, index and values"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(json.dumps([str(name) for name in df.index.names] + [str(df.index.dtype)]).encode('utf-8'))
+    digest.update(str(df.shape).encode('utf-8'))
+    
+    # Stages align, join and select on the index, so it is part of the content
+    digest.update(_hash_values(df.index))
+    for col in df.columns:
+        digest.update(_hash_values(df[col]))
+    
+    return digest.hexdigest()
+
+
+def value_fingerprint(value: Any) -> str:
+    """Hash of a stage input (DataFrame, Series, array or JSON-serialisable value)"""
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if isinstance(value, pd.Series):
+        return frame_fingerprint(value.to_frame())
+    if isinstance(value, np.ndarray):
+        return hashlib.sha256(value.tobytes() + str(value.dtype).encode('utf-8')).hexdigest()
+    if isinstance(value, (list, tuple)):
+        return hashlib.sha256(''.join(value_fingerprint(v) for v in value).encode('utf-8')).hexdigest()
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _code_bytes(code: types.CodeType) -> bytes:
+    """Bytecode, names and constants of a code object and the functions nested in it"""
+    parts = [code.co_code, repr(code.co_names).encode('utf-8')]
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            parts.append(_code_bytes(const))
+        elif isinstance(const, frozenset):
+            # Set literals have no stable order across interpreter runs
+            parts.append(repr(sorted(map(repr, const))).encode('utf-8'))
+        else:
+            parts.append(repr(const).encode('utf-8'))
+    return b'\0'.join(parts)
+
+
+def code_fingerprint(func: Any) -> str:
+    """
+    Hash of the code of a stage function, so editing it invalidates its cached outputs
+    
+    Accepts a function, a class (all of its methods are hashed, for stages
+    that delegate to one) or a list of either.
+    """
+    if isinstance(func, (list, tuple)):
+        return hashlib.sha256(''.join(code_fingerprint(f) for f in func).encode('utf-8')).hexdigest()
+    if inspect.isclass(func):
+        methods = sorted((name, inspect.unwrap(getattr(attr, '__func__', attr)))
+                         for name, attr in vars(func).items()
+                         if callable(getattr(attr, '__func__', attr)) or isinstance(attr, property))
+        parts = [name + code_fingerprint(method.fget if isinstance(method, property) else method)
+                 for name, method in methods]
+        return hashlib.sha256(''.join(parts).encode('utf-8')).hexdigest()
+    func = inspect.unwrap(func)
+    if isinstance(func, functools.partial):
+        return hashlib.sha256((code_fingerprint(func.func) + value_fingerprint(
+            [list(func.args), func.keywords])).encode('utf-8')).hexdigest()
+    code = getattr(func, '__code__', None) or getattr(getattr(type(func), '__call__', None), '__code__', None)
+    if code is None:
+        # Builtins have no bytecode; their qualified name identifies them
+        return hashlib.sha256(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+                              .encode('utf-8')).hexdigest()
+    return hashlib.sha256(_code_bytes(code)).hexdigest()
+
+
+class StageCache:
+    """
+    Cache stage outputs on disk keyed by the content of their inputs
+    
+    Each entry is one pickle file named by its key. Hits refresh the file's
+    modification time, and after every write the least recently used entries
+    are evicted until the cache fits in max_bytes.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = 2 * 1024 ** 3, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def key(self, stage_name: str, inputs: Optional[List[Any]] = None,
+            params: Optional[Dict[str, Any]] = None, func: Any = None,
+            version: Any = None) -> str:
+        """
+        Cache key for a stage run
+        
+        Args:
+            stage_name: Stage name (prefix of the key)
+            inputs: Input frames/values the stage output depends on
+            params: Stage parameters the output depends on
+            func: Stage function, or the functions and classes it runs
+                (see code_fingerprint); their bytecode is hashed so code
+                changes invalidate the entry
+            version: Salt to bump when the output changes for reasons the
+                function's own code does not show (e.g. helpers it calls)
+        """
+        digest = hashlib.sha256(stage_name.encode('utf-8'))
+        for value in inputs or []:
+            digest.update(value_fingerprint(value).encode('utf-8'))
+        digest.update(value_fingerprint(params or {}).encode('utf-8'))
+        if func is not None:
+            digest.update(code_fingerprint(func).encode('utf-8'))
+        if version is not None:
+            digest.update(value_fingerprint(version).encode('utf-8'))
+        return f"{stage_name}-{digest.hexdigest()[:32]}"
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Cached output for a key, or default on a miss"""
+        path = self._entry_path(key)
+        if not self.enabled or not path.exists():
+            self.misses += 1
+            return default
+        
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {str(e)}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return default
+        
+        os.utime(path)  # Mark as recently used
+        self.hits += 1
+        return value
+    
+    def put(self, key: str, value: Any) -> Optional[Path]:
+        """Store a stage output and evict old entries beyond the size budget"""
+        if not self.enabled:
+            return None
+        
+        path = self._entry_path(key)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        
+        self.evict()
+        return path
+    
+    def get_or_compute(self, stage_name: str, compute: Callable[[], Any],
+                       inputs: Optional[List[Any]] = None,
+                       params: Optional[Dict[str, Any]] = None,
+                       func: Any = None, version: Any = None) -> Any:
+        """
+        Return the cached output of a stage, computing and storing it on a miss
+        
+        Args:
+            stage_name: Stage name (prefix of the cache key)
+            compute: Zero-argument callable that runs the stage
+            inputs: Input frames/values the stage output depends on
+            params: Stage parameters the output depends on
+            func: Function whose code the output depends on (see key)
+            version: Salt to bump when the output changes (see key)
+        """
+        key = self.key(stage_name, inputs, params, func=func, version=version)
+        value = self.get(key, default=_MISSING)
+        if value is not _MISSING:
+            logger.info(f"  Cache hit for {stage_name} ({key})")
+            return value
+        
+        value = compute()
+        self.put(key, value)
+        return value
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted cache entry {path.name}")
+    
+    def clear(self):
+        """Remove every cache entry"""
+        for path in self.cache_dir.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        sizes = [path.stat().st_size for path in self.cache_dir.glob("*.pkl")]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(sizes),
+            'size_bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,309 @@
+"""
+Stage Graph
+Declarative pipeline stages with explicit inputs and outputs, scheduled so
+that independent stages run concurrently in a process pool
+"""
+
+import logging
+import os
+import pickle
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .shared_frame import SharedFrame, resolve_shared, PYARROW_AVAILABLE
+from .stage_cache import StageCache
+from .stage_telemetry import StageTelemetry, measure_call, profiled, row_count
+from .timeout_handler import StageTimeoutError, run_isolated, timeout_records
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class Stage:
+    """
+    A pipeline stage
+    
+    The stage function is called with its inputs as keyword arguments. It
+    returns the single output value, or a tuple in ``outputs`` order when the
+    stage has several outputs. Functions must be importable module-level
+    callables so they can be sent to worker processes.
+    
+    Cached outputs are keyed by the inputs and the function's bytecode; bump
+    ``version`` when the output changes through code the function calls.
+    A stage with a ``timeout`` runs in an isolated child that is killed once
+    the budget (seconds) is exhausted, and is then recorded as failed.
+    """
+    
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = (), cacheable: bool = True, parallel: bool = True,
+                 version: Any = None, timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cacheable = cacheable
+        self.parallel = parallel
+        self.version = version
+        self.timeout = timeout
+    
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+    
+    def unpack(self, result: Any) -> Dict[str, Any]:
+        """Map a stage function's return value to its named outputs"""
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        return dict(zip(self.outputs, result))
+
+
+class _NullSink:
+    """Write target that discards pickled bytes"""
+    
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def _can_pickle(value: Any) -> bool:
+    """Whether a value can be sent to a worker process (pickled into a null sink)"""
+    try:
+        pickle.Pickler(_NullSink(), protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+        return True
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+
+
+def _call_stage(func: Callable, kwargs: Dict[str, Any], profile_path: Optional[str] = None,
+                timeout: Optional[float] = None, name: Optional[str] = None) -> Tuple[Any, Dict]:
+    """Call a stage function and measure it, in an isolated child when it has a timeout"""
+    if timeout is None:
+        return measure_call(func, profile_path=profile_path, **kwargs)
+    # The work runs in the child, so it is profiled there
+    return measure_call(run_isolated, profiled(func, profile_path), timeout=timeout,
+                        operation_name=name, **kwargs)
+
+
+def _run_stage(func: Callable, kwargs: Dict[str, Any], profile_path: Optional[str] = None,
+               timeout: Optional[float] = None, name: Optional[str] = None) -> Tuple[Any, Dict]:
+    """Worker entry point, mapping shared-memory inputs read-only and measuring the stage"""
+    kwargs = {name: resolve_shared(value) for name, value in kwargs.items()}
+    return _call_stage(func, kwargs, profile_path, timeout, name)
+
+
+class StageGraph:
+    """Run a set of stages in dependency order, concurrently where possible"""
+    
+    def __init__(self, stages: List[Stage]):
+        self.stages = {}
+        producers = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Output {output!r} produced by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+            self.stages[stage.name] = stage
+        self.producers = producers
+        self._check_acyclic()
+        self.timings: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        self.skipped: List[str] = []
+        self.telemetry: Optional[StageTelemetry] = None
+    
+    def run(self, context: Dict[str, Any], workers: Optional[int] = None,
+            cache: Optional[StageCache] = None, share_frames: bool = True,
+            telemetry: Optional[StageTelemetry] = None) -> Dict[str, Any]:
+        """
+        Run every stage whose inputs can be satisfied
+        
+        Args:
+            context: Initial artefacts (name -> value); outputs are added to it
+            workers: Worker processes (None for all cores, 1 for serial execution)
+            cache: Optional stage cache for cacheable stages
+            share_frames: Hand DataFrame inputs to workers through shared
+                memory (published once, mapped read-only by every worker)
+                instead of pickling a copy per stage
+            telemetry: Optional telemetry receiving one record per stage,
+                measured in the process that ran it
+        
+        Returns:
+            The context with all produced outputs. Stages that fail are logged
+            and recorded in ``failed``; stages depending on them are skipped.
+        """
+        context = dict(context)
+        self.timings, self.failed, self.skipped = {}, {}, []
+        self.telemetry = telemetry
+        
+        missing = {
+            name for stage in self.stages.values() for name in stage.inputs
+            if name not in context and name not in self.producers
+        }
+        if missing:
+            raise ValueError(f"Stage inputs neither provided nor produced: {sorted(missing)}")
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        pending = dict(self.stages)
+        shared = {}
+        executor = None
+        if workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable ({str(e)}) - running stages serially")
+        
+        try:
+            running = {}
+            while pending or running:
+                ready = [stage for stage in pending.values() if self._is_ready(stage, context)]
+                
+                for stage in ready:
+                    del pending[stage.name]
+                    cache_key = None
+                    if cache is not None and stage.cacheable:
+                        cache_key = cache.key(stage.name, [context[name] for name in stage.inputs],
+                                              func=stage.func, version=stage.version)
+                        cached = cache.get(cache_key, default=_MISSING)
+                        if cached is not _MISSING:
+                            logger.info(f"  [{stage.name}] cache hit")
+                            context.update(cached)
+                            self.timings[stage.name] = 0.0
+                            self._record_telemetry(stage, context, {'wall_s': 0.0}, cached, cache_hit=True)
+                            continue
+                    
+                    kwargs = {name: context[name] for name in stage.inputs}
+                    profile_path = telemetry.profile_path(stage.name) if telemetry is not None else None
+                    if executor is not None and stage.parallel:
+                        if share_frames:
+                            worker_kwargs = {name: self._shared_value(name, context[name], shared)
+                                             for name in stage.inputs}
+                        else:
+                            worker_kwargs = kwargs
+                        if _can_pickle((stage.func, worker_kwargs)):
+                            future = executor.submit(_run_stage, stage.func, worker_kwargs, profile_path,
+                                                     stage.timeout, stage.name)
+                            running[future] = (stage, cache_key, time.time())
+                            continue
+                        # Functions or inputs that cannot cross the process
+                        # boundary (lambdas, locks, open handles) run in-process
+                        logger.warning(f"  [{stage.name}] cannot be sent to a worker - running in-process")
+                    
+                    self._finish(stage, cache_key, time.time(), context, cache,
+                                 lambda: _call_stage(stage.func, kwargs, profile_path, stage.timeout, stage.name))
+                
+                if not running:
+                    if pending and not any(self._is_ready(stage, context) for stage in pending.values()):
+                        break
+                    continue
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, cache_key, started = running.pop(future)
+                    self._finish(stage, cache_key, started, context, cache, future.result)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            for handle in shared.values():
+                if handle is not None:
+                    handle.unlink()
+        
+        self.skipped = sorted(pending)
+        for name in self.skipped:
+            logger.warning(f"  [{name}] skipped - upstream stage failed")
+        
+        return context
+    
+    def _shared_value(self, name: str, value: Any, shared: Dict[str, Optional[SharedFrame]]) -> Any:
+        """Shared-memory handle for a DataFrame artefact, published on first use"""
+        if not PYARROW_AVAILABLE or not isinstance(value, pd.DataFrame):
+            return value
+        if name not in shared:
+            try:
+                shared[name] = SharedFrame.publish(value)
+            except Exception as e:
+                # Columns Arrow cannot represent (e.g. mixed objects) fall back to pickling
+                logger.debug(f"Could not share {name} ({str(e)}) - pickling it to workers")
+                shared[name] = None
+        return shared[name] if shared[name] is not None else value
+    
+    def _finish(self, stage: Stage, cache_key: Optional[str], started: float,
+                context: Dict[str, Any], cache: Optional[StageCache], get_result: Callable[[], Any]):
+        """
+        Collect a stage result into the context, recording time and failures
+        
+        The stage has already run, so any error (including a result that could
+        not be sent back from a worker) is recorded as a failure, never retried.
+        """
+        try:
+            result, usage = get_result()
+            outputs = stage.unpack(result)
+        except Exception as e:
+            self._record_failure(stage, context, e)
+            return
+        
+        self.timings[stage.name] = time.time() - started
+        self._record_telemetry(stage, context, usage, outputs, cache_hit=False if cache_key else None)
+        context.update(outputs)
+        if cache is not None and cache_key is not None:
+            cache.put(cache_key, outputs)
+        logger.info(f"  [{stage.name}] done in {self.timings[stage.name]:.2f}s")
+    
+    def _check_acyclic(self):
+        """Raise if stage dependencies form a cycle"""
+        state = {}
+        
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Stage dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for input_name in self.stages[name].inputs:
+                if input_name in self.producers:
+                    visit(self.producers[input_name], path + [name])
+            state[name] = 'done'
+        
+        for name in self.stages:
+            visit(name, [])
+    
+    def _record_failure(self, stage: Stage, context: Dict[str, Any], error: Exception):
+        # Timeouts in worker processes were recorded there; keep them with this run's
+        if isinstance(error, StageTimeoutError) and not any(record is error.record for record in timeout_records):
+            timeout_records.append(error.record)
+        self.failed[stage.name] = str(error)
+        logger.warning(f"  [{stage.name}] failed: {str(error)}")
+        self._record_telemetry(stage, context, {}, {}, error=str(error))
+    
+    def _record_telemetry(self, stage: Stage, context: Dict[str, Any], usage: Dict, outputs: Dict,
+                          cache_hit: Optional[bool] = None, error: Optional[str] = None):
+        if self.telemetry is None:
+            return
+        rows_in = next((row_count(context[name]) for name in stage.inputs
+                        if row_count(context.get(name)) is not None), None)
+        rows_out = next((row_count(value) for value in outputs.values() if row_count(value) is not None), None)
+        self.telemetry.record_stage(
+            stage.name, usage, rows_in=rows_in, rows_out=rows_out, cache_hit=cache_hit, error=error,
+            profile_path=self.telemetry.profile_path(stage.name) if cache_hit is not True else None
+        )
+    
+    def _is_ready(self, stage: Stage, context: Dict[str, Any]) -> bool:
+        return all(name in context for name in stage.inputs)
+    
+    def critical_path_seconds(self) -> float:
+        """Longest chain of recorded stage timings through the graph"""
+        finish = {}
+        
+        def finish_time(name: str) -> float:
+            if name not in finish:
+                stage = self.stages[name]
+                upstream = [finish_time(self.producers[i]) for i in stage.inputs if i in self.producers]
+                finish[name] = max(upstream, default=0.0) + self.timings.get(name, 0.0)
+            return finish[name]
+        
+        return max((finish_time(name) for name in self.stages), default=0.0)
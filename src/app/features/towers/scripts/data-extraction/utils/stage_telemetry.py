@@ -0,0 +1,346 @@
+"""
+Stage Telemetry
+Per-stage wall time, CPU time, peak RSS, rows in/out, bytes read/written
+and cache hit/miss, written to a JSON-lines run log and a summary table
+"""
+
+import cProfile
+import json
+import logging
+import sys
+import time
+import uuid
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional POSIX resource accounting
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+PROC_IO_PATH = Path('/proc/self/io')
+PROC_STATUS_PATH = Path('/proc/self/status')
+PROC_CLEAR_REFS_PATH = Path('/proc/self/clear_refs')
+RUN_LOG_FILENAME = "stage_runs.jsonl"
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_TO_MB = 1 / 1024 ** 2 if sys.platform == 'darwin' else 1 / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's RSS high-water mark (VmHWM), so the next reading
+    is the peak since now
+    
+    Returns:
+        True if the mark was reset (Linux 4.0+), False if unsupported
+    """
+    try:
+        PROC_CLEAR_REFS_PATH.write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+def _read_hwm_mb() -> Optional[float]:
+    """This process's RSS high-water mark from /proc (None if unavailable)"""
+    try:
+        for line in PROC_STATUS_PATH.read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def resource_snapshot(reset_peak: bool = False) -> Dict[str, Optional[float]]:
+    """
+    Cumulative CPU time and I/O, and peak RSS, of this process and its reaped children
+    
+    CPU time and I/O of children (isolated stages) are included once they
+    have been joined. Values that cannot be measured on this platform are None.
+    
+    Args:
+        reset_peak: Reset this process's RSS high-water mark first, so that
+            usage_delta() reports the peak between the two snapshots
+    """
+    snapshot = {'cpu_s': None, 'own_peak_mb': None, 'children_peak_mb': None,
+                'peak_reset': reset_peak and reset_peak_rss(),
+                'bytes_read': None, 'bytes_written': None}
+    
+    if RESOURCE_AVAILABLE:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        snapshot['cpu_s'] = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+        snapshot['own_peak_mb'] = own.ru_maxrss * _MAXRSS_TO_MB
+        snapshot['children_peak_mb'] = children.ru_maxrss * _MAXRSS_TO_MB
+    else:
+        snapshot['cpu_s'] = time.process_time()
+    
+    # VmHWM follows resets, unlike ru_maxrss which keeps the lifetime peak
+    hwm = _read_hwm_mb()
+    if hwm is not None:
+        snapshot['own_peak_mb'] = hwm
+    
+    # Syscall-level read/write bytes, including reaped children (Linux only)
+    try:
+        counters = dict(line.split(': ') for line in PROC_IO_PATH.read_text().splitlines())
+        snapshot['bytes_read'] = int(counters['rchar'])
+        snapshot['bytes_written'] = int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        pass
+    
+    return snapshot
+
+
+def usage_delta(before: Dict[str, Optional[float]], after: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+    """
+    Resource usage between two snapshots
+    
+    Peak RSS is the largest resident set of this process, or of a child
+    reaped in between, during the interval. High-water marks that cannot be
+    reset only show the interval's peak when it set a new mark; otherwise
+    the interval peak is unknown and left out.
+    """
+    delta = {}
+    for key in ('cpu_s', 'bytes_read', 'bytes_written'):
+        delta[key] = after[key] - before[key] if after[key] is not None and before[key] is not None else None
+    
+    peaks = []
+    for key in ('own_peak_mb', 'children_peak_mb'):
+        if after[key] is None:
+            continue
+        if (key == 'own_peak_mb' and before['peak_reset']) or before[key] is None or after[key] > before[key]:
+            peaks.append(after[key])
+    delta['peak_rss_mb'] = max(peaks, default=None)
+    return delta
+
+
+def row_count(value: Any) -> Optional[int]:
+    """Rows in a DataFrame-like value (first DataFrame of a tuple), else None"""
+    if isinstance(value, tuple):
+        return next((row_count(item) for item in value if row_count(item) is not None), None)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def measure_call(func: Callable, *args, profile_path: Optional[Path] = None, **kwargs) -> Tuple[Any, Dict]:
+    """
+    Call a function and measure its resource usage in the calling process
+    
+    Used inside worker and child processes, where the parent cannot observe
+    CPU time or I/O until the process exits.
+    
+    Returns:
+        Tuple of (result, usage dict)
+    """
+    before = resource_snapshot(reset_peak=True)
+    started = time.perf_counter()
+    profiler = cProfile.Profile() if profile_path is not None else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            Path(profile_path).parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(profile_path))
+    usage = usage_delta(before, resource_snapshot())
+    usage['wall_s'] = time.perf_counter() - started
+    return result, usage
+
+
+class StageRecord:
+    """Telemetry of one stage run, filled in while the stage executes"""
+    
+    def __init__(self, run_id: str, stage: str, rows_in: Optional[int] = None):
+        self.run_id = run_id
+        self.stage = stage
+        self.started_at = datetime.now().isoformat()
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.cache_hit = None
+        self.status = 'ok'
+        self.error = None
+        self.usage: Dict[str, Optional[float]] = {}
+        self.profile_path = None
+    
+    def set_output(self, value: Any):
+        """Record rows out from a stage result"""
+        self.rows_out = row_count(value)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'run_id': self.run_id,
+            'stage': self.stage,
+            'started_at': self.started_at,
+            'status': self.status,
+            'wall_s': _round(self.usage.get('wall_s'), 3),
+            'cpu_s': _round(self.usage.get('cpu_s'), 3),
+            'peak_rss_mb': _round(self.usage.get('peak_rss_mb'), 1),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'bytes_read': self.usage.get('bytes_read'),
+            'bytes_written': self.usage.get('bytes_written'),
+            'cache': None if self.cache_hit is None else ('hit' if self.cache_hit else 'miss'),
+            'error': self.error,
+            'profile': str(self.profile_path) if self.profile_path else None,
+        }
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return round(value, digits) if value is not None else None
+
+
+class StageTelemetry:
+    """
+    Record resource telemetry for every stage of a pipeline run
+    
+    Each finished stage is appended to a JSON-lines log shared by all runs,
+    so stage costs can be compared across runs. write_summary() writes the
+    per-run summary table. With profile=True, in-process stages (and callables
+    wrapped with profiled()) also dump cProfile stats per stage, readable
+    with pstats, snakeviz or converted for speedscope.
+    """
+    
+    def __init__(self, output_dir: Path, run_id: Optional[str] = None, profile: bool = False):
+        self.output_dir = Path(output_dir)
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.profile = profile
+        self.log_path = self.output_dir / RUN_LOG_FILENAME
+        self.profile_dir = self.output_dir / "profiles" / self.run_id
+        self.records: List[StageRecord] = []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+    
+    def profile_path(self, stage_name: str) -> Optional[Path]:
+        """cProfile dump path of a stage (None when profiling is disabled)"""
+        if not self.profile:
+            return None
+        safe_name = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in stage_name)
+        return self.profile_dir / f"{safe_name}.prof"
+    
+    @contextmanager
+    def stage(self, stage_name: str, rows_in: Any = None, profile_in_process: bool = True) -> Iterator[StageRecord]:
+        """
+        Measure a block as one stage
+        
+        Args:
+            stage_name: Stage name in the run log
+            rows_in: Input row count, or a DataFrame to count
+            profile_in_process: Profile the block in this process; disable
+                when the work runs in a child wrapped with profiled()
+        """
+        if rows_in is not None and not isinstance(rows_in, int):
+            rows_in = row_count(rows_in)
+        record = StageRecord(self.run_id, stage_name, rows_in)
+        
+        logger.info(f"Starting: {stage_name}")
+        profiler = None
+        profile_path = self.profile_path(stage_name)
+        if profile_path is not None and profile_in_process:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        
+        before = resource_snapshot(reset_peak=True)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.status = 'error'
+            record.error = str(e)
+            raise
+        finally:
+            wall = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+                profile_path.parent.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(profile_path))
+            record.profile_path = profile_path
+            record.usage = usage_delta(before, resource_snapshot())
+            record.usage['wall_s'] = wall
+            self._append(record)
+            logger.info(f"Finished: {stage_name} ({wall:.2f}s wall, "
+                        f"{record.usage['cpu_s'] or 0:.2f}s CPU)")
+    
+    def record_stage(self, stage_name: str, usage: Dict[str, Optional[float]], rows_in: Optional[int] = None,
+                     rows_out: Optional[int] = None, cache_hit: Optional[bool] = None,
+                     error: Optional[str] = None, profile_path: Optional[Path] = None) -> StageRecord:
+        """Record a stage measured elsewhere (e.g. in a worker process with measure_call)"""
+        record = StageRecord(self.run_id, stage_name, rows_in)
+        record.rows_out = rows_out
+        record.cache_hit = cache_hit
+        record.usage = usage
+        record.profile_path = profile_path
+        if error is not None:
+            record.status, record.error = 'error', error
+        self._append(record)
+        return record
+    
+    def _append(self, record: StageRecord):
+        self.records.append(record)
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record.to_dict(), ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            logger.warning(f"Could not write stage telemetry: {str(e)}")
+    
+    def summary_table(self) -> pd.DataFrame:
+        """One row per stage of this run, slowest first"""
+        if not self.records:
+            return pd.DataFrame()
+        summary = pd.DataFrame([record.to_dict() for record in self.records])
+        summary = summary.drop(columns=['run_id', 'started_at'])
+        return summary.sort_values('wall_s', ascending=False, na_position='last').reset_index(drop=True)
+    
+    def identify_bottlenecks(self, threshold_seconds: float = 1.0) -> List[Dict[str, Any]]:
+        """Stages of this run slower than a wall-time threshold, slowest first"""
+        summary = self.summary_table()
+        if summary.empty:
+            return []
+        return summary[summary['wall_s'] >= threshold_seconds].to_dict('records')
+    
+    def write_summary(self) -> Optional[Path]:
+        """Write this run's summary table as CSV and log it"""
+        summary = self.summary_table()
+        if summary.empty:
+            return None
+        
+        summary_path = self.output_dir / f"stage_summary_{self.run_id}.csv"
+        summary.to_csv(summary_path, index=False, encoding='utf-8')
+        
+        columns = ['stage', 'status', 'wall_s', 'cpu_s', 'peak_rss_mb', 'rows_in', 'rows_out', 'cache']
+        logger.info(f"Stage telemetry ({self.run_id}):\n{summary[columns].to_string(index=False)}")
+        logger.info(f"✓ Stage summary saved: {summary_path}")
+        return summary_path
+    
+    @staticmethod
+    def load_run_log(output_dir: Path, run_id: Optional[str] = None) -> pd.DataFrame:
+        """Load the JSON-lines run log, optionally for a single run"""
+        log_path = Path(output_dir) / RUN_LOG_FILENAME
+        if not log_path.exists():
+            return pd.DataFrame()
+        runs = pd.read_json(log_path, lines=True)
+        if run_id is not None and not runs.empty:
+            runs = runs[runs['run_id'] == run_id].reset_index(drop=True)
+        return runs
+
+
+def profiled(func: Callable, profile_path: Optional[Path]) -> Callable:
+    """Wrap a callable so it dumps cProfile stats wherever it runs (e.g. in a child process)"""
+    if profile_path is None:
+        return func
+    
+    def wrapper(*args, **kwargs):
+        result, _ = measure_call(func, *args, profile_path=profile_path, **kwargs)
+        return result
+    
+    return wrapper
@@ -0,0 +1,282 @@
+"""
+Timeout Handler
+Run pipeline operations in a forked child process with a hard time budget,
+retries with backoff and safe defaults on failure
+"""
+
+import functools
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Hard kills need a forked child that inherits the operation (closures included)
+FORK_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+
+# Structured records of every operation killed for overrunning its budget
+timeout_records: List[Dict[str, Any]] = []
+
+
+class StageTimeoutError(TimeoutError):
+    """An isolated operation overran its budget and was killed"""
+    
+    def __init__(self, record: Dict[str, Any]):
+        super().__init__(f"{record['operation']} exceeded {record['timeout_seconds']}s "
+                         f"and was killed after {record['elapsed_seconds']:.1f}s")
+        self.record = record
+    
+    def __reduce__(self):
+        # Rebuilt from the record when sent back from a worker process
+        return type(self), (self.record,)
+
+
+class RemoteError(RuntimeError):
+    """An exception raised in the child process that could not be sent back as-is"""
+
+
+def _send_result(conn, status: str, value: Any):
+    """
+    Send a value to the parent as a pickle-5 stream plus out-of-band buffers
+    
+    Large numpy/Arrow buffers (DataFrame columns) are written to the pipe
+    directly instead of being copied into the pickle stream.
+    """
+    buffers = []
+    payload = pickle.dumps((status, value), protocol=5, buffer_callback=buffers.append)
+    conn.send((len(payload), len(buffers)))
+    conn.send_bytes(payload)
+    for buffer in buffers:
+        conn.send_bytes(buffer.raw())
+
+
+def _child_main(func: Callable, args: tuple, kwargs: dict, conn):
+    """Child process entry point: run the operation and stream the outcome back"""
+    # Own process group, so a kill also reaches any workers the operation starts
+    os.setpgid(0, 0)
+    try:
+        result = func(*args, **kwargs)
+        status = 'ok'
+    except BaseException as e:
+        result = (e, traceback.format_exc())
+        status = 'error'
+    
+    try:
+        _send_result(conn, status, result)
+    except Exception as e:
+        # Unpicklable result or exception
+        _send_result(conn, 'error', (RemoteError(f"{type(e).__name__}: {str(e)}"), traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _receive_result(conn, deadline: float) -> Optional[Tuple[str, Any]]:
+    """Read a result streamed by _send_result, or None if the deadline passes first"""
+    def wait_for_message() -> bool:
+        return conn.poll(max(0.0, deadline - time.monotonic()))
+    
+    if not wait_for_message():
+        return None
+    _, num_buffers = conn.recv()
+    if not wait_for_message():
+        return None
+    payload = conn.recv_bytes()
+    buffers = []
+    for _ in range(num_buffers):
+        if not wait_for_message():
+            return None
+        buffers.append(conn.recv_bytes())
+    return pickle.loads(payload, buffers=buffers)
+
+
+def _record_timeout(operation_name: str, timeout: float, elapsed: float, pid: Optional[int]) -> Dict[str, Any]:
+    record = {
+        'operation': operation_name,
+        'timeout_seconds': timeout,
+        'elapsed_seconds': round(elapsed, 3),
+        'pid': pid,
+        'killed': True,
+        'timestamp': datetime.now().isoformat(),
+    }
+    timeout_records.append(record)
+    return record
+
+
+def _kill_process_group(process):
+    """SIGKILL an isolated child together with every process it started"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+
+
+def run_isolated(func: Callable, *args, timeout: Optional[float] = None,
+                 operation_name: Optional[str] = None, **kwargs) -> Any:
+    """
+    Run a callable in a forked child process and return its result
+    
+    The child is killed (SIGKILL) as soon as the budget is exhausted, even if
+    it is stuck in a CPU-bound loop that never releases the GIL. The child
+    runs in its own process group and may start worker processes of its own;
+    they are killed with it. Side effects on in-memory objects inside the
+    child are not visible to the caller; files it writes are.
+    
+    Where fork is unavailable (Windows) or the caller is itself a daemonic
+    worker, the callable runs in-process without a hard budget.
+    
+    Raises:
+        StageTimeoutError: If the operation overran its budget
+        Exception: Whatever the operation raised
+    """
+    operation_name = operation_name or getattr(func, '__name__', 'operation')
+    
+    if timeout is None or not FORK_AVAILABLE or multiprocessing.current_process().daemon:
+        return func(*args, **kwargs)
+    
+    context = multiprocessing.get_context('fork')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_child_main, args=(func, args, kwargs, child_conn),
+        name=f"isolated-{operation_name}"
+    )
+    
+    started = time.monotonic()
+    process.start()
+    child_conn.close()
+    
+    try:
+        outcome = _receive_result(parent_conn, started + timeout)
+    except EOFError:
+        process.join()
+        outcome = ('error', (RemoteError(f"{operation_name} child exited with code {process.exitcode} "
+                                         "before returning a result"), ''))
+    except BaseException:
+        # Interrupted (e.g. Ctrl-C): the child's group does not receive the signal
+        _kill_process_group(process)
+        process.join()
+        raise
+    finally:
+        parent_conn.close()
+    
+    if outcome is None:
+        _kill_process_group(process)
+        process.join()
+        record = _record_timeout(operation_name, timeout, time.monotonic() - started, process.pid)
+        raise StageTimeoutError(record)
+    
+    process.join()
+    status, value = outcome
+    if status == 'error':
+        error, child_traceback = value
+        if child_traceback:
+            logger.debug(f"{operation_name} failed in child process:\n{child_traceback}")
+        raise error
+    return value
+
+
+def with_timeout(timeout_seconds: float, default_return: Any = None,
+                 operation_name: Optional[str] = None) -> Callable:
+    """
+    Decorator running a function in an isolated child process with a hard budget
+    
+    On timeout or error the failure is logged and default_return is returned.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = operation_name or func.__name__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return run_isolated(func, *args, timeout=timeout_seconds, operation_name=name, **kwargs)
+            except StageTimeoutError as e:
+                logger.error(f"{str(e)} - using default")
+                return default_return
+            except Exception as e:
+                logger.error(f"{name} failed: {str(e)} - using default")
+                return default_return
+        
+        return wrapper
+    return decorator
+
+
+def retry_with_backoff(max_retries: int = 3, base_delay: float = 1.0, backoff_factor: float = 2.0,
+                       exceptions: Tuple[Type[BaseException], ...] = (Exception,)) -> Callable:
+    """
+    Decorator retrying a function with exponential backoff
+    
+    Timeouts are not retried: an operation that overran its budget once is
+    expected to overrun again.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            delay = base_delay
+            for attempt in range(max_retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except StageTimeoutError:
+                    raise
+                except exceptions as e:
+                    if attempt == max_retries:
+                        raise
+                    logger.warning(f"{func.__name__} failed (attempt {attempt + 1}/{max_retries + 1}): "
+                                   f"{str(e)} - retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    delay *= backoff_factor
+        
+        return wrapper
+    return decorator
+
+
+def safe_execute(func: Callable[[], Any], default_return: Any = None,
+                 operation_name: str = "operation", timeout: Optional[float] = None,
+                 max_retries: int = 0, retry_delay: float = 1.0) -> Tuple[Any, bool]:
+    """
+    Execute an operation in isolation, never raising
+    
+    Args:
+        func: Zero-argument callable
+        default_return: Value returned when the operation fails or times out
+        operation_name: Name used in logs and timeout records
+        timeout: Hard budget in seconds per attempt (None runs in-process)
+        max_retries: Retries after a failed attempt (timeouts are not retried)
+        retry_delay: Initial delay between retries, doubled after each one
+    
+    Returns:
+        Tuple of (result or default_return, success flag)
+    """
+    delay = retry_delay
+    for attempt in range(max_retries + 1):
+        try:
+            return run_isolated(func, timeout=timeout, operation_name=operation_name), True
+        except StageTimeoutError as e:
+            logger.error(f"{str(e)} - continuing with default")
+            return default_return, False
+        except Exception as e:
+            if attempt < max_retries:
+                logger.warning(f"{operation_name} failed (attempt {attempt + 1}/{max_retries + 1}): "
+                               f"{str(e)} - retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+            else:
+                logger.error(f"{operation_name} failed: {str(e)} - continuing with default")
+    
+    return default_return, False
+
+
+@contextmanager
+def timed_operation(operation_name: str):
+    """Log the wall time of a block"""
+    logger.info(f"Starting: {operation_name}")
+    started = time.time()
+    try:
+        yield
+    finally:
+        logger.info(f"Finished: {operation_name} ({time.time() - started:.2f}s)")
@@ -10,6 +10,10 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime
 import json
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "data-extraction"))
+from tower_inventory_store import TowerInventoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -85,11 +89,11 @@ class CompleteGeographicReporter:
         logger.info("Loading or generating tower data...")
         
         # Try to load existing inventory
-        tower_files = list(OUTPUT_DIR.glob("complete_tower_inventory_*.csv"))
-        if tower_files:
-            latest_file = max(tower_files, key=lambda p: p.stat().st_mtime)
+        store = TowerInventoryStore(OUTPUT_DIR)
+        latest_file = store.find_latest('complete_tower_inventory')
+        if latest_file is not None:
             logger.info(f"Loading from existing file: {latest_file}")
-            df = pd.read_csv(latest_file)
+            df = store.load(latest_file)
             
             if len(df) > 0:
                 logger.info(f"Loaded {len(df)} towers from existing file")
@@ -10,6 +10,10 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime
 import json
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "data-extraction"))
+from tower_inventory_store import TowerInventoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -543,18 +547,16 @@ def main():
     
     # Load tower data
     logger.info("Loading tower data...")
-    tower_files = list(OUTPUT_DIR.glob("enhanced_tower_inventory_*.csv"))
-    if not tower_files:
-        tower_files = list(OUTPUT_DIR.glob("complete_tower_inventory_*.csv"))
+    store = TowerInventoryStore(OUTPUT_DIR)
+    latest_file = store.find_latest(['enhanced_tower_inventory', 'complete_tower_inventory'])
     
-    if not tower_files:
+    if latest_file is None:
         logger.error("No tower inventory files found. Please run extraction first.")
         return
     
-    latest_file = max(tower_files, key=lambda p: p.stat().st_mtime)
     logger.info(f"Loading from: {latest_file}")
     
-    towers_df = pd.read_csv(latest_file)
+    towers_df = store.load(latest_file)
     logger.info(f"Loaded {len(towers_df)} towers")
     
     # Generate breakdown
@@ -9,6 +9,13 @@ from pathlib import Path
 import pandas as pd
 import json
 from typing import Dict, Optional
+from datetime import date, timedelta
+from functools import partial
+import sys
+import threading
+
+sys.path.append(str(Path(__file__).parent.parent / "data-extraction"))
+from tower_inventory_store import TowerInventoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -17,19 +24,24 @@ app = Flask(__name__)
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 OUTPUT_DIR = DATA_DIR / "outputs" / "tower_locations"
+SCHEDULE_PATH = OUTPUT_DIR / "maintenance_schedule.json"
+ROUTE_PLAN_DIR = OUTPUT_DIR / "route_plans"
+INVENTORY_PREFIXES = ['enhanced_tower_inventory', 'complete_tower_inventory']
 
+# Zone route plans, keyed by zone inventory and planning parameters
+_route_plan_store = {'store': None}
 
-def load_latest_tower_data() -> pd.DataFrame:
-    """Load latest tower inventory"""
-    tower_files = list(OUTPUT_DIR.glob("enhanced_tower_inventory_*.csv"))
-    if not tower_files:
-        tower_files = list(OUTPUT_DIR.glob("complete_tower_inventory_*.csv"))
-    
-    if not tower_files:
-        return pd.DataFrame()
-    
-    latest_file = max(tower_files, key=lambda p: p.stat().st_mtime)
-    return pd.read_csv(latest_file)
+# Maintenance schedule kept in memory: the live scheduler (resumed from the
+# saved plan on first update) and the saved plan, reloaded when the file changes
+_schedule_state = {'scheduler': None, 'plan': None, 'mtime_ns': None}
+# Serializes building, updating, re-planning and saving the live scheduler
+_schedule_lock = threading.Lock()
+
+
+def load_latest_tower_data(columns: Optional[list] = None) -> pd.DataFrame:
+    """Load latest tower inventory, optionally only the given columns"""
+    store = TowerInventoryStore(OUTPUT_DIR)
+    return store.load_latest(INVENTORY_PREFIXES, columns=columns)
 
 
 @app.route('/api/v1/features/categorical', methods=['GET'])
@@ -53,41 +65,169 @@ def get_categorical_features():
 
 @app.route('/api/v1/features/route-planning', methods=['GET'])
 def get_route_planning():
-    """Get optimized maintenance routes"""
+    """Get optimized maintenance routes (stored plans, routing only changed zones)"""
     try:
         from tower_route_planning import TowerRoutePlanner
+        from route_plan_store import ROUTE_COLUMNS
         
-        towers_df = load_latest_tower_data()
-        if towers_df.empty:
+        inventory_path = TowerInventoryStore(OUTPUT_DIR).find_latest(INVENTORY_PREFIXES)
+        if inventory_path is None:
             return jsonify({'error': 'No tower data found'}), 404
         
+        store = get_route_plan_store()
+        inventory_id = store.inventory_id(inventory_path)
+        load_towers = partial(load_latest_tower_data, ROUTE_COLUMNS)
         zone = request.args.get('zone')
         
-        planner = TowerRoutePlanner(towers_df)
-        
         if zone:
-            # Get route for specific zone
-            zone_routes = planner.optimize_routes_by_zone()
-            if zone in zone_routes:
-                route = zone_routes[zone]
-                metrics = planner.calculate_route_metrics(route)
-                return jsonify({
-                    'zone': zone,
-                    'route': route,
-                    'metrics': metrics
-                })
-            else:
+            # Route only the requested zone if it has no stored plan
+            plans = store.zone_plans(inventory_id, load_towers, zones=[zone])
+            if plans is None:
+                return jsonify({'error': 'No tower data found'}), 404
+            if zone not in plans:
                 return jsonify({'error': f'Zone {zone} not found'}), 404
+            return jsonify({
+                'zone': zone,
+                'route': plans[zone]['route'],
+                'metrics': plans[zone]['metrics']
+            })
         else:
             # Get all routes
-            report = planner.generate_route_planning_report()
-            return jsonify(report)
+            plans = store.zone_plans(inventory_id, load_towers)
+            if plans is None:
+                return jsonify({'error': 'No tower data found'}), 404
+            tower_count = store.zone_index(inventory_id, load_towers)['tower_count']
+            return jsonify(TowerRoutePlanner.route_report(plans, tower_count))
             
     except Exception as e:
         logger.error(f"Error in get_route_planning: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
+def get_route_plan_store():
+    """Route plan store shared by requests (plans stay in memory once read)"""
+    if _route_plan_store['store'] is None:
+        from route_plan_store import RoutePlanStore
+        # Serial routing: request threads must not start process pools
+        _route_plan_store['store'] = RoutePlanStore(ROUTE_PLAN_DIR, workers=1)
+    return _route_plan_store['store']
+
+
+def get_maintenance_scheduler():
+    """
+    Live maintenance scheduler over the latest inventory
+    
+    Resumes the saved schedule, with its tower updates, while it covers
+    today; otherwise plans from today, carrying the saved tower updates
+    over. Callers hold _schedule_lock.
+    """
+    if _schedule_state['scheduler'] is None:
+        from maintenance_scheduler import MaintenanceScheduler
+        
+        towers_df = load_latest_tower_data()
+        if towers_df.empty:
+            return None
+        
+        saved = MaintenanceScheduler.load_plan(SCHEDULE_PATH) if SCHEDULE_PATH.exists() else None
+        if saved is not None and date.today() < plan_end(saved):
+            scheduler = MaintenanceScheduler.from_plan(towers_df, saved)
+        else:
+            scheduler = MaintenanceScheduler(towers_df)
+            for tower_id, changes in (saved or {}).get('overrides', {}).items():
+                scheduler.update_tower(tower_id, **changes)
+            scheduler.replan()
+            scheduler.save(SCHEDULE_PATH)
+        _schedule_state['scheduler'] = scheduler
+    return _schedule_state['scheduler']
+
+
+def load_schedule_plan(on: date) -> Optional[Dict]:
+    """Saved maintenance plan covering a day, rebuilt if missing or expired"""
+    from maintenance_scheduler import MaintenanceScheduler
+    
+    try:
+        mtime_ns = SCHEDULE_PATH.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    
+    if mtime_ns is not None and mtime_ns != _schedule_state['mtime_ns']:
+        _schedule_state['plan'] = MaintenanceScheduler.load_plan(SCHEDULE_PATH)
+        _schedule_state['mtime_ns'] = mtime_ns
+    
+    plan = _schedule_state['plan']
+    if plan is None or date.today() >= plan_end(plan):
+        # No plan or an expired one: plan from today
+        with _schedule_lock:
+            scheduler = _schedule_state['scheduler']
+            if scheduler is not None and date.today() >= plan_end(scheduler.to_dict()):
+                _schedule_state['scheduler'] = None
+            if get_maintenance_scheduler() is None:
+                return None
+            plan = _schedule_state['plan'] = MaintenanceScheduler.load_plan(SCHEDULE_PATH)
+            _schedule_state['mtime_ns'] = SCHEDULE_PATH.stat().st_mtime_ns
+    
+    if date.fromisoformat(plan['start_date']) <= on < plan_end(plan):
+        return plan
+    return None
+
+
+def plan_end(plan: Dict) -> date:
+    """First day after a saved plan's horizon"""
+    return date.fromisoformat(plan['start_date']) + timedelta(days=plan['horizon_days'])
+
+
+@app.route('/api/v1/features/route-planning/today', methods=['GET'])
+def get_todays_routes():
+    """Get the day's maintenance routes (default today) from the precomputed schedule"""
+    try:
+        on = date.fromisoformat(request.args['date']) if 'date' in request.args else date.today()
+        plan = load_schedule_plan(on)
+        if plan is None:
+            return jsonify({'error': 'No maintenance schedule available'}), 404
+        
+        zone = request.args.get('zone')
+        if zone is not None and zone not in plan['plans']:
+            return jsonify({'error': f'Zone {zone} not found'}), 404
+        
+        zones = [zone] if zone is not None else list(plan['plans'])
+        return jsonify({
+            'date': on.isoformat(),
+            'generated_at': plan['generated_at'],
+            'zones': {z: plan['plans'][z].get(on.isoformat(), []) for z in zones},
+        })
+    except Exception as e:
+        logger.error(f"Error in get_todays_routes: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/v1/features/route-planning/towers/<tower_id>', methods=['POST'])
+def update_tower_schedule(tower_id: str):
+    """Update a tower's status, priority or next maintenance and re-plan its zone"""
+    try:
+        changes = request.get_json(silent=True) or {}
+        with _schedule_lock:
+            scheduler = get_maintenance_scheduler()
+            if scheduler is None:
+                return jsonify({'error': 'No tower data found'}), 404
+            
+            updated = scheduler.update_tower(
+                tower_id,
+                status=changes.get('status'),
+                priority=changes.get('priority'),
+                next_maintenance=changes.get('next_maintenance')
+            )
+            if not updated:
+                return jsonify({'error': f'Tower {tower_id} not found'}), 404
+            
+            # Routes already driven stay as planned
+            replanned = scheduler.replan(from_date=date.today())
+            scheduler.save(SCHEDULE_PATH)
+        return jsonify({'tower_id': tower_id, 'replanned_zones': replanned})
+    except Exception as e:
+        logger.error(f"Error in update_tower_schedule: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/v1/features/5g', methods=['GET'])
 def get_5g_features():
     """Get 5G expansion features"""
@@ -163,6 +303,8 @@ if __name__ == '__main__':
     logger.info("  GET /api/v1/features/categorical/<type> - Get by category type")
     logger.info("  GET /api/v1/features/route-planning - Get route planning")
     logger.info("  GET /api/v1/features/route-planning?zone=<zone> - Get route for zone")
+    logger.info("  GET /api/v1/features/route-planning/today?zone=<zone> - Get today's scheduled routes")
+    logger.info("  POST /api/v1/features/route-planning/towers/<tower_id> - Update tower and re-plan its zone")
     logger.info("  GET /api/v1/features/5g - Get 5G features")
     logger.info("  GET /api/v1/features/5g/equipment-demand - Get equipment demand")
     app.run(host='0.0.0.0', port=5001, debug=False)
@@ -18,7 +18,7 @@ class HierarchicalFeaturesIntegration:
     """Integrate tower locations with hierarchical features"""
     
     def __init__(self, towers_df: pd.DataFrame):
-        self.towers_df = towers_df.copy()
+        self.towers_df = towers_df
         self.hierarchical_data = {}
     
     def create_hierarchical_structure(self) -> Dict:
@@ -73,7 +73,7 @@ class HierarchicalFeaturesIntegration:
         """Calculate aggregations at different hierarchy levels"""
         logger.info("Calculating hierarchical aggregations...")
         
-        df = self.towers_df.copy()
+        df = self.towers_df
         
         # Region-level aggregations
         if 'region' in df.columns:
@@ -0,0 +1,284 @@
+"""
+Maintenance Scheduler
+Multi-day, priority- and due-date-aware crew route plans per maintenance
+zone, re-planned per zone when towers change
+"""
+
+import json
+import logging
+import math
+import os
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from datetime import date, datetime, timedelta
+
+from tower_route_planning import (
+    TowerRoutePlanner, AVG_SPEED_KMH, SERVICE_HOURS_PER_TOWER, DEFAULT_SHIFT_HOURS,
+)
+from route_optimization import plan_day_routes
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+# Towers with an open maintenance status are due immediately
+OPEN_STATUSES = {'maintenance'}
+# Towers in these statuses are not visited
+EXCLUDED_STATUSES = {'inactive'}
+
+
+def parse_due_dates(values: pd.Series) -> pd.Series:
+    """next_maintenance values (MM/DD/YYYY or ISO) as dates, NaT if missing"""
+    parsed = pd.to_datetime(values, format='%m/%d/%Y', errors='coerce')
+    unparsed = parsed.isna() & values.notna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(values[unparsed], errors='coerce', format='mixed')
+    return parsed.dt.normalize()
+
+
+class MaintenanceScheduler:
+    """
+    Plan maintenance visits as daily crew routes over a horizon
+    
+    Each tower gets a time window from next_maintenance: it becomes eligible
+    window_days before its due date (towers with an open maintenance status
+    are eligible at once). Every day, each zone's crews take the eligible
+    towers most urgent first - overdue or open maintenance, then by
+    priority, then by due date - routed as shift-limited day routes from
+    the zone's central tower.
+    
+    The plan is kept per zone and per date. Changing a tower marks only its
+    zone for re-planning, and today's routes are a dictionary lookup in the
+    precomputed plan, which can be saved and loaded as JSON.
+    """
+    
+    def __init__(self, towers_df: pd.DataFrame, start_date: Optional[date] = None,
+                 horizon_days: int = 14, crews: int = 4, shift_hours: float = DEFAULT_SHIFT_HOURS,
+                 window_days: int = 14):
+        """
+        Args:
+            towers_df: Tower inventory with maintenance_zone, priority, status
+                and next_maintenance columns
+            start_date: First planned day (defaults to today)
+            horizon_days: Number of planned days
+            crews: Crews available per zone and day
+            shift_hours: Working hours per crew day
+            window_days: Days before its due date a tower becomes eligible
+        """
+        self.towers = self._prepare(towers_df)
+        self.start_date = start_date or date.today()
+        self.horizon_days = horizon_days
+        self.crews = max(1, int(crews))
+        self.shift_hours = shift_hours
+        self.window_days = window_days
+        self.plans: Dict[str, Dict[str, List[Dict]]] = {}
+        self.unscheduled: Dict[str, int] = {}
+        self.dirty_zones: Set[str] = set(self.towers['maintenance_zone'].dropna().unique())
+        # Tower updates on top of the inventory, saved with the plan
+        self.overrides: Dict[str, Dict[str, str]] = {}
+        self.generated_at = None
+    
+    @classmethod
+    def from_plan(cls, towers_df: pd.DataFrame, plan: Dict) -> 'MaintenanceScheduler':
+        """
+        Scheduler resuming a saved plan (as written by save)
+        
+        The saved tower updates are applied to the inventory and the saved
+        routes are kept, so no zone is re-planned until a tower changes.
+        """
+        scheduler = cls(
+            towers_df,
+            start_date=date.fromisoformat(plan['start_date']),
+            horizon_days=plan['horizon_days'],
+            crews=plan['crews'],
+            shift_hours=plan['shift_hours'],
+            window_days=plan['window_days']
+        )
+        for tower_id, changes in plan.get('overrides', {}).items():
+            if scheduler._apply_update(tower_id, **changes):
+                scheduler.overrides[tower_id] = dict(changes)
+        scheduler.plans = plan['plans']
+        scheduler.unscheduled = plan.get('unscheduled', {})
+        scheduler.generated_at = plan.get('generated_at')
+        scheduler.dirty_zones.clear()
+        return scheduler
+    
+    @staticmethod
+    def _prepare(towers_df: pd.DataFrame) -> pd.DataFrame:
+        """Towers with valid coordinates, indexed by tower_id, with parsed schedule fields"""
+        columns = ['tower_id', 'maintenance_zone', 'latitude', 'longitude']
+        towers = towers_df[columns].copy()
+        for column, default in (('priority', 'Medium'), ('status', 'active')):
+            towers[column] = towers_df[column].astype(str) if column in towers_df.columns else default
+        towers['due_date'] = (parse_due_dates(towers_df['next_maintenance'])
+                              if 'next_maintenance' in towers_df.columns else pd.NaT)
+        towers = towers[towers['latitude'].notna() & towers['longitude'].notna()]
+        return towers.drop_duplicates('tower_id').set_index('tower_id', drop=False)
+    
+    def update_tower(self, tower_id: str, status: Optional[str] = None, priority: Optional[str] = None,
+                     next_maintenance: Optional[str] = None) -> bool:
+        """
+        Update a tower's schedule fields and mark its zone for re-planning
+        
+        Returns:
+            False if the tower is unknown
+        """
+        if not self._apply_update(tower_id, status, priority, next_maintenance):
+            return False
+        changes = {'status': status, 'priority': priority, 'next_maintenance': next_maintenance}
+        self.overrides.setdefault(tower_id, {}).update(
+            {field: value for field, value in changes.items() if value is not None}
+        )
+        self.dirty_zones.add(self.towers.loc[tower_id, 'maintenance_zone'])
+        return True
+    
+    def _apply_update(self, tower_id: str, status: Optional[str] = None, priority: Optional[str] = None,
+                      next_maintenance: Optional[str] = None) -> bool:
+        """Set a tower's schedule fields; False if the tower is unknown"""
+        if tower_id not in self.towers.index:
+            return False
+        if status is not None:
+            self.towers.loc[tower_id, 'status'] = status
+        if priority is not None:
+            self.towers.loc[tower_id, 'priority'] = priority
+        if next_maintenance is not None:
+            self.towers.loc[tower_id, 'due_date'] = parse_due_dates(pd.Series([next_maintenance])).iloc[0]
+        return True
+    
+    def replan(self, from_date: Optional[date] = None) -> List[str]:
+        """
+        Re-plan zones with changed towers (all zones on the first call)
+        
+        Days before from_date (default: the start date) keep their routes,
+        and towers on them are not planned again.
+        
+        Returns:
+            Zones that were re-planned
+        """
+        from_date = max(from_date or self.start_date, self.start_date)
+        zones = sorted(self.dirty_zones, key=str)
+        for zone in zones:
+            self._plan_zone(zone, from_date)
+        self.dirty_zones.clear()
+        self.generated_at = datetime.now().isoformat()
+        if zones:
+            logger.info(f"✓ Re-planned {len(zones)} zones from {from_date.isoformat()}")
+        return zones
+    
+    def _urgency_order(self, towers: pd.DataFrame, day: pd.Timestamp) -> np.ndarray:
+        """Positions of towers from most to least urgent on a day"""
+        # Overdue towers and open maintenance come first, each group by priority then due date
+        urgent = ((towers['due_date'] < day) | towers['status'].str.lower().isin(OPEN_STATUSES)).to_numpy()
+        rank = towers['priority'].str.lower().map(PRIORITY_RANK).fillna(len(PRIORITY_RANK)).to_numpy()
+        due = towers['due_date'].fillna(pd.Timestamp.max).to_numpy()
+        # np.lexsort sorts by the last key first
+        return np.lexsort((due, rank, ~urgent))
+    
+    def _plan_zone(self, zone: str, from_date: date):
+        zone_towers = self.towers[self.towers['maintenance_zone'] == zone]
+        kept = {
+            day: routes for day, routes in self.plans.get(zone, {}).items()
+            if date.fromisoformat(day) < from_date
+        }
+        visited = {tower_id for routes in kept.values() for route in routes for tower_id in route['route']}
+        
+        base_tower_id = TowerRoutePlanner.zone_base_tower(zone_towers) if len(zone_towers) > 0 else None
+        if base_tower_id is None:
+            self.plans[zone] = kept
+            self.unscheduled[zone] = 0
+            return
+        
+        pending = zone_towers[
+            ~zone_towers['tower_id'].isin(visited)
+            & ~zone_towers['status'].str.lower().isin(EXCLUDED_STATUSES)
+        ]
+        base_lat, base_lon = zone_towers.loc[base_tower_id, ['latitude', 'longitude']]
+        towers_per_route = max(1, int(self.shift_hours // SERVICE_HOURS_PER_TOWER))
+        end_date = self.start_date + timedelta(days=self.horizon_days)
+        
+        plan = dict(kept)
+        day = from_date
+        while day < end_date and len(pending) > 0:
+            day_ts = pd.Timestamp(day)
+            eligible = pending[
+                pending['status'].str.lower().isin(OPEN_STATUSES)
+                | (pending['due_date'] - pd.Timedelta(days=self.window_days) <= day_ts)
+            ]
+            if len(eligible) > 0:
+                # Most urgent towers, a little more than the crews can serve in a day
+                take = self.crews * int(math.ceil(towers_per_route * 1.25))
+                selected = eligible.iloc[self._urgency_order(eligible, day_ts)[:take]]
+                routes, towers_per_route = self._route_day(selected, base_lat, base_lon, day_ts, towers_per_route)
+                if routes:
+                    plan[day.isoformat()] = routes
+                    served = [tower_id for route in routes for tower_id in route['route']]
+                    pending = pending[~pending['tower_id'].isin(served)]
+            day += timedelta(days=1)
+        
+        self.plans[zone] = plan
+        self.unscheduled[zone] = len(pending)
+    
+    def _route_day(self, selected: pd.DataFrame, base_lat: float, base_lon: float,
+                   day: pd.Timestamp, towers_per_route: int):
+        """Routes of one zone-day: the crews' routes holding the most urgent towers"""
+        # The base is point 0 of the metrics arrays; route positions are shifted by one
+        lats = np.concatenate([[base_lat], selected['latitude'].to_numpy(dtype=np.float64)])
+        lons = np.concatenate([[base_lon], selected['longitude'].to_numpy(dtype=np.float64)])
+        day_routes = plan_day_routes(lats[1:], lons[1:], base_lat, base_lon, self.shift_hours,
+                                     AVG_SPEED_KMH, SERVICE_HOURS_PER_TOWER)
+        
+        # selected is in urgency order, so a route's urgency is its smallest position
+        day_routes.sort(key=lambda route: int(route.min()))
+        day_routes = day_routes[:self.crews]
+        
+        tower_ids = selected['tower_id'].to_numpy()
+        due = selected['due_date'].to_numpy()
+        routes = []
+        for crew, route in enumerate(day_routes, start=1):
+            metrics = TowerRoutePlanner.day_route_metrics(lats, lons, 0, route + 1, self.shift_hours)
+            metrics['overdue_towers'] = int((due[route] < day.to_datetime64()).sum())
+            routes.append({'crew': f"crew_{crew}", 'route': tower_ids[route].tolist(), 'metrics': metrics})
+        
+        if day_routes:
+            towers_per_route = max(1, int(round(np.mean([len(route) for route in day_routes]))))
+        return routes, towers_per_route
+    
+    def todays_routes(self, zone: Optional[str] = None, on: Optional[date] = None) -> Dict:
+        """Planned routes of a day (default today), for one zone or all zones"""
+        day = (on or date.today()).isoformat()
+        zones = [zone] if zone is not None else list(self.plans)
+        return {
+            'date': day,
+            'zones': {z: self.plans.get(z, {}).get(day, []) for z in zones if z in self.plans},
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            'generated_at': self.generated_at,
+            'start_date': self.start_date.isoformat(),
+            'horizon_days': self.horizon_days,
+            'crews': self.crews,
+            'shift_hours': self.shift_hours,
+            'window_days': self.window_days,
+            'unscheduled': self.unscheduled,
+            'overrides': self.overrides,
+            'plans': self.plans,
+        }
+    
+    def save(self, path: Path) -> Path:
+        """Write the plan as JSON (temporary file renamed into place)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, default=str)
+        os.replace(temp_path, path)
+        logger.info(f"✓ Maintenance schedule saved: {path}")
+        return path
+    
+    @staticmethod
+    def load_plan(path: Path) -> Dict:
+        """Load a saved plan (as written by save)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
@@ -0,0 +1,169 @@
+"""
+Route Distances
+Great-circle distances between towers, computed in memory-bounded float32
+tiles as a dense matrix or as sparse k-nearest / radius neighbourhoods
+"""
+
+import logging
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional sparse matrix output
+try:
+    from scipy.sparse import csr_matrix
+    SCIPY_SPARSE_AVAILABLE = True
+except ImportError:
+    SCIPY_SPARSE_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Upper bound on the working memory of one tile
+DEFAULT_TILE_BYTES = 64 * 1024 ** 2
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between coordinate arrays (broadcasting)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def to_unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Convert lat/lon in degrees to 3D points on the unit sphere"""
+    lat_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lon_rad = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack([cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)])
+
+
+class DistanceMatrixEngine:
+    """
+    Great-circle distances between a fixed set of points, tile by tile
+    
+    A tile is a block of rows against every point. Its distances come from
+    unit-vector chords (one matrix product per tile, accurate to well under
+    a metre) and are stored as float32, so a dense matrix takes half the
+    memory of float64. Sparse neighbourhoods never hold more than one tile
+    at a time and rank candidates by angle, so only kept pairs are
+    converted to km.
+    """
+    
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, tile_bytes: int = DEFAULT_TILE_BYTES):
+        """
+        Args:
+            lats: Latitudes in degrees
+            lons: Longitudes in degrees
+            tile_bytes: Working memory budget of one tile
+        """
+        self.points = to_unit_vectors(lats, lons)
+        self.n = len(self.points)
+        # float64 cosines, a float64 working copy and the float32 result, per element
+        self.tile_rows = max(1, int(tile_bytes // (20 * max(self.n, 1))))
+    
+    def _cosines(self, start: int, stop: int) -> np.ndarray:
+        """Cosines of the central angles from points[start:stop] to every point"""
+        return self.points[start:stop] @ self.points.T
+    
+    @staticmethod
+    def _cosines_to_km(cosines: np.ndarray) -> np.ndarray:
+        """Central-angle cosines to great-circle km (float32), via the chord length"""
+        chord = np.multiply(cosines, -2.0)
+        chord += 2.0
+        np.clip(chord, 0.0, 4.0, out=chord)
+        np.sqrt(chord, out=chord)
+        chord /= 2.0
+        np.arcsin(chord, out=chord)
+        chord *= 2 * EARTH_RADIUS_KM
+        return chord.astype(np.float32)
+    
+    def _row_tiles(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (first row, cosines to every other point) with self-pairs masked out"""
+        for start in range(0, self.n, self.tile_rows):
+            cosines = self._cosines(start, min(start + self.tile_rows, self.n))
+            rows = np.arange(len(cosines))
+            cosines[rows, start + rows] = -np.inf
+            yield start, cosines
+    
+    def tile(self, start: int, stop: int) -> np.ndarray:
+        """Distances in km from points[start:stop] to every point (float32)"""
+        return self._cosines_to_km(self._cosines(start, stop))
+    
+    def iter_tiles(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (first row, tile) over all rows"""
+        for start in range(0, self.n, self.tile_rows):
+            yield start, self.tile(start, min(start + self.tile_rows, self.n))
+    
+    def dense(self) -> np.ndarray:
+        """Full n x n float32 distance matrix"""
+        matrix = np.empty((self.n, self.n), dtype=np.float32)
+        for start, block in self.iter_tiles():
+            matrix[start:start + len(block)] = block
+        return matrix
+    
+    def knn(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest other points of every point
+        
+        Returns:
+            Tuple of (indices int32 n x k, distances float32 n x k), nearest first
+        """
+        k = min(k, self.n - 1)
+        indices = np.empty((self.n, k), dtype=np.int32)
+        distances = np.empty((self.n, k), dtype=np.float32)
+        if k <= 0:
+            return indices, distances
+        
+        # Rank by angle cosine and convert only the k winners to km
+        for start, cosines in self._row_tiles():
+            stop = start + len(cosines)
+            nearest = np.argpartition(-cosines, k - 1, axis=1)[:, :k]
+            nearest_dist = self._cosines_to_km(np.take_along_axis(cosines, nearest, axis=1))
+            order = np.argsort(nearest_dist, axis=1, kind='stable')
+            indices[start:stop] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:stop] = np.take_along_axis(nearest_dist, order, axis=1)
+        return indices, distances
+    
+    def within(self, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Other points within a radius of every point, in CSR layout
+        
+        Returns:
+            Tuple of (indptr, indices, distances)
+        """
+        # A radius is a minimum angle cosine; only points inside it are converted to km
+        min_cosine = np.cos(radius_km / EARTH_RADIUS_KM)
+        counts = np.zeros(self.n, dtype=np.int64)
+        index_parts, distance_parts = [], []
+        for start, cosines in self._row_tiles():
+            tile_rows, cols = np.nonzero(cosines >= min_cosine)
+            counts[start:start + len(cosines)] = np.bincount(tile_rows, minlength=len(cosines))
+            index_parts.append(cols.astype(np.int32))
+            distance_parts.append(self._cosines_to_km(cosines[tile_rows, cols]))
+        
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        indices = np.concatenate(index_parts) if index_parts else np.empty(0, dtype=np.int32)
+        distances = np.concatenate(distance_parts) if distance_parts else np.empty(0, dtype=np.float32)
+        return indptr, indices, distances
+    
+    def sparse(self, k: Optional[int] = None, radius_km: Optional[float] = None):
+        """
+        Sparse n x n distance matrix of k-nearest or radius neighbourhoods
+        
+        Stored entries are neighbours (a distance of 0 between co-located
+        towers is kept as an explicit entry); absent entries are not
+        neighbours.
+        """
+        if not SCIPY_SPARSE_AVAILABLE:
+            raise RuntimeError("scipy is required for sparse distance matrices")
+        
+        if k is not None:
+            indices, distances = self.knn(k)
+            indptr = np.arange(self.n + 1, dtype=np.int64) * indices.shape[1]
+            return csr_matrix((distances.ravel(), indices.ravel(), indptr), shape=(self.n, self.n))
+        if radius_km is not None:
+            indptr, indices, distances = self.within(radius_km)
+            return csr_matrix((distances, indices, indptr), shape=(self.n, self.n))
+        raise ValueError("Either k or radius_km is required")
@@ -0,0 +1,435 @@
+"""
+Route Optimization
+Tour construction, local-search improvement and shift-limited day routes
+over tower coordinate arrays; tours are arrays of positions into the
+coordinate arrays
+"""
+
+import logging
+import math
+import time
+import numpy as np
+from collections import deque
+from typing import List, Tuple
+
+from route_distances import DistanceMatrixEngine, EARTH_RADIUS_KM, haversine_km, to_unit_vectors
+
+logger = logging.getLogger(__name__)
+
+# Optional KD-tree backend
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    logger.warning("scipy not available - nearest-neighbour routes will use brute-force search")
+
+
+class UnvisitedIndex:
+    """
+    Nearest-unvisited-point queries over points that are removed once visited
+    
+    Removal is lazy: visited points stay in the KD-tree and are skipped by
+    widening the query, and the tree is rebuilt over the remaining points
+    once half of its points have been visited. Each query is therefore
+    amortised O(log n). Without scipy, queries scan the remaining points
+    with one vectorized pass.
+    """
+    
+    def __init__(self, points: np.ndarray, leafsize: int = 16):
+        """
+        Args:
+            points: Unit vectors of shape (n, 3)
+            leafsize: KD-tree leaf size
+        """
+        self.points = points
+        self.leafsize = leafsize
+        self.unvisited = np.ones(len(points), dtype=bool)
+        self.remaining = len(points)
+        self._build()
+    
+    def _build(self):
+        self.tree_ids = np.flatnonzero(self.unvisited)
+        self.tree_dead = 0
+        if SCIPY_AVAILABLE and len(self.tree_ids) > 0:
+            self.tree = cKDTree(self.points[self.tree_ids], leafsize=self.leafsize)
+        else:
+            self.tree = None
+    
+    def visit(self, i: int):
+        """Remove a point from future queries"""
+        if self.unvisited[i]:
+            self.unvisited[i] = False
+            self.remaining -= 1
+            self.tree_dead += 1
+            if self.tree is not None and self.tree_dead * 2 > len(self.tree_ids):
+                self._build()
+    
+    def nearest(self, point: np.ndarray) -> int:
+        """Position of the unvisited point nearest to a unit vector (-1 if none remain)"""
+        if self.remaining == 0:
+            return -1
+        
+        if self.tree is None:
+            candidates = np.flatnonzero(self.unvisited)
+            offsets = self.points[candidates] - point
+            return int(candidates[np.argmin(np.einsum('ij,ij->i', offsets, offsets))])
+        
+        k = min(8, len(self.tree_ids))
+        while True:
+            _, found = self.tree.query(point, k=k)
+            found = self.tree_ids[np.atleast_1d(found)]
+            alive = found[self.unvisited[found]]
+            if len(alive) > 0:
+                # Results are sorted by distance, so the first unvisited one wins
+                return int(alive[0])
+            k = min(k * 4, len(self.tree_ids))
+
+
+def nearest_neighbor_tour(lats: np.ndarray, lons: np.ndarray, start: int = 0) -> np.ndarray:
+    """
+    Greedy nearest-neighbour tour by great-circle distance
+    
+    Args:
+        lats: Latitudes in degrees
+        lons: Longitudes in degrees
+        start: Position of the first point
+    
+    Returns:
+        Positions of every point in visiting order
+    """
+    points = to_unit_vectors(lats, lons)
+    n = len(points)
+    tour = np.empty(n, dtype=np.int64)
+    if n == 0:
+        return tour
+    
+    index = UnvisitedIndex(points)
+    current = start
+    for step in range(n):
+        tour[step] = current
+        index.visit(current)
+        if step < n - 1:
+            current = index.nearest(points[current])
+    return tour
+
+
+def tour_length_km(lats: np.ndarray, lons: np.ndarray, tour: np.ndarray) -> float:
+    """Great-circle length of an open tour"""
+    if len(tour) < 2:
+        return 0.0
+    lats, lons = np.asarray(lats)[tour], np.asarray(lons)[tour]
+    return float(haversine_km(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+
+
+def tour_lengths_km(lats: np.ndarray, lons: np.ndarray, tours) -> np.ndarray:
+    """
+    Great-circle lengths of many open tours, as one haversine over all legs
+    
+    Args:
+        lats: Latitudes of the points
+        lons: Longitudes of the points
+        tours: 2D array of equal-length tours (one per row) or a sequence of
+            position arrays of any length
+    
+    Returns:
+        Length in km of each tour
+    """
+    lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    if isinstance(tours, np.ndarray) and tours.ndim == 2:
+        if tours.shape[1] < 2:
+            return np.zeros(len(tours))
+        return haversine_km(lats[tours[:, :-1]], lons[tours[:, :-1]],
+                            lats[tours[:, 1:]], lons[tours[:, 1:]]).sum(axis=1)
+    
+    tours = [np.asarray(tour, dtype=np.intp) for tour in tours]
+    sizes = np.array([len(tour) for tour in tours], dtype=np.intp)
+    if sizes.sum() < 2:
+        return np.zeros(len(tours))
+    
+    stops = np.concatenate(tours)
+    legs = haversine_km(lats[stops[:-1]], lons[stops[:-1]], lats[stops[1:]], lons[stops[1:]])
+    # The leg from the last stop of one tour to the first stop of the next belongs to neither
+    last_stops = np.cumsum(sizes) - 1
+    legs[last_stops[(last_stops >= 0) & (last_stops < len(legs))]] = 0.0
+    owners = np.repeat(np.arange(len(tours)), sizes)[:-1]
+    return np.bincount(owners, weights=legs, minlength=len(tours))
+
+
+def _neighbor_lists(lats: np.ndarray, lons: np.ndarray, points: np.ndarray, k: int) -> List[List[int]]:
+    """k nearest other points of every point, nearest first"""
+    k = min(k, len(points) - 1)
+    if SCIPY_AVAILABLE:
+        _, found = cKDTree(points).query(points, k=k + 1)
+        found = np.asarray(found).reshape(len(points), k + 1).tolist()
+        # Drop each point itself (not necessarily first when points coincide)
+        return [[j for j in row if j != i][:k] for i, row in enumerate(found)]
+    indices, _ = DistanceMatrixEngine(lats, lons).knn(k)
+    return indices.tolist()
+
+
+def improve_tour(lats: np.ndarray, lons: np.ndarray, tour: np.ndarray,
+                 time_budget_s: float = 1.0, neighbors: int = 8) -> np.ndarray:
+    """
+    Shorten an open tour with a fixed first point by 2-opt and Or-opt moves
+    
+    Only moves that create an edge to one of a point's nearest neighbours
+    are tried, and a queue of "active" points (don't-look bits) limits the
+    search to points whose tour edges changed since they were last
+    examined, so each pass costs roughly O(n * neighbours) instead of
+    O(n^2). The tour end is free: moves may change which point is last.
+    
+    Args:
+        lats: Latitudes in degrees
+        lons: Longitudes in degrees
+        tour: Initial tour (positions into lats/lons), e.g. nearest-neighbour
+        time_budget_s: Wall-clock budget; the best tour so far is returned
+        neighbors: Neighbour list length per point
+    
+    Returns:
+        Improved tour as positions into lats/lons
+    """
+    n = len(tour)
+    if n < 4 or time_budget_s <= 0:
+        return np.asarray(tour)
+    
+    deadline = time.perf_counter() + time_budget_s
+    points = to_unit_vectors(lats, lons)
+    xs, ys, zs = points[:, 0].tolist(), points[:, 1].tolist(), points[:, 2].tolist()
+    two_r = 2 * EARTH_RADIUS_KM
+    
+    def dist(a: int, b: int) -> float:
+        # -1 is the virtual point after the last one, at zero distance from all
+        if a < 0 or b < 0:
+            return 0.0
+        chord = math.sqrt((xs[a] - xs[b]) ** 2 + (ys[a] - ys[b]) ** 2 + (zs[a] - zs[b]) ** 2)
+        return two_r * math.asin(min(chord / 2, 1.0))
+    
+    neighbor_lists = _neighbor_lists(lats, lons, points, neighbors)
+    t = [int(i) for i in tour]
+    pos = [0] * len(points)
+    for i, city in enumerate(t):
+        pos[city] = i
+    
+    def at(i: int) -> int:
+        return t[i] if 0 <= i < n else -1
+    
+    def reindex(start: int, stop: int):
+        for i in range(start, stop):
+            pos[t[i]] = i
+    
+    queue = deque(t)
+    queued = set(t)
+    
+    def activate(*cities: int):
+        for city in cities:
+            if city >= 0 and city not in queued:
+                queued.add(city)
+                queue.append(city)
+    
+    def try_2opt(a: int) -> bool:
+        # Remove edges after positions i and j (i < j), reverse t[i+1..j]
+        i_a = pos[a]
+        for succ_side in (True, False):
+            base = i_a if succ_side else i_a - 1
+            if base < 0:
+                continue
+            current = dist(at(base), at(base + 1))
+            for c in neighbor_lists[a]:
+                d_ac = dist(a, c)
+                if d_ac >= current:
+                    break
+                # New edge a-c: after a and c, or before a and c
+                other = pos[c] if succ_side else pos[c] - 1
+                if other < 0:
+                    continue
+                i, j = min(base, other), max(base, other)
+                gain = (dist(at(i), at(i + 1)) + dist(at(j), at(j + 1))
+                        - dist(at(i), at(j)) - dist(at(i + 1), at(j + 1)))
+                if gain > 1e-9:
+                    activate(at(i), at(i + 1), at(j), at(j + 1))
+                    t[i + 1:j + 1] = t[i + 1:j + 1][::-1]
+                    reindex(i + 1, j + 1)
+                    return True
+        return False
+    
+    def try_or_opt(a: int) -> bool:
+        # Move a segment of 1-3 points starting or ending at a between two other points
+        i_a = pos[a]
+        for length in (1, 2, 3):
+            for s in (i_a, i_a - length + 1):
+                e = s + length - 1
+                if s < 1 or e >= n:
+                    continue
+                first, last = t[s], t[e]
+                before, after = t[s - 1], at(e + 1)
+                removal_gain = dist(before, first) + dist(last, after) - dist(before, after)
+                if removal_gain <= 1e-9:
+                    continue
+                for end in (first, last):
+                    for c in neighbor_lists[end]:
+                        if dist(end, c) >= removal_gain:
+                            break
+                        j = pos[c]
+                        if s <= j <= e:
+                            continue
+                        # Insert between c and its successor, or its predecessor and c
+                        for u, v in ((c, at(j + 1)), (at(j - 1), c)):
+                            if u < 0 or {u, v} == {before, after} or u in (first, last) or v in (first, last):
+                                continue
+                            forward = dist(u, first) + dist(last, v) - dist(u, v)
+                            backward = dist(u, last) + dist(first, v) - dist(u, v)
+                            added, reverse = (backward, True) if backward < forward else (forward, False)
+                            if removal_gain - added > 1e-9:
+                                activate(before, after, u, v, first, last)
+                                segment = t[s:e + 1]
+                                if reverse:
+                                    segment.reverse()
+                                del t[s:e + 1]
+                                insert_at = t.index(u) + 1 if u >= 0 else 0
+                                t[insert_at:insert_at] = segment
+                                reindex(min(s, insert_at), max(e + 1, insert_at + length))
+                                return True
+        return False
+    
+    moves = 0
+    while queue and time.perf_counter() < deadline:
+        a = queue.popleft()
+        queued.discard(a)
+        while time.perf_counter() < deadline and (try_2opt(a) or try_or_opt(a)):
+            moves += 1
+    
+    logger.debug(f"Local search applied {moves} moves")
+    return np.asarray(t, dtype=np.int64)
+
+
+def optimize_tour(task: Tuple[np.ndarray, np.ndarray, int, float]) -> np.ndarray:
+    """
+    Nearest-neighbour tour improved by local search (process pool task)
+    
+    Args:
+        task: Tuple of (lats, lons, start position, local search budget in seconds)
+    
+    Returns:
+        Tour as int32 positions into lats / lons, starting at the start position
+    """
+    lats, lons, start, time_budget_s = task
+    tour = nearest_neighbor_tour(lats, lons, start=start)
+    return improve_tour(lats, lons, tour, time_budget_s=time_budget_s).astype(np.int32)
+
+
+def kmeans_clusters(lats: np.ndarray, lons: np.ndarray, k: int, iterations: int = 25,
+                    seed: int = 0) -> np.ndarray:
+    """
+    Geographic k-means labels (Lloyd iterations on unit vectors)
+    
+    Deterministic for a given seed. Points are assigned to the center with
+    the largest dot product, which on the unit sphere is the nearest one.
+    """
+    points = to_unit_vectors(lats, lons)
+    n = len(points)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+    centers = points[rng.choice(n, size=k, replace=False)]
+    
+    labels = np.zeros(n, dtype=np.int64)
+    for iteration in range(iterations):
+        new_labels = np.argmax(points @ centers.T, axis=1)
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        counts = np.bincount(labels, minlength=k)
+        # Empty clusters keep their previous center
+        filled = counts > 0
+        norms = np.linalg.norm(sums[filled], axis=1, keepdims=True)
+        centers[filled] = sums[filled] / np.where(norms > 0, norms, 1.0)
+    return labels
+
+
+def split_tour(tour_legs_km: np.ndarray, base_legs_km: np.ndarray, shift_hours: float,
+               speed_kmh: float, service_hours: float) -> List[Tuple[int, int]]:
+    """
+    Optimal split of a tour into day routes that start and end at a base
+    
+    A day route serving tour positions i..j drives base -> i, along the tour
+    to j and back to the base, plus service time per tower. Dynamic
+    programming over split points gives the minimum total time with every
+    day within the shift; a tower that cannot fit a shift even on its own
+    becomes a single-tower day.
+    
+    Args:
+        tour_legs_km: Distance from each tour position to the next (n - 1)
+        base_legs_km: Distance from the base to each tour position (n)
+        shift_hours: Working hours per crew day
+        speed_kmh: Average driving speed
+        service_hours: Maintenance time per tower
+    
+    Returns:
+        (first, last) tour positions of each day route, inclusive
+    """
+    n = len(base_legs_km)
+    prefix = np.concatenate([[0.0], np.cumsum(tour_legs_km)]).tolist()
+    base = base_legs_km.tolist()
+    best = [0.0] + [math.inf] * n
+    split_from = [0] * (n + 1)
+    
+    for i in range(n):
+        if best[i] == math.inf:
+            continue
+        for j in range(i, n):
+            hours = ((base[i] + prefix[j] - prefix[i] + base[j]) / speed_kmh
+                     + (j - i + 1) * service_hours)
+            if hours > shift_hours and j > i:
+                break
+            if best[i] + hours < best[j + 1]:
+                best[j + 1] = best[i] + hours
+                split_from[j + 1] = i
+    
+    days = []
+    end = n
+    while end > 0:
+        start = split_from[end]
+        days.append((start, end - 1))
+        end = start
+    return days[::-1]
+
+
+def plan_day_routes(lats: np.ndarray, lons: np.ndarray, base_lat: float, base_lon: float, shift_hours: float,
+                    speed_kmh: float, service_hours: float,
+                    time_budget_s: float = 0.05) -> List[np.ndarray]:
+    """
+    Day routes covering every point, each within a shift from and to the base
+    
+    Points are clustered geographically into groups of about one shift's
+    worth of towers, each cluster is routed (nearest neighbour from the
+    point nearest the base, then local search) and its tour is split into
+    shift-feasible days.
+    
+    Returns:
+        Day routes as arrays of positions, ordered by bearing from the base
+    """
+    n = len(lats)
+    towers_per_shift = max(1, int(shift_hours // service_hours))
+    labels = kmeans_clusters(lats, lons, int(math.ceil(n / towers_per_shift)))
+    base_km = haversine_km(base_lat, base_lon, lats, lons)
+    
+    day_routes = []
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        start = int(np.argmin(base_km[members]))
+        tour = nearest_neighbor_tour(lats[members], lons[members], start=start)
+        if len(tour) >= 4:
+            tour = improve_tour(lats[members], lons[members], tour, time_budget_s=time_budget_s)
+        positions = members[tour]
+        legs = haversine_km(lats[positions[:-1]], lons[positions[:-1]], lats[positions[1:]], lons[positions[1:]])
+        for first, last in split_tour(legs, base_km[positions], shift_hours, speed_kmh, service_hours):
+            day_routes.append(positions[first:last + 1])
+    
+    # Order by bearing, so consecutive day routes form compact sectors
+    bearings = [
+        math.atan2(float(np.mean(lons[route]) - base_lon), float(np.mean(lats[route]) - base_lat))
+        for route in day_routes
+    ]
+    return [day_routes[i] for i in np.argsort(bearings, kind='stable')]
@@ -0,0 +1,220 @@
+"""
+Route Plan Store
+Persistent per-zone route plans, keyed by a hash of each zone's towers and
+the planning parameters, so unchanged zones are never routed twice
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from tower_route_planning import (
+    TowerRoutePlanner, ROUTE_IMPROVEMENT_BUDGET_S, AVG_SPEED_KMH, SERVICE_HOURS_PER_TOWER,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when route construction changes, so stored plans are recomputed
+ROUTE_PLAN_VERSION = 1
+
+# Inventory columns needed to plan routes
+ROUTE_COLUMNS = ['tower_id', 'latitude', 'longitude', 'maintenance_zone']
+
+INDEX_FILENAME = "index.json"
+
+
+class RoutePlanStore:
+    """
+    Cache of zone route plans in memory and on disk
+    
+    A zone's plan (route and metrics) is stored under a key hashed from the
+    zone's towers (IDs and coordinates, in ID order) and the planning
+    parameters, so it stays valid until the zone's inventory or the
+    parameters change. An index maps each inventory version to its zone
+    keys and tower count: once a version is indexed, a request is a
+    dictionary lookup, without loading the inventory.
+    """
+    
+    def __init__(self, store_dir: Path, time_budget_s: float = ROUTE_IMPROVEMENT_BUDGET_S,
+                 workers: Optional[int] = 1):
+        """
+        Args:
+            store_dir: Directory of the stored plans and index
+            time_budget_s: Local search budget per zone
+            workers: Processes for routing several zones (1 for serial, the
+                default, as plans are routed inside request handlers)
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.store_dir / INDEX_FILENAME
+        self.time_budget_s = time_budget_s
+        self.workers = workers
+        self._plans: Dict[str, Dict] = {}
+        self._index: Optional[Dict[str, Dict]] = None
+        # Inventory loaded while indexing a version, reused to route its zones
+        self._towers: Optional[tuple] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def params(self) -> Dict:
+        """Parameters a plan depends on"""
+        return {
+            'version': ROUTE_PLAN_VERSION,
+            'time_budget_s': self.time_budget_s,
+            'avg_speed_kmh': AVG_SPEED_KMH,
+            'service_hours_per_tower': SERVICE_HOURS_PER_TOWER,
+        }
+    
+    @staticmethod
+    def inventory_id(inventory_path: Path) -> str:
+        """Identity of an inventory file version (name, size and modification time)"""
+        stat = Path(inventory_path).stat()
+        return f"{Path(inventory_path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def zone_keys(self, towers_df: pd.DataFrame) -> Dict[str, str]:
+        """Plan key of every zone with at least one located tower"""
+        params = json.dumps(self.params, sort_keys=True)
+        located = towers_df[towers_df['latitude'].notna() & towers_df['longitude'].notna()]
+        
+        keys = {}
+        for zone, zone_towers in located.groupby('maintenance_zone', sort=False, observed=True):
+            towers = zone_towers[['tower_id', 'latitude', 'longitude']].sort_values('tower_id')
+            digest = hashlib.sha256(f"{zone}\n{params}\n".encode('utf-8'))
+            digest.update(pd.util.hash_pandas_object(towers, index=False).to_numpy().tobytes())
+            keys[str(zone)] = digest.hexdigest()
+        return keys
+    
+    def zone_index(self, inventory_id: str,
+                   load_towers: Callable[[], pd.DataFrame]) -> Optional[Dict]:
+        """
+        Zone keys and tower count of an inventory version
+        
+        The inventory is loaded (with load_towers) only the first time a
+        version is seen.
+        
+        Returns:
+            Dict with 'zones' (zone -> plan key) and 'tower_count', or None
+            if the inventory is empty
+        """
+        entry = self._read_index().get(inventory_id)
+        if entry is not None:
+            return entry
+        
+        towers_df = load_towers()
+        if towers_df.empty:
+            return None
+        
+        entry = {'zones': self.zone_keys(towers_df), 'tower_count': len(towers_df)}
+        with self._lock:
+            # Only the current inventory version is kept
+            self._index = {inventory_id: entry}
+            self._write_json(self.index_path, self._index)
+            self._prune(set(entry['zones'].values()))
+        self._towers = (inventory_id, towers_df)
+        return entry
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Stored plan of a key, from memory or disk"""
+        plan = self._plans.get(key)
+        if plan is None:
+            path = self._plan_path(key)
+            if not path.exists():
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                plan = self._plans[key] = json.load(f)
+        return plan
+    
+    def put(self, key: str, plan: Dict):
+        """Store a plan in memory and on disk"""
+        self._plans[key] = plan
+        self._write_json(self._plan_path(key), plan)
+    
+    def zone_plans(self, inventory_id: str, load_towers: Callable[[], pd.DataFrame],
+                   zones: Optional[Iterable[str]] = None) -> Optional[Dict[str, Dict]]:
+        """
+        Route plans of the requested zones (default all), routing only missing ones
+        
+        Args:
+            inventory_id: Inventory version (see inventory_id)
+            load_towers: Loads the inventory (at least ROUTE_COLUMNS)
+            zones: Zones to return; unknown zones are left out
+        
+        Returns:
+            Dict of zone -> {'route', 'metrics'}, or None if the inventory is empty
+        """
+        index = self.zone_index(inventory_id, load_towers)
+        if index is None:
+            return None
+        
+        zone_keys = index['zones']
+        zones = list(zone_keys) if zones is None else [zone for zone in zones if zone in zone_keys]
+        plans = {zone: self.get(zone_keys[zone]) for zone in zones}
+        
+        missing = [zone for zone, plan in plans.items() if plan is None]
+        if missing:
+            with self._lock:
+                plans.update(self._route_zones(missing, zone_keys, inventory_id, load_towers))
+        return plans
+    
+    def _route_zones(self, zones: List[str], zone_keys: Dict[str, str], inventory_id: str,
+                     load_towers: Callable[[], pd.DataFrame]) -> Dict[str, Dict]:
+        """Route zones and store their plans"""
+        # Another request may have routed them while this one waited for the lock
+        plans = {zone: self.get(zone_keys[zone]) for zone in zones}
+        zones = [zone for zone, plan in plans.items() if plan is None]
+        if not zones:
+            return plans
+        
+        logger.info(f"Routing {len(zones)} zones without a stored plan...")
+        if self._towers is not None and self._towers[0] == inventory_id:
+            towers_df = self._towers[1]
+        else:
+            towers_df = load_towers()
+        zone_towers = towers_df[towers_df['maintenance_zone'].astype(str).isin(zones)]
+        
+        planner = TowerRoutePlanner(zone_towers, workers=self.workers)
+        zone_routes = {str(zone): route
+                       for zone, route in planner.optimize_routes_by_zone(self.time_budget_s).items()}
+        routed = [zone for zone in zones if zone in zone_routes]
+        metrics = planner.calculate_routes_metrics([zone_routes[zone] for zone in routed])
+        
+        for zone, zone_metrics in zip(routed, metrics):
+            plans[zone] = {'route': zone_routes[zone], 'metrics': zone_metrics}
+            self.put(zone_keys[zone], plans[zone])
+        
+        logger.info(f"✓ Stored route plans for {len(routed)} zones")
+        return plans
+    
+    def _prune(self, live_keys: set):
+        """Remove plans no zone of the current inventory refers to"""
+        for path in self.store_dir.glob('*.json'):
+            if path != self.index_path and path.stem not in live_keys:
+                path.unlink(missing_ok=True)
+        self._plans = {key: plan for key, plan in self._plans.items() if key in live_keys}
+    
+    def _plan_path(self, key: str) -> Path:
+        return self.store_dir / f"{key}.json"
+    
+    def _read_index(self) -> Dict[str, Dict]:
+        if self._index is None:
+            self._index = {}
+            if self.index_path.exists():
+                try:
+                    with open(self.index_path, 'r', encoding='utf-8') as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not read route plan index: {str(e)}")
+        return self._index
+    
+    @staticmethod
+    def _write_json(path: Path, payload: Dict):
+        """Write JSON to a temporary file renamed into place"""
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(temp_path, path)
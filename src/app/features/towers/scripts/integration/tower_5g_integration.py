@@ -18,14 +18,14 @@ class Tower5GIntegration:
     """Integrate tower locations with 5G expansion features"""
     
     def __init__(self, towers_df: pd.DataFrame):
-        self.towers_df = towers_df.copy()
+        self.towers_df = towers_df
         self._5g_features = {}
     
     def identify_5g_expansion_candidates(self, coverage_radius_km: float = 5.0) -> pd.DataFrame:
         """Identify towers that are candidates for 5G expansion"""
         logger.info("Identifying 5G expansion candidates...")
         
-        df = self.towers_df.copy()
+        df = self.towers_df.copy(deep=False)
         
         # Mark existing 5G towers (if available)
         if 'has_5g' not in df.columns:
@@ -63,7 +63,7 @@ class Tower5GIntegration:
     
     def _calculate_tower_density(self, df: pd.DataFrame, radius_km: float) -> pd.Series:
         """Calculate tower density around each tower"""
-        valid_towers = df[df['latitude'].notna() & df['longitude'].notna()].copy()
+        valid_towers = df[df['latitude'].notna() & df['longitude'].notna()]
         
         if len(valid_towers) == 0:
             return pd.Series(0, index=df.index)
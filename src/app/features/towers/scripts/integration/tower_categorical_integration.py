@@ -17,14 +17,14 @@ class TowerCategoricalIntegration:
     """Integrate tower locations with categorical features"""
     
     def __init__(self, towers_df: pd.DataFrame):
-        self.towers_df = towers_df.copy()
+        self.towers_df = towers_df
         self.categorical_features = {}
     
     def generate_site_categorical_features(self) -> pd.DataFrame:
         """Generate categorical features for sites/towers"""
         logger.info("Generating site categorical features...")
         
-        df = self.towers_df.copy()
+        df = self.towers_df.copy(deep=False)
         
         # Site-level categorical features
         if 'maintenance_zone' in df.columns:
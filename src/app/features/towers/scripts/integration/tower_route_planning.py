@@ -4,136 +4,201 @@ Optimize maintenance routes using tower locations
 """
 
 import logging
+import multiprocessing
+import os
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import json
 
+from route_distances import DistanceMatrixEngine, DEFAULT_TILE_BYTES, SCIPY_SPARSE_AVAILABLE
+from route_optimization import (
+    nearest_neighbor_tour, improve_tour, optimize_tour, tour_length_km, tour_lengths_km, plan_day_routes,
+)
+
 logger = logging.getLogger(__name__)
 
 # Optional optimization imports
 try:
-    from scipy.spatial.distance import cdist
     from scipy.optimize import minimize
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
     logger.warning("scipy not available - route optimization will use simple heuristics")
 
+# Wall-clock budget of the 2-opt / Or-opt improvement of each route (seconds)
+ROUTE_IMPROVEMENT_BUDGET_S = 0.5
+
+# Field crew time model
+AVG_SPEED_KMH = 60
+SERVICE_HOURS_PER_TOWER = 0.5  # 30 min per tower
+DEFAULT_SHIFT_HOURS = 8.0
+
 
 class TowerRoutePlanner:
     """Optimize maintenance routes for towers"""
     
-    def __init__(self, towers_df: pd.DataFrame):
-        self.towers_df = towers_df.copy()
+    def __init__(self, towers_df: pd.DataFrame, workers: Optional[int] = 1):
+        """
+        Args:
+            towers_df: Tower inventory
+            workers: Processes for per-zone routing (1 for serial, the default;
+                None for all cores)
+        """
+        self.towers_df = towers_df
+        self.workers = workers
         self.routes = []
+        self._coordinate_index = None
     
-    def calculate_distance_matrix(self, towers_subset: Optional[pd.DataFrame] = None) -> np.ndarray:
-        """Calculate distance matrix between towers"""
+    def calculate_distance_matrix(self, towers_subset: Optional[pd.DataFrame] = None,
+                                  k: Optional[int] = None, radius_km: Optional[float] = None,
+                                  tile_bytes: int = DEFAULT_TILE_BYTES):
+        """
+        Calculate great-circle distances (km) between towers
+        
+        Distances are computed in float32 tiles of bounded memory. By default
+        the full matrix is returned; with k or radius_km only each tower's k
+        nearest towers, or towers within the radius, are kept in a sparse
+        matrix, which stays small for the whole fleet.
+        
+        Args:
+            towers_subset: Towers to use (defaults to all towers)
+            k: Keep only the k nearest towers of each tower
+            radius_km: Keep only towers within this distance
+            tile_bytes: Working memory budget of one tile
+        
+        Returns:
+            Dense float32 matrix, or scipy.sparse CSR matrix in sparse mode,
+            ordered like the towers with valid coordinates
+        """
         df = towers_subset if towers_subset is not None else self.towers_df
         
         # Filter towers with valid coordinates
         valid_towers = df[
             df['latitude'].notna() & 
             df['longitude'].notna()
-        ].copy()
+        ]
         
         if len(valid_towers) < 2:
             logger.warning("Not enough towers with valid coordinates")
             return np.array([])
         
-        # Calculate distances (simplified - would use haversine in production)
-        coords = valid_towers[['latitude', 'longitude']].values
+        engine = DistanceMatrixEngine(
+            valid_towers['latitude'].to_numpy(dtype=np.float64),
+            valid_towers['longitude'].to_numpy(dtype=np.float64),
+            tile_bytes=tile_bytes
+        )
         
-        if SCIPY_AVAILABLE:
-            # Use scipy for efficient distance calculation
-            distances = cdist(coords, coords, metric='euclidean')
-            # Convert to approximate km (rough conversion for Brazil)
-            distances_km = distances * 111  # ~111 km per degree
-        else:
-            # Simple euclidean distance
-            n = len(coords)
-            distances_km = np.zeros((n, n))
-            for i in range(n):
-                for j in range(n):
-                    if i != j:
-                        lat_diff = coords[i][0] - coords[j][0]
-                        lon_diff = coords[i][1] - coords[j][1]
-                        dist = np.sqrt(lat_diff**2 + lon_diff**2) * 111
-                        distances_km[i, j] = dist
+        if k is not None or radius_km is not None:
+            if SCIPY_SPARSE_AVAILABLE:
+                distances_km = engine.sparse(k=k, radius_km=radius_km)
+                logger.info(f"✓ Calculated sparse distance matrix for {len(valid_towers)} towers "
+                            f"({distances_km.nnz} neighbour pairs)")
+                return distances_km
+            logger.warning("scipy not available - returning the dense distance matrix")
         
+        distances_km = engine.dense()
         logger.info(f"✓ Calculated distance matrix for {len(valid_towers)} towers")
         return distances_km
     
-    def optimize_route_nearest_neighbor(self, start_tower_id: str, 
-                                       tower_ids: Optional[List[str]] = None) -> List[str]:
-        """Optimize route using nearest neighbor heuristic"""
-        logger.info(f"Optimizing route starting from tower {start_tower_id}...")
-        
-        # Filter towers
+    def _route_towers(self, tower_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """Towers of a route (all towers by default) with valid coordinates"""
         if tower_ids:
-            df = self.towers_df[self.towers_df['tower_id'].isin(tower_ids)].copy()
+            df = self.towers_df[self.towers_df['tower_id'].isin(tower_ids)]
         else:
-            df = self.towers_df.copy()
+            df = self.towers_df
         
-        valid_towers = df[
+        return df[
             df['latitude'].notna() & 
             df['longitude'].notna()
-        ].copy()
+        ]
+    
+    @staticmethod
+    def _nearest_neighbor_tour(valid_towers: pd.DataFrame, start_tower_id: str) -> np.ndarray:
+        """Nearest-neighbour tour (positions into valid_towers) from the start tower"""
+        # Find start tower (first tower if not in the route)
+        start_positions = np.flatnonzero((valid_towers['tower_id'] == start_tower_id).to_numpy())
+        start = int(start_positions[0]) if len(start_positions) > 0 else 0
+        
+        # Nearest neighbor algorithm over a spatial index of unvisited towers
+        return nearest_neighbor_tour(
+            valid_towers['latitude'].to_numpy(dtype=np.float64),
+            valid_towers['longitude'].to_numpy(dtype=np.float64),
+            start=start
+        )
+    
+    def optimize_route_nearest_neighbor(self, start_tower_id: str, 
+                                       tower_ids: Optional[List[str]] = None) -> List[str]:
+        """Optimize route using nearest neighbor heuristic"""
+        logger.info(f"Optimizing route starting from tower {start_tower_id}...")
+        
+        valid_towers = self._route_towers(tower_ids)
         
         if len(valid_towers) < 2:
             logger.warning("Not enough towers for route optimization")
             return []
         
-        # Find start tower
-        start_idx = valid_towers[valid_towers['tower_id'] == start_tower_id].index
-        if len(start_idx) == 0:
-            # Use first tower as start
-            start_idx = valid_towers.index[0]
-            start_tower_id = valid_towers.iloc[0]['tower_id']
-        else:
-            start_idx = start_idx[0]
-        
-        # Calculate distances
-        coords = valid_towers[['latitude', 'longitude']].values
-        route = [start_tower_id]
-        visited = {start_tower_id}
-        current_idx = valid_towers.index.get_loc(start_idx)
-        
-        # Nearest neighbor algorithm
-        while len(visited) < len(valid_towers):
-            min_dist = float('inf')
-            next_idx = None
-            
-            for i, row in valid_towers.iterrows():
-                tower_id = row['tower_id']
-                if tower_id in visited:
-                    continue
-                
-                # Calculate distance
-                lat_diff = coords[current_idx][0] - row['latitude']
-                lon_diff = coords[current_idx][1] - row['longitude']
-                dist = np.sqrt(lat_diff**2 + lon_diff**2) * 111
-                
-                if dist < min_dist:
-                    min_dist = dist
-                    next_idx = valid_towers.index.get_loc(i)
-                    next_tower_id = tower_id
-            
-            if next_idx is not None:
-                route.append(next_tower_id)
-                visited.add(next_tower_id)
-                current_idx = next_idx
-            else:
-                break
+        tour = self._nearest_neighbor_tour(valid_towers, start_tower_id)
+        route = valid_towers['tower_id'].to_numpy()[tour].tolist()
         
         logger.info(f"✓ Optimized route with {len(route)} towers")
         return route
     
-    def optimize_routes_by_zone(self) -> Dict[str, List[str]]:
-        """Optimize routes for each maintenance zone"""
+    def optimize_route(self, start_tower_id: str, tower_ids: Optional[List[str]] = None,
+                       time_budget_s: float = ROUTE_IMPROVEMENT_BUDGET_S) -> List[str]:
+        """
+        Optimize route with nearest neighbor construction and local search
+        
+        The nearest-neighbour route is shortened with 2-opt and Or-opt moves
+        for up to time_budget_s seconds; the start tower stays first.
+        """
+        logger.info(f"Optimizing route starting from tower {start_tower_id}...")
+        
+        valid_towers = self._route_towers(tower_ids)
+        
+        if len(valid_towers) < 2:
+            logger.warning("Not enough towers for route optimization")
+            return []
+        
+        lats = valid_towers['latitude'].to_numpy(dtype=np.float64)
+        lons = valid_towers['longitude'].to_numpy(dtype=np.float64)
+        tour = self._nearest_neighbor_tour(valid_towers, start_tower_id)
+        initial_km = tour_length_km(lats, lons, tour)
+        tour = improve_tour(lats, lons, tour, time_budget_s=time_budget_s)
+        improved_km = tour_length_km(lats, lons, tour)
+        route = valid_towers['tower_id'].to_numpy()[tour].tolist()
+        
+        logger.info(f"✓ Optimized route with {len(route)} towers "
+                    f"({initial_km:.1f} km -> {improved_km:.1f} km)")
+        return route
+    
+    @staticmethod
+    def zone_base_tower(zone_towers: pd.DataFrame) -> Optional[str]:
+        """Central tower of a zone (closest to the centroid), None without coordinates"""
+        if zone_towers['latitude'].notna().sum() == 0:
+            return None
+        
+        centroid_lat = zone_towers['latitude'].mean()
+        centroid_lon = zone_towers['longitude'].mean()
+        
+        # Find closest tower to centroid
+        dist_to_centroid = np.sqrt(
+            (zone_towers['latitude'] - centroid_lat)**2 +
+            (zone_towers['longitude'] - centroid_lon)**2
+        )
+        return zone_towers['tower_id'].iloc[int(np.nanargmin(dist_to_centroid.to_numpy(dtype=np.float64)))]
+    
+    def optimize_routes_by_zone(self, time_budget_s: float = ROUTE_IMPROVEMENT_BUDGET_S) -> Dict[str, List[str]]:
+        """
+        Optimize routes for each maintenance zone (local search budget per zone)
+        
+        Zones are independent and are routed across worker processes. Each
+        worker receives only its zone's coordinate arrays and returns the
+        tour as integer positions, mapped back to tower IDs here.
+        """
         logger.info("Optimizing routes by maintenance zone...")
         
         if 'maintenance_zone' not in self.towers_df.columns:
@@ -141,101 +206,260 @@ class TowerRoutePlanner:
             return {}
         
         zone_routes = {}
+        zone_tower_ids = {}
+        tasks = {}
         
-        for zone in self.towers_df['maintenance_zone'].unique():
-            zone_towers = self.towers_df[self.towers_df['maintenance_zone'] == zone].copy()
+        for zone, zone_towers in self.towers_df.groupby('maintenance_zone', sort=False, observed=True):
+            start_tower_id = self.zone_base_tower(zone_towers)
+            if start_tower_id is None:
+                continue
             
-            if len(zone_towers) == 0:
+            valid_towers = zone_towers[
+                zone_towers['latitude'].notna() &
+                zone_towers['longitude'].notna()
+            ]
+            if len(valid_towers) < 2:
+                logger.warning(f"Not enough towers for route optimization in zone {zone}")
+                zone_routes[zone] = []
                 continue
             
-            # Find central tower (closest to centroid)
-            if zone_towers['latitude'].notna().sum() > 0:
-                centroid_lat = zone_towers['latitude'].mean()
-                centroid_lon = zone_towers['longitude'].mean()
-                
-                # Find closest tower to centroid
-                zone_towers['dist_to_centroid'] = np.sqrt(
-                    (zone_towers['latitude'] - centroid_lat)**2 +
-                    (zone_towers['longitude'] - centroid_lon)**2
-                )
-                start_tower = zone_towers.nsmallest(1, 'dist_to_centroid').iloc[0]
-                start_tower_id = start_tower['tower_id']
-                
-                # Optimize route
-                route = self.optimize_route_nearest_neighbor(
-                    start_tower_id,
-                    zone_towers['tower_id'].tolist()
-                )
-                
-                zone_routes[zone] = route
+            zone_tower_ids[zone] = valid_towers['tower_id'].to_numpy()
+            start = int(np.flatnonzero(zone_tower_ids[zone] == start_tower_id)[0])
+            tasks[zone] = (
+                valid_towers['latitude'].to_numpy(dtype=np.float64),
+                valid_towers['longitude'].to_numpy(dtype=np.float64),
+                start,
+                time_budget_s
+            )
+            # Placeholder keeps zones in inventory order
+            zone_routes[zone] = None
+        
+        tours = self._optimize_zone_tours(tasks)
+        for zone, tour in tours.items():
+            zone_routes[zone] = zone_tower_ids[zone][tour].tolist()
         
         logger.info(f"✓ Optimized routes for {len(zone_routes)} zones")
         return zone_routes
     
-    def calculate_route_metrics(self, route: List[str]) -> Dict:
-        """Calculate metrics for a route"""
-        if len(route) < 2:
-            return {'total_distance_km': 0, 'estimated_time_hours': 0, 'tower_count': len(route)}
-        
-        route_towers = self.towers_df[self.towers_df['tower_id'].isin(route)].copy()
-        route_towers = route_towers[
-            route_towers['latitude'].notna() & 
-            route_towers['longitude'].notna()
-        ]
+    def _optimize_zone_tours(self, tasks: Dict[str, Tuple]) -> Dict[str, np.ndarray]:
+        """Run optimize_tour for every zone, across processes when there are several"""
+        if not tasks:
+            return {}
         
-        if len(route_towers) < 2:
-            return {'total_distance_km': 0, 'estimated_time_hours': 0, 'tower_count': len(route)}
+        workers = self.workers if self.workers is not None else os.cpu_count() or 1
+        workers = max(1, min(workers, len(tasks)))
+        # Pool workers are daemonic and may not start processes of their own
+        if multiprocessing.current_process().daemon:
+            workers = 1
+        
+        if workers == 1:
+            return {zone: optimize_tour(task) for zone, task in tasks.items()}
+        
+        logger.info(f"  Routing {len(tasks)} zones across {workers} processes")
+        # Largest zones first, so no worker is left with a large zone at the end
+        order = sorted(tasks, key=lambda zone: len(tasks[zone][0]), reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {zone: executor.submit(optimize_tour, tasks[zone]) for zone in order}
+            return {zone: futures[zone].result() for zone in tasks}
+    
+    def plan_crew_routes(self, crews: int = 4, shift_hours: float = DEFAULT_SHIFT_HOURS,
+                         zones: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Split each zone's towers into day routes for several crews
         
-        # Calculate total distance
-        total_distance = 0
-        coords = route_towers[['latitude', 'longitude']].values
+        Day routes start and end at the zone's central tower and fit a shift
+        of driving (60 km/h) plus 30 min service per tower. Towers are
+        clustered into shift-sized groups, each group is routed and split
+        into feasible days, and the day routes (ordered by bearing from the
+        base) are dealt to crews as contiguous sectors.
         
-        for i in range(len(coords) - 1):
-            lat_diff = coords[i][0] - coords[i+1][0]
-            lon_diff = coords[i][1] - coords[i+1][1]
-            dist = np.sqrt(lat_diff**2 + lon_diff**2) * 111
-            total_distance += dist
+        Args:
+            crews: Crews available per zone
+            shift_hours: Working hours per crew day
+            zones: Zones to plan (defaults to all zones)
+        
+        Returns:
+            Dict mapping zone to its crew plan
+        """
+        logger.info(f"Planning crew routes ({crews} crews, {shift_hours} h shifts)...")
+        
+        if 'maintenance_zone' not in self.towers_df.columns:
+            logger.warning("No maintenance_zone column found")
+            return {}
         
-        # Estimate time (assuming 60 km/h average speed + 30 min per tower)
-        avg_speed_kmh = 60
-        time_driving = total_distance / avg_speed_kmh
-        time_maintenance = len(route) * 0.5  # 30 min per tower
+        crews = max(1, int(crews))
+        zone_plans = {}
+        
+        for zone, zone_towers in self.towers_df.groupby('maintenance_zone', sort=False, observed=True):
+            if zones is not None and zone not in zones:
+                continue
+            zone_towers = zone_towers[
+                zone_towers['latitude'].notna() &
+                zone_towers['longitude'].notna()
+            ]
+            base_tower_id = self.zone_base_tower(zone_towers) if len(zone_towers) > 0 else None
+            if base_tower_id is None:
+                continue
+            
+            tower_ids = zone_towers['tower_id'].to_numpy()
+            lats = zone_towers['latitude'].to_numpy(dtype=np.float64)
+            lons = zone_towers['longitude'].to_numpy(dtype=np.float64)
+            base = int(np.flatnonzero(tower_ids == base_tower_id)[0])
+            
+            day_routes = plan_day_routes(lats, lons, lats[base], lons[base], shift_hours,
+                                         AVG_SPEED_KMH, SERVICE_HOURS_PER_TOWER)
+            
+            crew_routes = {}
+            for crew, sector in enumerate(np.array_split(np.arange(len(day_routes)), crews), start=1):
+                crew_routes[f"crew_{crew}"] = [
+                    {
+                        'day': day,
+                        'route': tower_ids[day_routes[i]].tolist(),
+                        'metrics': self.day_route_metrics(lats, lons, base, day_routes[i], shift_hours),
+                    }
+                    for day, i in enumerate(sector, start=1)
+                ]
+            
+            day_metrics = [day['metrics'] for days in crew_routes.values() for day in days]
+            zone_plans[zone] = {
+                'base_tower_id': base_tower_id,
+                'crews': crews,
+                'days': max((len(days) for days in crew_routes.values()), default=0),
+                'crew_routes': crew_routes,
+                'summary': {
+                    'tower_count': len(tower_ids),
+                    'day_routes': len(day_metrics),
+                    'total_distance_km': round(sum(m['total_distance_km'] for m in day_metrics), 2),
+                    'total_time_hours': round(sum(m['estimated_time_hours'] for m in day_metrics), 2),
+                    'max_day_hours': max((m['estimated_time_hours'] for m in day_metrics), default=0),
+                    'over_shift_routes': sum(m['over_shift'] for m in day_metrics),
+                },
+            }
+        
+        logger.info(f"✓ Planned crew routes for {len(zone_plans)} zones")
+        return zone_plans
+    
+    @staticmethod
+    def day_route_metrics(lats: np.ndarray, lons: np.ndarray, base: int,
+                          positions: np.ndarray, shift_hours: float) -> Dict:
+        """Metrics of a day route driven from and back to the base tower"""
+        stops = np.concatenate([[base], positions, [base]])
+        total_distance = tour_length_km(lats, lons, stops)
+        time_driving = total_distance / AVG_SPEED_KMH
+        time_maintenance = len(positions) * SERVICE_HOURS_PER_TOWER
         total_time = time_driving + time_maintenance
         
         return {
             'total_distance_km': round(total_distance, 2),
             'estimated_time_hours': round(total_time, 2),
-            'tower_count': len(route),
+            'tower_count': len(positions),
             'driving_time_hours': round(time_driving, 2),
-            'maintenance_time_hours': round(time_maintenance, 2)
+            'maintenance_time_hours': round(time_maintenance, 2),
+            'over_shift': bool(total_time > shift_hours + 1e-9),
         }
     
-    def generate_route_planning_report(self) -> Dict:
-        """Generate comprehensive route planning report"""
-        logger.info("Generating route planning report...")
+    def _tower_coordinates(self) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+        """tower_id -> row index with the row coordinates, built once per towers_df"""
+        if self._coordinate_index is None or self._coordinate_index[0] is not self.towers_df:
+            towers = self.towers_df.drop_duplicates('tower_id')
+            self._coordinate_index = (
+                self.towers_df,
+                pd.Index(towers['tower_id']),
+                towers['latitude'].to_numpy(dtype=np.float64),
+                towers['longitude'].to_numpy(dtype=np.float64),
+            )
+        return self._coordinate_index[1:]
+    
+    def route_positions(self, routes: List[List[str]]) -> List[np.ndarray]:
+        """
+        Rows of the towers of each route, in route order
         
-        zone_routes = self.optimize_routes_by_zone()
+        Towers that are unknown or have no coordinates are left out.
+        """
+        index, lats, lons = self._tower_coordinates()
+        sizes = [len(route) for route in routes]
+        flat = index.get_indexer([tower_id for route in routes for tower_id in route])
+        positions = np.split(flat, np.cumsum(sizes)[:-1]) if routes else []
         
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        return [stops[(stops >= 0) & valid[stops]] for stops in positions]
+    
+    def calculate_routes_metrics(self, routes: List[List[str]]) -> List[Dict]:
+        """Calculate metrics for many routes at once (one haversine over all legs)"""
+        _, lats, lons = self._tower_coordinates()
+        positions = self.route_positions(routes)
+        distances = tour_lengths_km(lats, lons, positions)
+        
+        metrics = []
+        for route, stops, total_distance in zip(routes, positions, distances):
+            if len(route) < 2 or len(stops) < 2:
+                metrics.append({'total_distance_km': 0, 'estimated_time_hours': 0, 'tower_count': len(route)})
+                continue
+            
+            # Estimate time (assuming 60 km/h average speed + 30 min per tower)
+            time_driving = total_distance / AVG_SPEED_KMH
+            time_maintenance = len(route) * SERVICE_HOURS_PER_TOWER
+            total_time = time_driving + time_maintenance
+            
+            metrics.append({
+                'total_distance_km': round(float(total_distance), 2),
+                'estimated_time_hours': round(float(total_time), 2),
+                'tower_count': len(route),
+                'driving_time_hours': round(float(time_driving), 2),
+                'maintenance_time_hours': round(time_maintenance, 2)
+            })
+        return metrics
+    
+    def calculate_route_metrics(self, route: List[str]) -> Dict:
+        """Calculate metrics for a route, following its tower order"""
+        return self.calculate_routes_metrics([route])[0]
+    
+    @staticmethod
+    def route_report(zone_plans: Dict[str, Dict], total_towers: int) -> Dict:
+        """Route planning report of zone plans ({'route', 'metrics'} per zone)"""
         report = {
             'timestamp': datetime.now().isoformat(),
-            'total_zones': len(zone_routes),
+            'total_zones': len(zone_plans),
             'zone_routes': {},
             'summary': {
-                'total_towers': len(self.towers_df),
-                'total_routes': len(zone_routes),
+                'total_towers': total_towers,
+                'total_routes': len(zone_plans),
                 'total_distance_km': 0,
                 'total_time_hours': 0
             }
         }
         
-        for zone, route in zone_routes.items():
-            metrics = self.calculate_route_metrics(route)
-            report['zone_routes'][zone] = {
-                'route': route,
-                'metrics': metrics
-            }
-            report['summary']['total_distance_km'] += metrics['total_distance_km']
-            report['summary']['total_time_hours'] += metrics['estimated_time_hours']
+        for zone, plan in zone_plans.items():
+            report['zone_routes'][zone] = plan
+            report['summary']['total_distance_km'] += plan['metrics']['total_distance_km']
+            report['summary']['total_time_hours'] += plan['metrics']['estimated_time_hours']
+        
+        return report
+    
+    def generate_route_planning_report(self, crews: Optional[int] = None,
+                                       shift_hours: float = DEFAULT_SHIFT_HOURS) -> Dict:
+        """
+        Generate comprehensive route planning report
+        
+        With crews set, each zone is also planned as shift-limited day routes
+        for that many crews (see plan_crew_routes).
+        """
+        logger.info("Generating route planning report...")
+        
+        zone_routes = self.optimize_routes_by_zone()
+        all_metrics = self.calculate_routes_metrics(list(zone_routes.values()))
+        zone_plans = {
+            zone: {'route': route, 'metrics': metrics}
+            for (zone, route), metrics in zip(zone_routes.items(), all_metrics)
+        }
+        report = self.route_report(zone_plans, len(self.towers_df))
+        
+        if crews is not None:
+            crew_plans = self.plan_crew_routes(crews=crews, shift_hours=shift_hours)
+            report['crew_plans'] = crew_plans
+            report['summary']['crews_per_zone'] = crews
+            report['summary']['shift_hours'] = shift_hours
+            report['summary']['crew_days'] = sum(plan['days'] for plan in crew_plans.values())
         
         logger.info("✓ Route planning report generated")
         return report